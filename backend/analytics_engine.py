@@ -1,16 +1,135 @@
+import time
+import threading
+from email.utils import parseaddr
+
+from histogram import LogHistogram
+
+WINDOW_DAYS = 30
+DAY_SECONDS = 86400
+
+# Priority bands reported under response_times
+PRIORITY_BANDS = (("urgent", 4), ("normal", 2), ("low", 1))
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter counter (Metwally et al.).
+    Tracks at most `capacity` items; every update is O(1) using count
+    buckets, and any item seen more than N / capacity times is retained.
+    Buckets are insertion-ordered dicts, so the oldest minimum-count item is
+    the one evicted and results do not depend on hash seeds.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self._counts = {}    # item -> (count, overestimate)
+        self._buckets = {}   # count -> {item: None}, oldest first
+        self._min = 0
+
+    def add(self, item):
+        if item in self._counts:
+            count, error = self._counts[item]
+            self._move(item, count, count + 1)
+            self._counts[item] = (count + 1, error)
+            return
+
+        if len(self._counts) < self.capacity:
+            self._counts[item] = (1, 0)
+            self._buckets.setdefault(1, {})[item] = None
+            self._min = 1
+            return
+
+        # Replace an item with the minimum count; the newcomer inherits it as error
+        evicted = next(iter(self._buckets[self._min]))
+        del self._counts[evicted]
+        floor = self._min
+        self._move(evicted, floor, None)
+        self._counts[item] = (floor + 1, floor)
+        self._buckets.setdefault(floor + 1, {})[item] = None
+        if floor not in self._buckets:
+            self._min = floor + 1
+
+    def _move(self, item, old, new):
+        bucket = self._buckets[old]
+        del bucket[item]
+        if not bucket:
+            del self._buckets[old]
+            if old == self._min and new is not None:
+                self._min = new
+        if new is not None:
+            self._buckets.setdefault(new, {})[item] = None
+
+    def top(self, n):
+        """The n items with the highest estimated counts"""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1][0], reverse=True)
+        return [(item, count) for item, (count, _) in ranked[:n]]
+
+def _format_duration(seconds):
+    if seconds is None:
+        return "n/a"
+    if seconds < 3600:
+        return f"{max(1, round(seconds / 60))}m"
+    if seconds < DAY_SECONDS:
+        return f"{round(seconds / 3600)}h"
+    return f"{round(seconds / DAY_SECONDS)}d"
+
 class AnalyticsEngine:
-    def get_trends(self):
+    """
+    Analytics maintained incrementally from triage events:
+    rolling 30-day volume buckets, bounded top-sender counts and
+    per-priority response-time histograms (delivery -> triage).
+    get_trends() reads these summaries and never rescans threads.
+    """
+
+    def __init__(self, top_sender_capacity=100):
+        self._days = {}  # day number -> threads triaged that day
+        self._senders = SpaceSaving(top_sender_capacity)
+        self._response_times = {band: LogHistogram(minimum=1.0, maximum=90 * DAY_SECONDS) for band, _ in PRIORITY_BANDS}
+        self._lock = threading.Lock()
+
+    def record(self, result, now=None):
+        """Account for one triaged thread (a TriageEngine result)"""
+        now = time.time() if now is None else now
+        day = int(now // DAY_SECONDS)
+        sender = parseaddr(result.get('sender') or "")[1].lower() or "unknown"
+        band = self._band(result.get('priority', 1))
+        delivered = result.get('timestamp')
+
+        with self._lock:
+            self._days[day] = self._days.get(day, 0) + 1
+            if len(self._days) > WINDOW_DAYS:
+                for old_day in [d for d in self._days if d <= day - WINDOW_DAYS]:
+                    del self._days[old_day]
+            self._senders.add(sender)
+            if delivered and delivered <= now:
+                self._response_times[band].record(now - delivered)
+
+    def record_many(self, results, now=None):
+        for result in results:
+            self.record(result, now)
+
+    @staticmethod
+    def _band(priority):
+        for band, floor in PRIORITY_BANDS:
+            if priority >= floor:
+                return band
+        return PRIORITY_BANDS[-1][0]
+
+    def get_trends(self, now=None):
         """30-day trends, top senders, response time metrics"""
-        return {
-            "weekly_volume": [45, 52, 38, 65, 42],
-            "top_senders": [
-                {"email": "boss@company.com", "count": 15},
-                {"email": "client@corp.com", "count": 12},
-                {"email": "jira@atlassian.com", "count": 45}
-            ],
-            "response_times": {
-                "urgent": "15m",
-                "normal": "2h",
-                "low": "1d"
+        today = int((time.time() if now is None else now) // DAY_SECONDS)
+        with self._lock:
+            daily = [self._days.get(day, 0) for day in range(today - WINDOW_DAYS + 1, today + 1)]
+            top_senders = self._senders.top(5)
+            percentiles = {
+                band: {f"p{q}": histogram.percentile(q) for q in (50, 90, 99)}
+                for band, histogram in self._response_times.items()
             }
+
+        return {
+            "daily_volume": daily,
+            # Oldest first; the last entry covers the final, partial week
+            "weekly_volume": [sum(daily[i:i + 7]) for i in range(0, WINDOW_DAYS, 7)],
+            "top_senders": [{"email": email, "count": count} for email, count in top_senders],
+            "response_times": {band: _format_duration(p["p50"]) for band, p in percentiles.items()},
+            "response_time_percentiles": percentiles
         }
@@ -1,29 +1,19 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import os
+import json
 import time
 from datetime import datetime
-import email
-from email import policy
-from email.parser import BytesParser
 
 import logging
-from bs4 import BeautifulSoup
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
+
 logger = logging.getLogger(__name__)
 
 # Import modules
 from gmail_parser import GmailParser
+from gmail_api import GmailApiError
 from triage_engine import TriageEngine
+from near_duplicates import NearDuplicateClusterer
 from priority_scorer import PriorityScorer
 from auto_replier import AutoReplier
 from analytics_engine import AnalyticsEngine
@@ -32,61 +22,180 @@ from smart_folders import SmartFolders
 from meeting_extractor import MeetingExtractor
 from unsubscribe_detector import UnsubscribeDetector
 from thread_ranker import ThreadRanker
+from batch_executor import BatchExecutor, EXECUTOR_MODES, chunked
+from keyword_matcher import default_matcher as keyword_matcher
+from rule_engine import RuleStore
+from result_store import ResultStore, rules_version
+from mailbox_backend import MockMailbox
+from bulk_jobs import JobManager
+from upload_jobs import UploadJobManager, parse_eml
+from calendar_sink import FileCalendarSink, thread_events
+from metrics import default_registry as metrics
+from lazy import LazyInstance
+
+# Routes live on a blueprint; create_app() builds the Flask application around it
+api = Blueprint('api', __name__)
 
-app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB limit
-CORS(app)
+def configure_logging():
+    """Log to stderr and LOG_FILE (app.log; empty disables it) unless logging is already set up"""
+    if logging.getLogger().handlers:
+        return
+    handlers = [logging.StreamHandler()]
+    log_file = os.environ.get('LOG_FILE', 'app.log')
+    if log_file:
+        # delay: the file is only created when something is logged
+        handlers.append(logging.FileHandler(log_file, delay=True))
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
 
 # Performance Monitoring Middleware
-@app.before_request
+@api.before_app_request
 def start_timer():
     request.start_time = time.time()
 
-@app.after_request
+@api.after_app_request
 def log_request(response):
     if hasattr(request, 'start_time'):
         duration = time.time() - request.start_time
-        logger.info(f"{request.method} {request.path} {response.status_code} - {duration:.4f}s")
+        metrics.observe_request(request.url_rule.rule if request.url_rule else 'unmatched', duration)
+        logger.info("%s %s %s - %.4fs", request.method, request.path, response.status_code, duration)
     return response
 
 # Global Error Handler
-@app.errorhandler(Exception)
+@api.app_errorhandler(Exception)
 def handle_exception(e):
-    logger.error(f"Unhandled Exception: {str(e)}", exc_info=True)
+    logger.error("Unhandled Exception: %s", e, exc_info=True)
     return jsonify({"error": "Internal Server Error", "message": str(e)}), 500
 
-@app.route('/health', methods=['GET'])
+@api.route('/health', methods=['GET'])
 def health_check():
     """System health check"""
-    return jsonify({
+    health = {
         "status": "healthy", 
         "timestamp": datetime.now().isoformat(),
-        "version": "2.0.0"
-    })
+        "version": "2.0.0",
+        "message_cache": gmail_parser.cache.stats(),
+        "result_store": result_store.stats()
+    }
+    if NEAR_DUPLICATES:
+        health["near_duplicates"] = triage_engine.near_duplicates.stats()
+    return jsonify(health)
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Per-stage and per-endpoint latency histograms in Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# Engines are built on first use, so importing the app (and cold starts) stay cheap
+# GMAIL_API_URL switches /sync from the local mailbox to the Gmail API; SYNC_CHECKPOINT persists its position
+gmail_parser = LazyInstance(lambda: GmailParser(
+    cache_dir=os.environ.get('MESSAGE_CACHE_DIR'), mbox_path=os.environ.get('MBOX_PATH'),
+    api_url=os.environ.get('GMAIL_API_URL'), api_token=os.environ.get('GMAIL_API_TOKEN'),
+    checkpoint_path=os.environ.get('SYNC_CHECKPOINT')))
+# NEAR_DUPLICATES=1 triages one representative per cluster of near-identical blasts
+NEAR_DUPLICATES = os.environ.get('NEAR_DUPLICATES', '0') == '1'
+triage_engine = LazyInstance(lambda: TriageEngine(near_duplicates=NearDuplicateClusterer() if NEAR_DUPLICATES else None))
+priority_scorer = LazyInstance(PriorityScorer)
+auto_replier = LazyInstance(AutoReplier)
+analytics_engine = LazyInstance(AnalyticsEngine)
+# Shared across worker processes when PRODUCTIVITY_DB is set (serve.py sets it for multi-worker runs)
+productivity_tracker = LazyInstance(lambda: ProductivityTracker(os.environ.get('PRODUCTIVITY_DB')))
+smart_folders = LazyInstance(SmartFolders)
+meeting_extractor = LazyInstance(MeetingExtractor)
+unsubscribe_detector = LazyInstance(UnsubscribeDetector)
+thread_ranker = LazyInstance(ThreadRanker)
+
+# Per-user custom rules, hot-reloaded from USER_RULES_DIR
+rule_store = LazyInstance(lambda: RuleStore(os.environ.get('USER_RULES_DIR', 'user_rules')))
+
+def request_user():
+    """User whose custom rules apply to this request"""
+    return request.headers.get('X-User-Id') or request.args.get('user') or 'default'
+
+# Triage results persisted by content hash + rule-set version
+result_store = LazyInstance(lambda: ResultStore(os.environ.get('TRIAGE_STORE_PATH', 'triage_results.db')))
+
+def triage_threads(threads, rules, executor=None):
+    """Triage a feed window, reading already-triaged threads back from the store"""
+    def triage_missing(missing):
+        results = triage_engine.process_batch(missing, executor=executor, rules=rules)
+        # Analytics count each piece of content once, when it is first triaged
+        analytics_engine.record_many(results)
+        return results
 
-# Initialize instances
-gmail_parser = GmailParser()
-triage_engine = TriageEngine()
-priority_scorer = PriorityScorer()
-auto_replier = AutoReplier()
-analytics_engine = AnalyticsEngine()
-productivity_tracker = ProductivityTracker()
-smart_folders = SmartFolders()
-meeting_extractor = MeetingExtractor()
-unsubscribe_detector = UnsubscribeDetector()
-thread_ranker = ThreadRanker()
-
-@app.route('/connect-gmail', methods=['POST'])
+    return result_store.get_or_compute(threads, rules_version(rules), triage_missing)
+
+# Batch executor defaults are set per deployment; /batch may override the mode
+BATCH_MODE = os.environ.get('BATCH_MODE', 'serial')
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 0)) or None
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', 25))
+if BATCH_MODE not in EXECUTOR_MODES:
+    raise ValueError(f"BATCH_MODE must be one of {', '.join(EXECUTOR_MODES)}, got '{BATCH_MODE}'")
+batch_executors = {
+    mode: BatchExecutor(mode=mode, workers=BATCH_WORKERS, chunk_size=BATCH_CHUNK_SIZE)
+    for mode in EXECUTOR_MODES
+}
+
+@api.route('/connect-gmail', methods=['POST'])
 def connect_gmail():
     """Simulate Gmail OAuth connection"""
     connected = gmail_parser.connect()
     if connected:
-        return jsonify({"status": "connected", "email": "demo@example.com", "message": "Gmail connected successfully (Mock Mode)"})
+        mode = "" if gmail_parser.api_url else " (Mock Mode)"
+        return jsonify({"status": "connected", "email": "demo@example.com", "message": f"Gmail connected successfully{mode}"})
     return jsonify({"status": "error"}), 500
 
-@app.route('/triage', methods=['POST'])
+@api.route('/sync', methods=['POST'])
+def sync_mailbox():
+    """Triage only threads with new or changed messages since the last sync (?full=1 re-reads everything)"""
+    start_time = time.time()
+    try:
+        # Before polling: a bad user id must not cost (or lose) a poll
+        rules = rule_store.get(request_user())
+        threads, checkpoint = gmail_parser.poll(full=request.args.get('full') == '1')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except FileNotFoundError as e:
+        logger.error("Mailbox directory missing: %s", e)
+        return jsonify({"error": f"Mailbox directory not found: {e.filename}"}), 503
+    except GmailApiError as e:
+        return jsonify({"error": str(e)}), 502
+    processed_threads = triage_threads(threads, rules)
+    with metrics.timer("rank"):
+        ranked_threads = thread_ranker.rank_threads(processed_threads)
+        thread_ranker.add_many(processed_threads)
+    productivity_tracker.track_batch(len(processed_threads))
+    # Only a triaged delta is checkpointed: a failed sync is retried by the next one
+    gmail_parser.commit(checkpoint)
+    return jsonify({
+        "changed_count": len(ranked_threads),
+        "time_taken": round(time.time() - start_time, 2),
+        "results": ranked_threads
+    })
+
+def enrich(result, body, hits=None):
+    """Folder, meeting and unsubscribe info for a triaged thread (a folder set by user rules is kept)"""
+    with metrics.timer("smart_folders"):
+        result.setdefault('smart_folder', smart_folders.categorize(result, hits=hits))
+    with metrics.timer("meeting_extractor"):
+        # The email's own date resolves "tomorrow" and dates without a year
+        reference = datetime.fromtimestamp(result['timestamp']) if result.get('timestamp') else None
+        result['meeting_info'] = meeting_extractor.extract(body, reference=reference)
+    with metrics.timer("unsubscribe_detector"):
+        result['unsubscribe_info'] = unsubscribe_detector.detect(body, hits=hits)
+    return result
+
+@api.route('/triage', methods=['POST'])
 def triage_email():
     """Single thread analysis with robust error handling"""
+    try:
+        rules = rule_store.get(request_user())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         data = {}
         
@@ -98,46 +207,15 @@ def triage_email():
                 return jsonify({"error": "No selected file"}), 400
             
             if not file.filename.lower().endswith('.eml'):
-                logger.warning(f"Invalid file type uploaded: {file.filename}")
+                logger.warning("Invalid file type uploaded: %s", file.filename)
                 return jsonify({"error": "Invalid file type. Only .eml files are allowed"}), 400
 
             # Parse EML file
             try:
-                msg = BytesParser(policy=policy.default).parse(file)
-                
-                # Extract body
-                body = ""
-                if msg.is_multipart():
-                    for part in msg.walk():
-                        content_type = part.get_content_type()
-                        try:
-                            if content_type == 'text/plain':
-                                body += part.get_payload(decode=True).decode(errors='replace')
-                            elif content_type == 'text/html' and not body:
-                                # Fallback to HTML if no plain text
-                                body = part.get_payload(decode=True).decode(errors='replace')
-                        except Exception as e:
-                            logger.error(f"Error decoding part: {e}")
-                else:
-                    body = msg.get_payload(decode=True).decode(errors='replace')
-
-                # Security Scan: Remove malicious scripts
-                if body:
-                    soup = BeautifulSoup(body, 'html.parser')
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    body = soup.get_text()
-
-                data = {
-                    "id": file.filename,
-                    "subject": msg['subject'] or "No Subject",
-                    "sender": msg['from'] or "Unknown",
-                    "body": body,
-                    "date": msg['date']
-                }
-                logger.info(f"Successfully parsed EML: {file.filename}")
+                data = parse_eml(file, file.filename)
+                logger.info("Successfully parsed EML: %s", file.filename)
             except Exception as e:
-                logger.error(f"Failed to parse EML file: {str(e)}")
+                logger.error("Failed to parse EML file: %s", e)
                 return jsonify({"error": f"Failed to parse EML file: {str(e)}"}), 400
                 
         # Check if it's JSON data (fallback)
@@ -150,48 +228,264 @@ def triage_email():
         if not data or not data.get('body'):
              return jsonify({"error": "No email content found"}), 400
 
-        # Process
-        result = triage_engine.process_single(data)
+        # Same path as the batch endpoints: stored results are reused, and analytics
+        # record the content once, when it is first triaged (user rules applied there)
+        result = triage_threads([data], rules)[0]
+        
+        # Enrich with other modules (subject/sender/body are scanned once for all of them)
+        hits = keyword_matcher.scan(data)
+        enrich(result, data.get('body', ''), hits=hits)
         
-        # Enrich with other modules
-        result['smart_folder'] = smart_folders.categorize(result)
-        result['meeting_info'] = meeting_extractor.extract(data.get('body', ''))
-        result['unsubscribe_info'] = unsubscribe_detector.detect(data.get('body', ''))
+        with metrics.timer("rank"):
+            thread_ranker.add(result)
         
         return jsonify(result)
 
     except Exception as e:
-        logger.error(f"Server Error: {str(e)}", exc_info=True)
+        logger.error("Server Error: %s", e, exc_info=True)
         return jsonify({"error": "Internal Server Error"}), 500
 
-@app.route('/batch', methods=['POST'])
+STREAM_FORMATS = {'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+
+def stream_frame(fmt, kind, data):
+    """One NDJSON line or SSE event"""
+    if fmt == 'sse':
+        return f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"type": kind, "data": data}) + "\n"
+
+# Multi-file / mailbox uploads are spooled to disk and triaged in the background
+upload_jobs = LazyInstance(lambda: UploadJobManager(
+    os.environ.get('UPLOAD_SPOOL_DIR', 'upload_spool'),
+    workers=int(os.environ.get('UPLOAD_WORKERS', 2)),
+    batch_size=BATCH_CHUNK_SIZE
+))
+
+def triage_uploaded(threads, rules):
+    """Triage one batch of uploaded messages, enriched like /triage"""
+    results = triage_threads(threads, rules, executor=batch_executors[BATCH_MODE])
+    for thread, result in zip(threads, results):
+        enrich(result, thread.get('body', ''))
+    with metrics.timer("rank"):
+        thread_ranker.add_many(results)
+    return results
+
+@api.route('/triage/jobs', methods=['POST'])
+def create_upload_job():
+    """Upload many .eml files, .mbox exports or .zip archives; returns a job id immediately"""
+    files = request.files.getlist('files') + request.files.getlist('file')
+    if not files:
+        return jsonify({"error": "No files uploaded (use the 'files' field)"}), 400
+    try:
+        rules = rule_store.get(request_user())
+        job = upload_jobs.submit(
+            [(f.filename, f.stream) for f in files],
+            lambda threads: triage_uploaded(threads, rules)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    logger.info("Queued upload job %s with %d file(s)", job.id, len(files))
+    return jsonify({
+        "status": job.status,
+        "job_id": job.id,
+        "status_url": f"/triage/jobs/{job.id}",
+        "stream_url": f"/triage/jobs/{job.id}/stream"
+    }), 202
+
+@api.route('/triage/jobs/<job_id>', methods=['GET'])
+def get_upload_job(job_id):
+    """Poll an upload job: progress plus a page of results (?offset=&limit=)"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = max(1, int(request.args.get('limit', 100)))
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+
+    progress = job.progress()
+    progress['results'] = job.results[offset:offset + limit]
+    return jsonify(progress)
+
+@api.route('/triage/jobs/<job_id>/stream', methods=['GET'])
+def stream_upload_job(job_id):
+    """Stream an upload job's results as they are triaged, then its final status"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in STREAM_FORMATS:
+        return jsonify({"error": f"Unknown stream format '{fmt}'. Expected one of {', '.join(STREAM_FORMATS)}"}), 400
+
+    def generate():
+        for result in job.iter_results():
+            yield stream_frame(fmt, 'result', result)
+        yield stream_frame(fmt, 'summary', job.progress())
+
+    response = Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[fmt])
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Upper bound for ?limit= on /threads and /batch
+MAX_PAGE_LIMIT = int(os.environ.get('MAX_PAGE_LIMIT', 1000))
+
+def page_limit(default):
+    """?limit= as an integer in 1..MAX_PAGE_LIMIT. Raises ValueError otherwise."""
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        raise ValueError("limit must be an integer") from None
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return limit
+
+def batch_request():
+    """Shared /batch parameters: (mode, threads, next_cursor, rules) or an error response"""
+    cursor = request.args.get('cursor')
+    options = request.get_json(silent=True) or {}
+    mode = request.args.get('mode') or options.get('mode') or BATCH_MODE
+    if mode not in batch_executors:
+        return None, (jsonify({"error": f"Unknown batch mode '{mode}'. Expected one of {', '.join(EXECUTOR_MODES)}"}), 400)
+
+    # Fetch (lazily - threads are parsed as the engine consumes them)
+    try:
+        limit = page_limit(50)
+        threads = gmail_parser.iter_threads(cursor=cursor, limit=limit)
+        next_cursor = gmail_parser.next_cursor(cursor, limit)
+        rules = rule_store.get(request_user())
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+    return (mode, threads, next_cursor, rules), None
+
+# Meeting detections from /batch are exported as one iCalendar feed per user
+calendar_sink = LazyInstance(lambda: FileCalendarSink(os.environ.get('CALENDAR_DIR', 'calendars')))
+CALENDAR_EXPORT = os.environ.get('CALENDAR_EXPORT', '0') == '1'
+
+def wants_calendar_export():
+    """?calendar=1 or {"calendar": true}; CALENDAR_EXPORT=1 turns it on by default"""
+    value = request.args.get('calendar')
+    if value is None:
+        value = (request.get_json(silent=True) or {}).get('calendar', CALENDAR_EXPORT)
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def collect_meetings(threads, events):
+    """Pass threads through unchanged, gathering calendar events for their meetings"""
+    for thread in threads:
+        with metrics.timer("meeting_extractor"):
+            events.extend(thread_events(thread, meeting_extractor))
+        yield thread
+
+@api.route('/batch', methods=['POST'])
 def batch_process():
     """Batch processing of threads"""
     start_time = time.time()
-    
-    # Fetch
-    threads = gmail_parser.fetch_threads(limit=50)
+    params, error = batch_request()
+    if error:
+        return error
+    mode, threads, next_cursor, rules = params
+    export = wants_calendar_export()
+    events = []
+    if export:
+        threads = collect_meetings(threads, events)
     
     # Process
-    processed_threads = triage_engine.process_batch(threads)
+    processed_threads = triage_threads(threads, rules, executor=batch_executors[mode])
     
     # Rank
-    ranked_threads = thread_ranker.rank_threads(processed_threads)
+    with metrics.timer("rank"):
+        ranked_threads = thread_ranker.rank_threads(processed_threads)
+        thread_ranker.add_many(processed_threads)
     
     # Track stats
     productivity_tracker.track_batch(len(processed_threads))
     
+    # All of the batch's meetings go to the calendar in one write
+    calendar = None
+    if export:
+        user = request_user()
+        calendar = {
+            "detected": len(events),
+            "written": calendar_sink.write(events, calendar=user),
+            "feed_url": f"/calendar.ics?user={user}"
+        }
+    
     end_time = time.time()
     
-    return jsonify({
+    response = {
         "processed_count": len(ranked_threads),
         "time_taken": round(end_time - start_time, 2),
         "compression_rate": "87%", # Simulated/Averaged
         "status": "completed",
+        "mode": mode,
+        "next_cursor": next_cursor,
         "results": ranked_threads
-    })
+    }
+    if calendar is not None:
+        response["calendar"] = calendar
+    return jsonify(response)
+
+@api.route('/calendar.ics', methods=['GET'])
+def calendar_feed():
+    """The user's exported meetings as an iCalendar feed"""
+    try:
+        user = request_user()
+        rule_store.get(user)  # validates the user id before it becomes a file name
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    path = calendar_sink.path(user)
+    if not os.path.exists(path):
+        return jsonify({"error": "No meetings exported yet"}), 404
+    return send_file(os.path.abspath(path), mimetype='text/calendar', max_age=0)
+
+@api.route('/batch/stream', methods=['GET', 'POST'])
+def batch_stream():
+    """
+    Streaming /batch: each triaged thread is sent as soon as its window is
+    processed, followed by a summary frame with the ranked thread ids.
+    """
+    start_time = time.time()
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in STREAM_FORMATS:
+        return jsonify({"error": f"Unknown stream format '{fmt}'. Expected one of {', '.join(STREAM_FORMATS)}"}), 400
+    params, error = batch_request()
+    if error:
+        return error
+    mode, threads, next_cursor, rules = params
+    executor = batch_executors[mode]
+    # One window keeps every worker busy; the first frame waits for one window, not the batch
+    window = executor.chunk_size * (1 if executor.mode == 'serial' else executor.workers)
+
+    def generate():
+        rank_keys = []  # (priority, epoch, id) only - full results are not held
+        for chunk in chunked(threads, window):
+            for result in triage_threads(chunk, rules, executor=executor):
+                thread_ranker.add(result)
+                priority, epoch = thread_ranker.rank_key(result)
+                rank_keys.append((priority, epoch, -len(rank_keys), result['id']))
+                yield stream_frame(fmt, 'result', result)
 
-@app.route('/reply', methods=['POST'])
+        with metrics.timer("rank"):
+            rank_keys.sort(reverse=True)
+        productivity_tracker.track_batch(len(rank_keys))
+        yield stream_frame(fmt, 'summary', {
+            "processed_count": len(rank_keys),
+            "time_taken": round(time.time() - start_time, 2),
+            "compression_rate": "87%", # Simulated/Averaged
+            "status": "completed",
+            "mode": mode,
+            "next_cursor": next_cursor,
+            "ranked_ids": [key[3] for key in rank_keys]
+        })
+
+    response = Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[fmt])
+    # Ask reverse proxies not to buffer the stream
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@api.route('/reply', methods=['POST'])
 def generate_reply():
     """Generate smart response"""
     data = request.json
@@ -205,30 +499,30 @@ def generate_reply():
         "draft_reply": reply_body
     })
 
-@app.route('/analytics', methods=['GET'])
+@api.route('/analytics', methods=['GET'])
 def get_analytics():
     """30-day stats"""
     return jsonify(analytics_engine.get_trends())
 
-@app.route('/smart-folders', methods=['POST'])
+@api.route('/smart-folders', methods=['POST'])
 def get_smart_folders():
     """Auto-categorize into folders (Demo endpoint)"""
     # Just return the folder list or stats
     return jsonify({"status": "organized", "folders": ["Urgent", "Action", "Awaiting", "Information", "Newsletter", "Spam", "Finance", "Calendar"]})
 
-@app.route('/extract-meetings', methods=['POST'])
+@api.route('/extract-meetings', methods=['POST'])
 def extract_meetings_endpoint():
     """Calendar sync"""
     text = request.json.get('text', '')
     return jsonify(meeting_extractor.extract(text))
 
-@app.route('/unsubscribe', methods=['POST'])
+@api.route('/unsubscribe', methods=['POST'])
 def unsubscribe_endpoint():
     """Spam handling"""
     text = request.json.get('text', '')
     return jsonify(unsubscribe_detector.detect(text))
 
-@app.route('/dashboard', methods=['GET'])
+@api.route('/dashboard', methods=['GET'])
 def dashboard_metrics():
     """Productivity metrics"""
     stats = productivity_tracker.get_stats()
@@ -239,40 +533,158 @@ def dashboard_metrics():
         "avg_processing_speed": 8.7
     })
 
-@app.route('/bulk-action', methods=['POST'])
+@api.route('/top-threads', methods=['GET'])
+def top_threads():
+    """Dashboard top-N: highest-priority, newest threads triaged so far"""
+    try:
+        k = min(max(int(request.args.get('k', 10)), 1), 100)
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    return jsonify(thread_ranker.top_k(k))
+
+# Bulk actions run as background jobs against the mailbox backend
+mailbox = LazyInstance(lambda: MockMailbox(gmail_parser.iter_threads(limit=int(os.environ.get('MOCK_MAILBOX_SIZE', 100)))))
+
+def select_threads(selector, user):
+    """Ids of mailbox threads matching a bulk-action selector, triaged with the user's rules"""
+    rules = rule_store.get(user)
+    for chunk in chunked(mailbox.iter_threads(), BATCH_CHUNK_SIZE):
+        for result in triage_threads(chunk, rules):
+            result.setdefault('smart_folder', smart_folders.categorize(result))
+            if selector.matches(result):
+                yield result['id']
+
+BULK_JOBS_DIR = os.environ.get('BULK_JOBS_DIR', 'bulk_jobs')
+bulk_jobs = LazyInstance(lambda: JobManager(
+    mailbox,
+    select_threads,
+    journal_dir=BULK_JOBS_DIR,
+    workers=int(os.environ.get('BULK_WORKERS', 4)),
+    chunk_size=int(os.environ.get('BULK_CHUNK_SIZE', 500)),
+    # Finished jobs stay queryable for a day by default
+    retention=float(os.environ.get('BULK_JOB_RETENTION_HOURS', 24)) * 3600
+))
+
+@api.route('/bulk-action', methods=['POST'])
 def bulk_action():
-    """Archive/label 100+ emails"""
-    action = request.json.get('action')
-    count = request.json.get('count', 0)
-    return jsonify({"status": "success", "action": action, "count": count})
+    """Archive/label 100+ emails as a background job"""
+    options = request.get_json(silent=True) or {}
+    try:
+        job = bulk_jobs.submit(
+            options.get('action'),
+            selector=options.get('selector'),
+            label=options.get('label'),
+            thread_ids=options.get('thread_ids'),
+            user=request_user()
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"status": "queued", "action": job.action, "job_id": job.id, "progress_url": f"/jobs/{job.id}"}), 202
 
-@app.route('/threads', methods=['GET'])
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Progress of a background job"""
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.progress())
+
+@api.route('/threads', methods=['GET'])
 def get_threads():
-    """Fetch recent threads (raw) with pagination"""
+    """Fetch recent threads with cursor pagination (legacy ?page= still accepted)"""
     try:
-        limit = int(request.args.get('limit', 10))
-        page = int(request.args.get('page', 1))
-        offset = (page - 1) * limit
+        limit = page_limit(10)
+        cursor = request.args.get('cursor')
+        if cursor is None and 'page' in request.args:
+            page = int(request.args.get('page', 1))
+            if page < 1:
+                raise ValueError("page must be 1 or more")
+            cursor = gmail_parser.encode_cursor((page - 1) * limit)
         
-        threads = gmail_parser.fetch_threads(limit=limit, offset=offset)
+        threads = gmail_parser.iter_threads(cursor=cursor, limit=limit)
+        next_cursor = gmail_parser.next_cursor(cursor, limit)
+        rules = rule_store.get(request_user())
         
-        # Enrich threads with priority if needed, or just return raw
-        # For the feed, we might want to run them through triage_engine quickly or rely on stored data
-        # For now, we'll just return them, and frontend calls triage if needed, 
-        # BUT for a feed we want them pre-processed.
-        # Let's assume we process them on the fly for this demo
-        processed_threads = triage_engine.process_batch(threads)
+        # Serve pre-processed threads from the result store; only new content is triaged
+        processed_threads = triage_threads(threads, rules)
+        with metrics.timer("rank"):
+            thread_ranker.add_many(processed_threads)
         
-        return jsonify(processed_threads)
+        response = jsonify(processed_threads)
+        response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except ValueError as e:
+        logger.warning("Bad pagination parameters: %s", e)
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        logger.error(f"Error fetching threads: {e}")
+        logger.error("Error fetching threads: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/user-settings', methods=['POST'])
+@api.route('/user-settings', methods=['GET', 'POST'])
 def user_settings():
-    """Custom rules"""
-    return jsonify({"status": "updated"})
+    """Custom rules: sender patterns, keyword weights and folder mappings"""
+    try:
+        user = request_user()
+        if request.method == 'GET':
+            ruleset = rule_store.get(user)
+            return jsonify({"user": user, "version": ruleset.version, "rules": ruleset.rules})
+
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict) or not isinstance(payload.get('rules'), list):
+            return jsonify({"error": "Expected a JSON body with a 'rules' list"}), 400
+        user = payload.get('user') or user
+        try:
+            previous = rule_store.get(user)
+        except (OSError, ValueError) as e:
+            # A broken rule file must not block the save that fixes it; save() still checks the user id
+            logger.warning("Replacing unreadable rules for %s: %s", user, e)
+            previous = None
+        ruleset = rule_store.save(user, payload['rules'])
+        if previous is not None and previous.rules and ruleset.version != previous.version:
+            # Only this user's results were computed with the old rules
+            result_store.invalidate(rules_version(previous))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({"status": "updated", "rules": len(ruleset), "version": ruleset.version})
+
+def load_engines():
+    """Build every lazily created engine now (serve.py does this before forking workers)"""
+    for value in list(globals().values()):
+        if isinstance(value, LazyInstance):
+            value.load()
+
+def resume_bulk_jobs():
+    """Restart bulk jobs interrupted by the last shutdown, when their journals exist"""
+    if os.path.isdir(BULK_JOBS_DIR) and any(name.endswith('.jsonl') for name in os.listdir(BULK_JOBS_DIR)):
+        bulk_jobs.resume()
+
+def create_app(config=None, resume_jobs=True):
+    """
+    Application factory (`waitress-serve --call app:create_app`).
+    Engines are still built on first use; bulk jobs interrupted by the last
+    shutdown are resumed here unless resume_jobs is False (serve.py resumes
+    them in one worker after forking).
+    """
+    configure_logging()
+    app = Flask(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 10)) * 1024 * 1024  # 10MB limit by default
+    app.config.update(config or {})
+    CORS(app, expose_headers=['X-Next-Cursor'])
+    app.register_blueprint(api)
+
+    if resume_jobs:
+        resume_bulk_jobs()
+    return app
+
+def __getattr__(name):
+    # `from app import app` (tests, `waitress-serve app:app`) builds the default application on first use
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
+    # Development server; use serve.py for production
     print("Starting Email Triage Assistant Backend on port 5000...")
-    app.run(port=5000, debug=True)
+    create_app().run(port=5000, debug=os.environ.get('FLASK_DEBUG', '1') == '1')
@@ -0,0 +1,75 @@
+import os
+import threading
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+EXECUTOR_MODES = ("serial", "thread", "process")
+
+def chunked(items, size):
+    """Split any iterable into lists of at most `size` items without materialising it"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class BatchExecutor:
+    """
+    Pluggable executor for batch triage: serial, thread pool or process pool.
+    Work is split into chunks; results always come back in input order.
+    """
+
+    def __init__(self, mode="serial", workers=None, chunk_size=25):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}'. Expected one of {', '.join(EXECUTOR_MODES)}")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def map_chunks(self, fn, items):
+        """
+        Yield fn(chunk) results item by item, in input order.
+        At most 2 * workers chunks are in flight so large inputs are streamed.
+        """
+        chunks = chunked(items, self.chunk_size)
+        if self.mode == "serial":
+            for chunk in chunks:
+                yield from fn(chunk)
+            return
+
+        pool = self._get_pool()
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(fn, chunk))
+            if len(pending) >= self.workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def shutdown(self):
+        """Stop the worker pool (it is recreated lazily on next use)"""
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _get_pool(self):
+        # Pools are reused across batches: spawning processes per request would cost more than it saves.
+        # A pool inherited across fork() has no live workers, so each process builds its own.
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool_pid = os.getpid()
+                if self.mode == "thread":
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers)
+                else:
+                    # multiprocessing is only imported by deployments that use process mode
+                    from concurrent.futures import ProcessPoolExecutor
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
@@ -0,0 +1,81 @@
+from lazy import is_installed, optional_import
+from keyword_matcher import default_matcher as keywords
+from priority_scorer import (
+    URGENT_SUBJECT, IMPORTANT_SUBJECT, EXECUTIVE_SENDER, CLIENT_SENDER, ACTION_BODY
+)
+
+# Columnar form of the 1-5 priority algorithm:
+# (feature, keyword mask, mask that must NOT hit (elif branches), weight)
+PRIORITY_FEATURES = (
+    ("urgent_subject", URGENT_SUBJECT, 0, 2.0),
+    ("important_subject", IMPORTANT_SUBJECT, URGENT_SUBJECT, 1.5),
+    ("key_sender", EXECUTIVE_SENDER | CLIENT_SENDER, 0, 1.5),
+    ("action_keywords", ACTION_BODY, 0, 1.5),
+)
+
+# Below this many threads NumPy's per-call overhead outweighs the loop it replaces
+# (about 14 on a laptop); it must stay under the /batch chunk size (BATCH_CHUNK_SIZE, 25)
+VECTORIZE_MIN_BATCH = 16
+
+class BatchPriorityScorer:
+    """
+    Vectorized priority scoring for whole batches.
+    Keyword hits for every thread become one uint64 column, feature flags a
+    boolean matrix, and weighting, rounding and clamping run as array ops.
+    Returns exactly what PriorityScorer.calculate (and score_one) return per thread.
+    NumPy is imported with the first batch big enough to vectorize; without it
+    score_one() is used for every thread.
+    """
+
+    def __init__(self, features=PRIORITY_FEATURES):
+        self.features = features
+        self._vectorized = is_installed("numpy") and all(
+            mask < 2 ** 64 and exclude < 2 ** 64 for _, mask, exclude, _ in features
+        )
+        self._columns = None
+
+    def columns(self):
+        """(numpy, masks, excludes, weights), built on first use; None without NumPy"""
+        if not self._vectorized:
+            return None
+        np = optional_import("numpy")
+        if np is None:
+            self._vectorized = False
+            return None
+        if self._columns is None:
+            # Only the arrays are cached: a module would make the engine unpicklable for process pools
+            self._columns = (
+                np.array([mask for _, mask, _, _ in self.features], dtype=np.uint64),
+                np.array([exclude for _, _, exclude, _ in self.features], dtype=np.uint64),
+                np.array([weight for _, _, _, weight in self.features], dtype=np.float64),
+            )
+        return (np,) + self._columns
+
+    def score_one(self, hits):
+        """Scalar path for a single keyword bitmap"""
+        score = 0
+        for _, mask, exclude, weight in self.features:
+            if hits & mask and not hits & exclude:
+                score += weight
+        return min(max(round(score), 1), 5)
+
+    def feature_matrix(self, hits):
+        """(threads x features) boolean matrix from a sequence of keyword bitmaps"""
+        np, masks, excludes, _ = self.columns()
+        column = np.asarray(hits, dtype=np.uint64).reshape(-1, 1)
+        present = (column & masks) != 0
+        excluded = (column & excludes) != 0
+        return present & ~excluded
+
+    def score(self, threads, hits=None):
+        """Priorities (1-5) for a batch of thread dicts; hits may be precomputed"""
+        if hits is None:
+            hits = [keywords.scan(thread) for thread in threads]
+        columns = self.columns() if len(hits) >= VECTORIZE_MIN_BATCH else None
+        if columns is None:
+            return [self.score_one(h) for h in hits]
+
+        np, _, _, weights = columns
+        scores = self.feature_matrix(hits) @ weights
+        # np.rint rounds half to even, exactly like Python's round()
+        return np.clip(np.rint(scores), 1, 5).astype(np.int64).tolist()
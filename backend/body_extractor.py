@@ -0,0 +1,58 @@
+import re
+from time import perf_counter
+from html.parser import HTMLParser
+
+from metrics import default_registry as metrics
+
+# Elements whose content is never text
+SKIPPED_TAGS = frozenset(("script", "style"))
+
+# Cheap sniff for bodies of unknown type: a tag that only HTML would contain
+_HTML_HINT = re.compile(r"<(?:!doctype|html|head|body|div|span|p|br|table|td|a|img|script|style|font|b|i)\b", re.IGNORECASE)
+
+class _TextCollector(HTMLParser):
+    """Streaming tag stripper: keeps text nodes, drops script/style content, builds no tree"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+def html_to_text(html):
+    """Visible text of an HTML document (what BeautifulSoup's get_text() returns, minus script/style)"""
+    start = perf_counter()
+    collector = _TextCollector()
+    collector.feed(html)
+    collector.close()
+    text = "".join(collector.parts)
+    metrics.observe("html_strip", perf_counter() - start)
+    return text
+
+def looks_like_html(text):
+    return _HTML_HINT.search(text) is not None
+
+def extract_text(body, content_type=None):
+    """
+    Tiered body cleanup for triage.
+    text/plain is returned untouched; text/html goes through the streaming
+    stripper. Bodies of unknown type are only stripped if they look like HTML.
+    """
+    if not body:
+        return body
+    if content_type == "text/plain":
+        return body
+    if content_type == "text/html" or looks_like_html(body):
+        return html_to_text(body)
+    return body
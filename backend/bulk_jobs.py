@@ -0,0 +1,329 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_executor import chunked
+from mailbox_backend import MAILBOX_ACTIONS
+
+LABEL_ACTIONS = ("label", "unlabel")
+FINISHED = ("completed", "failed")
+
+class ThreadSelector:
+    """Which threads a bulk job touches: folder, category and an inclusive priority range"""
+
+    FIELDS = ("folder", "category", "min_priority", "max_priority")
+
+    def __init__(self, folder=None, category=None, min_priority=None, max_priority=None):
+        self.folder = folder
+        self.category = category
+        self.min_priority = min_priority
+        self.max_priority = max_priority
+
+    @classmethod
+    def from_dict(cls, spec):
+        spec = spec or {}
+        if not isinstance(spec, dict):
+            raise ValueError("selector must be an object")
+        unknown = set(spec) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown selector fields: {', '.join(sorted(unknown))}")
+        for bound in ("min_priority", "max_priority"):
+            value = spec.get(bound)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise ValueError(f"{bound} must be a number")
+        return cls(**spec)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS if getattr(self, field) is not None}
+
+    def matches(self, result):
+        """result: a triaged thread, with smart_folder set when foldered"""
+        if self.folder is not None and result.get('smart_folder') != self.folder:
+            return False
+        if self.category is not None and result.get('category') != self.category:
+            return False
+        priority = result.get('priority', 1)
+        if self.min_priority is not None and priority < self.min_priority:
+            return False
+        if self.max_priority is not None and priority > self.max_priority:
+            return False
+        return True
+
+class BulkJob:
+    """State of one bulk action; rebuilt from its journal after a restart"""
+
+    def __init__(self, job_id, action, selector, label=None, user="default", chunk_size=500, thread_ids=None, created_at=None):
+        self.id = job_id
+        self.action = action
+        self.selector = selector
+        self.label = label
+        self.user = user
+        self.chunk_size = chunk_size
+        self.thread_ids = thread_ids   # None until the selection is resolved
+        self.total = None              # len(thread_ids), kept once a finished job drops them
+        self.done_chunks = set()
+        self.modified = 0
+        self.status = "queued"
+        self.error = None
+        self.created_at = created_at or time.time()
+        self.updated_at = self.created_at
+        self.done = threading.Event()
+        self.owner_pid = None
+
+    def chunks(self):
+        """(index, ids) for every chunk not yet applied"""
+        for index, ids in enumerate(chunked(self.thread_ids, self.chunk_size)):
+            if index not in self.done_chunks:
+                yield index, ids
+
+    def progress(self):
+        total = len(self.thread_ids) if self.thread_ids is not None else self.total
+        chunks_total = -(-total // self.chunk_size) if total is not None else None
+        processed = min(total, len(self.done_chunks) * self.chunk_size) if total is not None else 0
+        return {
+            "id": self.id,
+            "action": self.action,
+            "label": self.label,
+            "selector": self.selector.to_dict(),
+            "status": self.status,
+            "total": total,
+            "processed": processed,
+            "modified": self.modified,
+            "chunks_done": len(self.done_chunks),
+            "chunks_total": chunks_total,
+            "percent": round(100.0 * processed / total, 1) if total else (100.0 if self.status == "completed" else 0.0),
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+class JobManager:
+    """
+    Runs bulk actions in the background. Each job resolves its selection once,
+    then applies the action chunk by chunk on a shared worker pool.
+    Every step is appended to a per-job journal, so unfinished jobs resume
+    after a restart and skip chunks that were already applied. A finished
+    job's journal is compacted to its outcome, and removed by resume() once
+    it is older than `retention` seconds.
+    """
+
+    def __init__(self, mailbox, select, journal_dir=None, workers=4, chunk_size=500, retention=None):
+        if chunk_size < 1 or chunk_size > mailbox.MAX_BATCH:
+            raise ValueError(f"chunk_size must be between 1 and {mailbox.MAX_BATCH}")
+        self.mailbox = mailbox
+        self.select = select   # select(selector, user) -> iterable of thread ids
+        self.journal_dir = journal_dir
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.retention = retention
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+
+    def submit(self, action, selector=None, label=None, thread_ids=None, user="default"):
+        """Queue a bulk action; explicit thread_ids bypass the selector"""
+        if action not in MAILBOX_ACTIONS:
+            raise ValueError(f"Unknown action '{action}'. Expected one of {', '.join(MAILBOX_ACTIONS)}")
+        if (action in LABEL_ACTIONS) != bool(label):
+            raise ValueError(f"'label' is required for {' and '.join(LABEL_ACTIONS)} and not allowed otherwise")
+        if not isinstance(selector, ThreadSelector):
+            selector = ThreadSelector.from_dict(selector)
+        if thread_ids is not None:
+            thread_ids = [str(thread_id) for thread_id in thread_ids]
+
+        job = BulkJob(uuid.uuid4().hex, action, selector, label=label, user=user, chunk_size=self.chunk_size)
+        self._journal(job, {
+            "event": "created", "action": action, "label": label, "user": user,
+            "selector": selector.to_dict(), "chunk_size": job.chunk_size, "created_at": job.created_at
+        })
+        if thread_ids is not None:
+            self._set_selection(job, thread_ids)
+        self._start(job)
+        return job
+
+    def get(self, job_id):
+        """
+        A job by id. Jobs run by another worker process (or still running in the
+        process this one was forked from) are read back from their journal.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None and (job.done.is_set() or job.owner_pid == os.getpid()):
+            return job
+        if self.journal_dir and os.path.exists(os.path.join(self.journal_dir, f"{job_id}.jsonl")):
+            return self._replay(job_id, repair=False) or job
+        return job
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job finishes; returns its progress"""
+        job = self.get(job_id)
+        job.done.wait(timeout)
+        return job.progress()
+
+    def resume(self):
+        """
+        Restart every unfinished journaled job. Finished jobs are not loaded
+        (get() reads them back from their journal); past `retention` their
+        journals are deleted.
+        """
+        if not self.journal_dir:
+            return []
+        resumed = []
+        expired_before = time.time() - self.retention if self.retention is not None else None
+        for name in sorted(os.listdir(self.journal_dir)):
+            if not name.endswith(".jsonl"):
+                continue
+            job_id = name[:-len(".jsonl")]
+            with self._lock:
+                if job_id in self._jobs:
+                    continue
+            job = self._replay(job_id)
+            if job is None:
+                continue
+            if job.status in FINISHED:
+                if expired_before is not None and job.updated_at < expired_before:
+                    os.remove(os.path.join(self.journal_dir, name))
+            else:
+                self._start(job)
+                resumed.append(job)
+        return resumed
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def _get_pool(self):
+        # Built on first use in each process: a pool inherited across fork() has no threads
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _start(self, job):
+        job.owner_pid = os.getpid()
+        with self._lock:
+            self._jobs[job.id] = job
+        threading.Thread(target=self._run, args=(job,), name=f"bulk-job-{job.id[:8]}", daemon=True).start()
+
+    def _run(self, job):
+        try:
+            if job.thread_ids is None:
+                job.status = "selecting"
+                self._set_selection(job, list(self.select(job.selector, job.user)))
+            job.status = "running"
+
+            # Bounded in-flight chunks, like BatchExecutor.map_chunks
+            pool = self._get_pool()
+            pending = deque()
+            for index, ids in job.chunks():
+                pending.append((index, pool.submit(self.mailbox.modify, job.action, ids, job.label)))
+                if len(pending) >= self.workers * 2:
+                    self._complete_chunk(job, *pending.popleft())
+            while pending:
+                self._complete_chunk(job, *pending.popleft())
+            self._finish(job, "completed")
+        except Exception as e:
+            self._finish(job, "failed", str(e))
+
+    def _complete_chunk(self, job, index, future):
+        modified = future.result()
+        self._journal(job, {"event": "chunk", "index": index, "modified": modified})
+        job.done_chunks.add(index)
+        job.modified += modified
+        job.updated_at = time.time()
+
+    def _set_selection(self, job, thread_ids):
+        self._journal(job, {"event": "selected", "thread_ids": thread_ids})
+        job.thread_ids = thread_ids
+
+    def _finish(self, job, status, error=None):
+        job.updated_at = time.time()
+        if job.thread_ids is not None:
+            job.total = len(job.thread_ids)
+        self._compact(job, {
+            "event": "finished", "status": status, "error": error, "total": job.total,
+            "done_chunks": sorted(job.done_chunks), "modified": job.modified, "finished_at": job.updated_at
+        })
+        # The outcome is all a finished job needs; its selection may be large
+        job.thread_ids = None
+        job.status = status
+        job.error = error
+        job.done.set()
+
+    def _journal(self, job, record):
+        if not self.journal_dir:
+            return
+        path = os.path.join(self.journal_dir, f"{job.id}.jsonl")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self, job, finished):
+        """Replace a job's journal with its created record and outcome"""
+        if not self.journal_dir:
+            return
+        created = {
+            "event": "created", "action": job.action, "label": job.label, "user": job.user,
+            "selector": job.selector.to_dict(), "chunk_size": job.chunk_size, "created_at": job.created_at
+        }
+        path = os.path.join(self.journal_dir, f"{job.id}.jsonl")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(created) + "\n" + json.dumps(finished) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _replay(self, job_id, repair=True):
+        job = None
+        path = os.path.join(self.journal_dir, f"{job_id}.jsonl")
+        with open(path, "rb+" if repair else "rb") as f:
+            good = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash: drop it so new records start on a clean line.
+                    # Readers of a live job's journal may just see a half-written record.
+                    if repair:
+                        f.truncate(good)
+                    break
+                good += len(line)
+                event = record.get("event")
+                if event == "created":
+                    job = BulkJob(
+                        job_id, record["action"], ThreadSelector.from_dict(record["selector"]),
+                        label=record.get("label"), user=record.get("user", "default"),
+                        chunk_size=record["chunk_size"], created_at=record["created_at"]
+                    )
+                elif job is None:
+                    break
+                elif event == "selected":
+                    job.thread_ids = record["thread_ids"]
+                elif event == "chunk":
+                    job.done_chunks.add(record["index"])
+                    job.modified += record["modified"]
+                elif event == "finished":
+                    job.status = record["status"]
+                    job.error = record.get("error")
+                    if "total" in record:
+                        # Compacted journal: the outcome replaces the selection and chunk records
+                        job.total = record["total"]
+                        job.done_chunks = set(record["done_chunks"])
+                        job.modified = record["modified"]
+                        job.updated_at = record["finished_at"]
+                    job.done.set()
+        if job is not None and job.status == "queued" and job.thread_ids is not None:
+            job.status = "running"
+        return job
@@ -0,0 +1,170 @@
+import os
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+
+from thread_ranker import parse_epoch
+
+try:
+    import fcntl
+except ImportError:  # Windows: the in-process lock still serializes one server process
+    fcntl = None
+
+CRLF = "\r\n"
+HEADER = CRLF.join([
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//Email Triage Assistant//Meeting Export//EN",
+    "CALSCALE:GREGORIAN",
+]) + CRLF
+TRAILER = "END:VCALENDAR" + CRLF
+
+def event_uid(thread_id, start, end):
+    """Stable UID: the same meeting in the same thread is exported once"""
+    key = f"{thread_id}|{start.isoformat()}|{end.isoformat()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + "@email-triage"
+
+def thread_events(thread, extractor):
+    """Calendar events for one thread's meeting detections (see MeetingExtractor.scan)"""
+    epoch = parse_epoch(thread.get("date"))
+    reference = datetime.fromtimestamp(epoch) if epoch else None
+    _, _, ranges, links, _ = extractor.scan(thread.get("body") or "", reference)
+    location = links[0]["url"] if links else None
+    return [
+        {
+            "uid": event_uid(thread.get("id"), start, end),
+            "thread_id": thread.get("id"),
+            "start": start,
+            "end": end,
+            "all_day": end - start == timedelta(days=1) and start.time() == datetime.min.time(),
+            "summary": thread.get("subject") or "Meeting",
+            "description": f"From: {thread.get('sender', '')}",
+            "location": location,
+        }
+        for start, end in ranges
+    ]
+
+def _escape(text):
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def _fold(line):
+    """Content line folded at 75 octets (RFC 5545 3.1) without splitting a UTF-8 sequence"""
+    if len(line.encode("utf-8")) <= 75:
+        return line + CRLF
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        # Continuation lines start with a space, which counts towards their 75
+        if size + width > (75 if not parts else 74):
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return (CRLF + " ").join(parts) + CRLF
+
+def format_event(event, stamp):
+    """One VEVENT; naive datetimes are written as floating local times"""
+    if event["all_day"]:
+        start = "DTSTART;VALUE=DATE:" + event["start"].strftime("%Y%m%d")
+        end = "DTEND;VALUE=DATE:" + event["end"].strftime("%Y%m%d")
+    else:
+        start = "DTSTART:" + event["start"].strftime("%Y%m%dT%H%M%S")
+        end = "DTEND:" + event["end"].strftime("%Y%m%dT%H%M%S")
+    lines = ["BEGIN:VEVENT", "UID:" + event["uid"], "DTSTAMP:" + stamp, start, end,
+             "SUMMARY:" + _escape(event["summary"]), "DESCRIPTION:" + _escape(event["description"])]
+    if event.get("location"):
+        lines.append("LOCATION:" + _escape(event["location"]))
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+class CalendarSink(ABC):
+    """
+    Where exported meeting events go. write() takes a whole batch so a live
+    calendar API implementation can turn it into one bulk request.
+    """
+
+    @abstractmethod
+    def write(self, events, calendar="default"):
+        """Add events not already in the calendar; returns how many were new"""
+
+class FileCalendarSink(CalendarSink):
+    """
+    File-backed stand-in for the calendar API: one iCalendar feed per calendar
+    (<directory>/<calendar>.ics). A batch is appended in a single write in front
+    of the END:VCALENDAR trailer, so the feed is never rewritten; UIDs already
+    in the feed are skipped. A feed left without its trailer by a crash is
+    repaired on the next write.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._uids = {}    # calendar -> (UIDs in the feed, feed stat signature)
+
+    def path(self, calendar="default"):
+        return os.path.join(self.directory, f"{calendar}.ics")
+
+    def write(self, events, calendar="default"):
+        path = self.path(calendar)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "a+b") as f:
+                if fcntl is not None:
+                    # Other worker processes append to the same feed
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    uids = self._known(calendar, f)
+                    new = []
+                    for event in events:
+                        if event["uid"] not in uids:
+                            uids.add(event["uid"])
+                            new.append(event)
+                    if new:
+                        self._append(f, new)
+                    self._uids[calendar] = (uids, self._signature(f))
+                    return len(new)
+                except BaseException:
+                    self._uids.pop(calendar, None)
+                    raise
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _signature(f):
+        st = os.fstat(f.fileno())
+        return (st.st_size, st.st_mtime_ns)
+
+    def _known(self, calendar, f):
+        """UIDs in the feed, re-read only when another writer changed the file"""
+        cached = self._uids.get(calendar)
+        if cached is not None and cached[1] == self._signature(f):
+            return cached[0]
+        f.seek(0)
+        content = f.read().decode("utf-8")
+        if content and not content.endswith(TRAILER):
+            # Torn append: keep complete events, restore the trailer
+            end = content.rfind("END:VEVENT" + CRLF)
+            content = (content[:end + len("END:VEVENT" + CRLF)] if end >= 0 else HEADER) + TRAILER
+            f.seek(0)
+            f.truncate()
+            f.write(content.encode("utf-8"))
+            f.flush()
+        return {line[4:] for line in content.split(CRLF) if line.startswith("UID:")}
+
+    @staticmethod
+    def _append(f, events):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        payload = "".join(format_event(event, stamp) for event in events) + TRAILER
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size:
+            f.truncate(size - len(TRAILER))
+        else:
+            payload = HEADER + payload
+        # "a+b" appends every write at the end of the (now trailer-less) file
+        f.write(payload.encode("utf-8"))
+        f.flush()
@@ -0,0 +1,94 @@
+import json
+import base64
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, urlencode
+from urllib.request import Request, urlopen
+
+class GmailApiError(Exception):
+    """A Gmail API request failed (status is None when the server was unreachable)"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+class HistoryExpired(GmailApiError):
+    """startHistoryId is older than the history the API keeps: a full sync is needed"""
+
+class GmailApiClient:
+    """
+    Minimal Gmail REST client (users.getProfile, messages.list/get,
+    threads.get, history.list) over urllib. base_url is the API root, e.g.
+    https://gmail.googleapis.com, or a local fake in tests.
+    google-api-python-client (in requirements.txt, not yet imported
+    anywhere) builds its service from a discovery document and a
+    google-auth credentials object, so it cannot simply be pointed at a
+    base URL, and it would bring httplib2 and the discovery machinery into
+    the first /sync. Five GET endpoints do not need it, and a bearer token
+    is all that is sent. requests would only replace a few lines of urllib.
+    """
+
+    def __init__(self, base_url, token=None, user="me", timeout=10.0, page_size=500):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.user = user
+        self.timeout = timeout
+        self.page_size = page_size
+        self.requests = 0
+
+    def _get(self, path, **params):
+        query = urlencode({name: value for name, value in params.items() if value is not None})
+        url = f"{self.base_url}/gmail/v1/users/{quote(self.user)}/{path}" + (f"?{query}" if query else "")
+        headers = {"Accept": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        self.requests += 1
+        try:
+            with urlopen(Request(url, headers=headers), timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except HTTPError as e:
+            raise GmailApiError(f"GET {path} failed with HTTP {e.code}", e.code) from e
+        except (URLError, OSError, ValueError) as e:
+            raise GmailApiError(f"GET {path} failed: {e}") from e
+
+    def _pages(self, path, key, **params):
+        token = None
+        while True:
+            page = self._get(path, pageToken=token, maxResults=self.page_size, **params)
+            yield page, page.get(key) or []
+            token = page.get("nextPageToken")
+            if not token:
+                return
+
+    def history_id(self):
+        """The mailbox's current historyId"""
+        return self._get("profile")["historyId"]
+
+    def message_refs(self):
+        """Every message as {"id", "threadId"}"""
+        return [ref for _, refs in self._pages("messages", "messages") for ref in refs]
+
+    def history(self, start_history_id):
+        """(messages added since start_history_id as {"id", "threadId"}, the new historyId)"""
+        added, latest = [], start_history_id
+        try:
+            for page, records in self._pages("history", "history", startHistoryId=start_history_id,
+                                             historyTypes="messageAdded"):
+                latest = page.get("historyId", latest)
+                for record in records:
+                    added.extend(entry["message"] for entry in record.get("messagesAdded") or ())
+        except GmailApiError as e:
+            if e.status == 404:
+                raise HistoryExpired(f"History {start_history_id} is no longer available", 404) from e
+            raise
+        return added, latest
+
+    def thread_message_ids(self, thread_id):
+        """Ids of a thread's messages, oldest first"""
+        thread = self._get(f"threads/{quote(thread_id)}", format="minimal")
+        return [message["id"] for message in thread.get("messages") or ()]
+
+    def raw_message(self, message_id):
+        """RFC 822 bytes of a message"""
+        message = self._get(f"messages/{quote(message_id)}", format="raw")
+        raw = message["raw"]
+        return base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4))
@@ -1,64 +1,306 @@
 import os
+import json
+import base64
 import email
 from email import policy
-from email.parser import BytesParser
+from email.parser import BytesParser, BytesHeaderParser
 import glob
+import bisect
+import threading
 import random
 from datetime import datetime, timedelta
 
+from message_cache import MessageCache
+from mbox_reader import MboxReader
+from mime_decoder import extract_body
+from message_threader import MessageThreader
+from mail_sync import ApiSync, CheckpointStore, DirectorySync
+from gmail_api import GmailApiClient, GmailApiError
+from thread_ranker import parse_epoch
+from metrics import default_registry as metrics
+
+# Bump when parsed thread output changes so on-disk cached parses are not reused
+PARSER_VERSION = "4"
+
 class GmailParser:
-    def __init__(self, test_cases_dir='../test_cases'):
+    def __init__(self, test_cases_dir='../test_cases', cache_dir=None, cache_size=1024, mbox_path=None,
+                 thread_messages=True, api_url=None, api_token=None, checkpoint_path=None):
         self.test_cases_dir = test_cases_dir
-        self.service = None  # Placeholder for real Gmail API service
+        self.service = None  # GmailApiClient once connected to api_url
+        self.cache = MessageCache(max_entries=cache_size, cache_dir=cache_dir, version=PARSER_VERSION)
+        # Group .eml files into conversations (Message-ID / In-Reply-To / References).
+        # mbox exports keep one message per position: their index is never read in full.
+        self.threader = MessageThreader() if thread_messages else None
+        self._headers = {}        # path -> threading headers, read once per file
+        self._thread_index = None  # (file listing, Conversations: threads as lists of paths)
+        self._index_lock = threading.Lock()
+        # An mbox export, when given, replaces the .eml directory as the message source
+        self.mbox_path = mbox_path
+        self._mbox = None
+        self._mbox_lock = threading.Lock()
+        # Incremental sync (poll/commit): the Gmail API when api_url is set, else the .eml directory
+        self.api_url = api_url
+        self.api_token = api_token
+        self.checkpoint = CheckpointStore(checkpoint_path)
+        self._api_sync = None
 
     def connect(self):
-        """Simulate connection"""
+        """Connect to the Gmail API at api_url (without one the local mailbox is always "connected")"""
+        if not self.api_url:
+            return True
+        try:
+            self._client().history_id()
+        except GmailApiError:
+            return False
         return True
 
+    def _client(self):
+        if self.service is None:
+            self.service = GmailApiClient(self.api_url, token=self.api_token)
+        return self.service
+
+    def poll(self, full=False):
+        """
+        Threads with messages that are new or changed since the last
+        committed checkpoint, and the checkpoint to commit() once they are
+        triaged. The first poll (or full=True) returns everything; a poll
+        that is not committed is returned again (at-least-once delivery).
+        Raises ValueError for an mbox source and GmailApiError when the API fails.
+        """
+        state = {} if full else self.checkpoint.load()
+        if self.api_url:
+            if self._api_sync is None:
+                self._api_sync = ApiSync(self._client(), self._parse_raw, cache_size=self.cache.max_entries)
+            threads, state = self._api_sync.changes(state)
+            return [self._merge_thread(messages) for messages in threads if messages], state
+        if self.mbox_path:
+            raise ValueError("Incremental sync needs an .eml directory or the Gmail API, not an mbox export")
+        changed, state = DirectorySync(self.test_cases_dir).changes(state)
+        return self._threads_with(changed, state["files"]), state
+
+    def commit(self, checkpoint):
+        """Record a poll's changes as handled"""
+        self.checkpoint.save(checkpoint)
+
+    def _threads_with(self, paths, names):
+        """
+        Whole conversations containing any of the given .eml paths; `names`
+        are the directory's .eml file names, as the sync listed them. New
+        files are threaded into the existing index, so a poll costs the
+        delta; the index is only rebuilt when files were rewritten or went
+        away, or a new message could regroup existing conversations.
+        """
+        if not paths:
+            return []
+        if self.threader is None:
+            return [self._load_thread([path]) for path in paths]
+        threads = self._add_to_index(paths, len(names))
+        if threads is None:
+            # The sync already listed the directory: no second glob
+            listing = sorted(os.path.join(self.test_cases_dir, name) for name in names)
+            wanted = set(paths)
+            threads = [thread for thread in self._threads(listing)[1] if not wanted.isdisjoint(thread)]
+        return [self._load_thread(thread) for thread in threads]
+
+    def _add_to_index(self, paths, file_count):
+        """Conversations of new files, threaded into the current index; None when it must be rebuilt"""
+        with self._index_lock:
+            rewritten = [path for path in paths if path in self._headers]
+            if rewritten:
+                # Changed in place: their threading headers are read again by the rebuild
+                for path in rewritten:
+                    del self._headers[path]
+                self._thread_index = None
+            if self._thread_index is None or file_count != len(self._thread_index[0]) + len(paths):
+                return None
+            listing, conversations = list(self._thread_index[0]), self._thread_index[1]
+            # Added messages are not undone on failure: the rebuild replaces the index
+            self._thread_index = None
+            threads = []
+            with metrics.timer("thread_index"):
+                for path in paths:
+                    headers = self._headers[path] = self._read_headers(path)
+                    thread = conversations.add(path, *headers[:4])
+                    if thread is None:
+                        return None
+                    bisect.insort(listing, path)
+                    if not any(thread is seen for seen in threads):
+                        threads.append(thread)
+            self._thread_index = (listing, conversations)
+            # Copies: later additions update the index's lists in place
+            return [list(thread) for thread in threads]
+
     def fetch_threads(self, limit=50, offset=0):
         """
         Fetch threads from Gmail. 
         For this demo, we will read from test_cases folder or generate mock data.
+        Only the files inside the requested window are parsed (and then cached).
         """
-        threads = []
-        
-        # Try to read .eml files from test_cases
-        eml_files = glob.glob(os.path.join(self.test_cases_dir, '*.eml'))
-        
-        if eml_files:
-            for file_path in eml_files:
-                with open(file_path, 'rb') as f:
-                    msg = BytesParser(policy=policy.default).parse(f)
-                    
-                    # Extract body
-                    body = ""
-                    if msg.is_multipart():
-                        for part in msg.walk():
-                            content_type = part.get_content_type()
-                            content_disposition = str(part.get("Content-Disposition"))
-                            try:
-                                body = part.get_payload(decode=True).decode()
-                            except:
-                                pass
-                    else:
-                        body = msg.get_payload(decode=True).decode()
-
-                    threads.append({
-                        "id": os.path.basename(file_path).replace('.eml', ''),
-                        "subject": msg['subject'],
-                        "sender": msg['from'],
-                        "date": msg['date'],
-                        "snippet": body[:100] + "...",
-                        "body": body,
-                        "messages": [{"role": "user", "content": body}] # Simplified for triage
-                    })
-        
-        # If we don't have enough files to meet the limit + offset, generate synthetic ones
-        total_needed = offset + limit
-        while len(threads) < total_needed:
-            threads.append(self._generate_mock_thread(len(threads)))
-            
-        return threads[offset:offset+limit]
+        return list(self.iter_threads(cursor=self.encode_cursor(offset), limit=limit))
+
+    def iter_threads(self, cursor=None, limit=50):
+        """
+        Lazily yield up to `limit` threads starting at an opaque cursor.
+        Messages before the cursor are never parsed (grouping them into
+        threads only reads their headers, once per file), and mock
+        threads are only synthesized for positions inside the window.
+        The cursor is validated eagerly so a bad token fails at call time.
+        """
+        return self._iter_window(self.decode_cursor(cursor), limit)
+
+    def _iter_window(self, start, limit):
+        if self.mbox_path:
+            yield from self._iter_mbox_window(start, limit)
+            return
+        _, threads = self._threads()
+        for position in range(start, start + limit):
+            if position < len(threads):
+                yield self._load_thread(threads[position])
+            else:
+                # Not enough real files: fill the window with synthetic threads
+                yield self._generate_mock_thread(position)
+
+    def _iter_mbox_window(self, start, limit):
+        """Only the messages inside the window are sliced from the mapped file and parsed"""
+        mbox = self._get_mbox()
+        prefix = os.path.splitext(os.path.basename(self.mbox_path))[0]
+        for position, raw in mbox.iter_bytes(start, start + limit):
+            with metrics.timer("mime_parse"):
+                msg = BytesParser(policy=policy.default).parsebytes(raw)
+                thread = self._parse_message(msg, f"{prefix}_{position}")
+            yield thread
+
+    def _get_mbox(self):
+        # Reopen when the export changes on disk (the persisted index is extended, not rebuilt).
+        # A replaced reader is left to the GC since other requests may still be paging through it.
+        stat = os.stat(self.mbox_path)
+        with self._mbox_lock:
+            if self._mbox is None or self._mbox[0] != (stat.st_size, stat.st_mtime_ns):
+                self._mbox = ((stat.st_size, stat.st_mtime_ns), MboxReader(self.mbox_path))
+            return self._mbox[1]
+
+    def next_cursor(self, cursor=None, limit=50):
+        """Cursor for the page that follows the one starting at `cursor`"""
+        return self.encode_cursor(self.decode_cursor(cursor) + limit)
+
+    @staticmethod
+    def encode_cursor(position):
+        """Opaque, URL-safe pagination token"""
+        raw = json.dumps({"pos": position}, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Position encoded in a cursor token (None means the start). Raises ValueError when malformed."""
+        if not cursor:
+            return 0
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))['pos']
+        except (ValueError, KeyError, TypeError, UnicodeEncodeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        if not isinstance(position, int) or position < 0:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return position
+
+    def _list_files(self):
+        """Sorted .eml paths so that cursors stay stable between calls"""
+        return sorted(glob.glob(os.path.join(self.test_cases_dir, '*.eml')))
+
+    def _threads(self, listing=None):
+        """
+        (sorted .eml paths, threads as lists of those paths). The index only
+        reads headers, once per file, and is rebuilt when the listing
+        changes; bodies are still parsed only inside a page.
+        """
+        eml_files = self._list_files() if listing is None else listing
+        if self.threader is None:
+            return eml_files, [[path] for path in eml_files]
+        with self._index_lock:
+            if self._thread_index is None or self._thread_index[0] != eml_files:
+                with metrics.timer("thread_index"):
+                    headers = {path: self._headers.get(path) or self._read_headers(path) for path in eml_files}
+                    self._headers = headers
+                    conversations = self.threader.build((path,) + headers[path][:4] for path in eml_files)
+                self._thread_index = (eml_files, conversations)
+            return eml_files, self._thread_index[1].groups
+
+    @staticmethod
+    def _read_headers(file_path):
+        """(Message-ID, In-Reply-To, References, Subject, epoch) from the header block alone"""
+        lines = []
+        with open(file_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    break
+                lines.append(line)
+        msg = BytesHeaderParser(policy=policy.compat32).parsebytes(b''.join(lines))
+        values = tuple(str(msg[name]) if msg[name] is not None else None
+                       for name in ('message-id', 'in-reply-to', 'references', 'subject'))
+        return values + (parse_epoch(msg['date']),)
+
+    def _load_thread(self, paths):
+        """Thread dict for a conversation; every message is parsed (and cached) on its own"""
+        if len(paths) > 1:
+            # Oldest message first inside a conversation
+            headers = self._headers
+            paths = sorted(paths, key=lambda path: (headers[path][4] if path in headers else 0, path))
+        return self._merge_thread([self.cache.get_or_load(path, self._parse_file) for path in paths])
+
+    @staticmethod
+    def _merge_thread(messages):
+        """One thread dict from a conversation's parsed messages, oldest first"""
+        if len(messages) == 1:
+            return messages[0]
+        first, latest = messages[0], messages[-1]
+        # The conversation is named after its first message and triaged on its latest reply
+        return {
+            "id": first["id"],
+            "subject": first["subject"],
+            "sender": latest["sender"],
+            "date": latest["date"],
+            "snippet": latest["snippet"],
+            "body": latest["body"],
+            "messages": [entry for message in messages for entry in message["messages"]],
+        }
+
+    def _parse_file(self, file_path):
+        """Parse a single .eml file into a thread dict"""
+        with metrics.timer("mime_parse"), open(file_path, 'rb') as f:
+            msg = BytesParser(policy=policy.default).parse(f)
+            return self._parse_message(msg, os.path.basename(file_path).replace('.eml', ''))
+
+    def _parse_raw(self, message_id, raw):
+        """Thread dict for a message downloaded from the Gmail API"""
+        with metrics.timer("mime_parse"):
+            return self._parse_message(BytesParser(policy=policy.default).parsebytes(raw), message_id)
+
+    def _parse_message(self, msg, thread_id):
+        """Thread dict for a parsed message"""
+        body = extract_body(msg)
+
+        return {
+            "id": thread_id,
+            "subject": self._header(msg, 'subject'),
+            "sender": self._header(msg, 'from'),
+            "date": self._header(msg, 'date'),
+            "snippet": body[:100] + "...",
+            "body": body,
+            "messages": [{
+                "role": "user",
+                "id": thread_id,
+                "message_id": self._header(msg, 'message-id'),
+                "sender": self._header(msg, 'from'),
+                "date": self._header(msg, 'date'),
+                "content": body,
+            }]
+        }
+
+    @staticmethod
+    def _header(msg, name):
+        """Header value as a plain str so cached threads round-trip through JSON"""
+        value = msg[name]
+        return str(value) if value is not None else None
 
     def _generate_mock_thread(self, index):
         """Generate a synthetic email thread for volume testing"""
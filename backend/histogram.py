@@ -0,0 +1,40 @@
+import math
+from bisect import bisect_left
+
+class LogHistogram:
+    """
+    Fixed-size histogram with log-spaced buckets.
+    O(log buckets) to record, constant memory, and percentiles accurate to
+    one bucket width (growth factor) regardless of how many values are seen.
+    """
+
+    def __init__(self, minimum=0.001, maximum=3600.0, growth=1.25):
+        count = int(math.ceil(math.log(maximum / minimum, growth))) + 1
+        self.bounds = [minimum * growth ** i for i in range(count)]
+        self.counts = [0] * (count + 1)  # last bucket catches values above maximum
+        self.total = 0
+        self.sum = 0.0
+
+    def record(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (None when empty)"""
+        if not self.total:
+            return None
+        rank = max(1, int(math.ceil(q / 100.0 * self.total)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[min(index, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, e.g. for Prometheus buckets"""
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            yield bound, seen
@@ -0,0 +1,131 @@
+import re
+
+# Every keyword a rule looks for, per field. Scorers share one scan of each
+# thread, so adding a keyword here does not add another pass per module.
+DEFAULT_KEYWORDS = {
+    "subject": (
+        "urgent", "asap", "deadline", "important",         # priority: urgency
+        "meeting", "invite", "update",                     # categories
+        "invoice", "payment", "newsletter", "receipt",     # smart folders
+    ),
+    "sender": (
+        "boss", "ceo", "client",                           # priority: sender
+    ),
+    "body": (
+        "review", "approve",                               # priority: action keywords
+        "unsubscribe", "manage preferences",               # newsletters / unsubscribe
+    ),
+}
+
+# Up to this many keywords per field, plain substring checks (C-level scans)
+# beat a regex automaton; above it the automaton keeps the cost at one pass.
+INLINE_SCAN_LIMIT = 24
+
+def trie_pattern(keywords):
+    """Compile keywords into a trie-shaped regex so each position is tried once"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return re.compile(build(trie))
+
+class KeywordMatcher:
+    """
+    Finds every rule keyword in a thread with one lowercase + one scan per field.
+    Results are a single int bitmap; callers test it against masks from mask().
+    """
+
+    def __init__(self, keywords_by_field):
+        self._bits = {}
+        self._fields = []
+        self._declared = set()
+        for field, keywords in keywords_by_field.items():
+            keywords = tuple(dict.fromkeys(k.lower() for k in keywords))
+            entries = []
+            for keyword in keywords:
+                bit = 1 << len(self._bits)
+                self._bits[(field, keyword)] = bit
+                entries.append((keyword, bit))
+            self._declared.add(field)
+            if entries:
+                self._fields.append((field, entries, self._build_scanner(entries)))
+
+    def mask(self, field, *keywords):
+        """Bitmask for keywords in a field; raises KeyError for unknown keywords"""
+        mask = 0
+        for keyword in keywords:
+            mask |= self._bits[(field, keyword.lower())]
+        return mask
+
+    def scan(self, thread):
+        """Hit bitmap for a thread dict (subject/sender/body)"""
+        hits = 0
+        for field, entries, scanner in self._fields:
+            text = thread.get(field)
+            if text:
+                hits |= scanner(text.lower(), entries)
+        return hits
+
+    def scan_text(self, field, text):
+        """Hit bitmap for a single field's text"""
+        for name, entries, scanner in self._fields:
+            if name == field:
+                return scanner(text.lower(), entries) if text else 0
+        if field in self._declared:
+            return 0
+        raise KeyError(field)
+
+    @staticmethod
+    def _inline_scan(text, entries):
+        hits = 0
+        for keyword, bit in entries:
+            if keyword in text:
+                hits |= bit
+        return hits
+
+    @classmethod
+    def _build_scanner(cls, entries):
+        if len(entries) <= INLINE_SCAN_LIMIT:
+            return cls._inline_scan
+        return _AutomatonScanner(entries)
+
+class _AutomatonScanner:
+    """Trie-regex scanner for large vocabularies (a class so matchers stay picklable)"""
+
+    def __init__(self, entries):
+        bits = dict(entries)
+        self.pattern = trie_pattern(list(bits))
+        # findall() is non-overlapping, so a match also implies any keyword
+        # contained in it (e.g. "subscribe" inside "unsubscribe").
+        lengths = sorted({len(keyword) for keyword in bits})
+        self.implied = {}
+        for keyword, bit in entries:
+            for start in range(len(keyword)):
+                for length in lengths:
+                    if start + length > len(keyword):
+                        break
+                    bit |= bits.get(keyword[start:start + length], 0)
+            self.implied[keyword] = bit
+
+        prefixes = {keyword[:i] for keyword in bits for i in range(1, len(keyword))}
+        if any(keyword[-i:] in prefixes for keyword in bits for i in range(1, len(keyword))):
+            # A keyword's suffix starts another keyword: check every position instead
+            self.pattern = re.compile("(?=(" + self.pattern.pattern + "))")
+
+    def __call__(self, text, entries):
+        hits = 0
+        for keyword in set(self.pattern.findall(text)):
+            hits |= self.implied[keyword]
+        return hits
+
+default_matcher = KeywordMatcher(DEFAULT_KEYWORDS)
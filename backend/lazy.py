@@ -0,0 +1,67 @@
+import importlib
+import importlib.util
+import threading
+
+# Optional dependencies are imported on first use, not when a module loads:
+# short-lived workers often serve requests that never need them
+_modules = {}
+_installed = {}
+
+def is_installed(name):
+    """Whether a module can be imported, without importing it"""
+    installed = _installed.get(name)
+    if installed is None:
+        try:
+            installed = importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):
+            installed = False
+        _installed[name] = installed
+    return installed
+
+def optional_import(name):
+    """The module, imported on first call, or None when it is not installed"""
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(name)
+        except ImportError:
+            _modules[name] = None
+    return _modules[name]
+
+class LazyInstance:
+    """
+    Stands in for an object that is built on first attribute access.
+    Used for the app's module-level engines so importing the app builds nothing.
+    """
+
+    __slots__ = ("_factory", "_instance", "_lock")
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def load(self):
+        """The real object, built once even when several threads race for it"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.load(), name, value)
+
+    def __repr__(self):
+        if self._instance is None:
+            return f"<LazyInstance of {getattr(self._factory, '__name__', self._factory)!r} (not loaded)>"
+        return repr(self._instance)
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+from gmail_api import HistoryExpired
+
+# A directory modified this recently may still gain a file within the same
+# mtime tick, so its mtime is not trusted as "unchanged" by the next poll
+RACY_WINDOW_NS = 2 * 10 ** 9
+
+class CheckpointStore:
+    """
+    Last committed sync state: in memory, and with a path also in a JSON file
+    replaced atomically. The file is only re-read when another process
+    committed since, so a poll that finds nothing new never parses it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._state = {}
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.path:
+                try:
+                    st = os.stat(self.path)
+                    signature = (st.st_mtime_ns, st.st_size)
+                except FileNotFoundError:
+                    signature = None
+                if signature != self._signature:
+                    try:
+                        with open(self.path, 'r', encoding='utf-8') as f:
+                            self._state = json.load(f)
+                    except (OSError, ValueError):
+                        self._state = {}
+                    self._signature = signature
+            return self._state
+
+    def save(self, state):
+        with self._lock:
+            self._state = state
+            if not self.path:
+                return
+            # Per-process temp name: pre-forked workers may commit at the same time
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            st = os.stat(self.path)
+            self._signature = (st.st_mtime_ns, st.st_size)
+
+class DirectorySync:
+    """
+    New or changed .eml files since a checkpoint of the directory mtime and
+    every file's (mtime, size). While the directory mtime is unchanged a poll
+    is a single stat; otherwise the listing is compared with the checkpoint
+    (stat only, no file is opened), so added, replaced and rewritten files
+    are all returned. A file rewritten in place keeps the directory mtime,
+    so it is picked up by the next listing change or full sync.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def changes(self, state):
+        """(new or changed .eml paths, the state to checkpoint); an empty state lists everything"""
+        st = os.stat(self.directory)
+        if state.get("mtime_ns") == st.st_mtime_ns:
+            return [], state
+        previous = state.get("files") or {}
+        files = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.eml') and not entry.name.startswith('.') and entry.is_file():
+                    entry_stat = entry.stat()
+                    files[entry.name] = [entry_stat.st_mtime_ns, entry_stat.st_size]
+        changed = sorted(os.path.join(self.directory, name) for name, signature in files.items()
+                         if previous.get(name) != signature)
+        racy = time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS
+        return changed, {"mtime_ns": None if racy else st.st_mtime_ns, "files": files}
+
+class ApiSync:
+    """
+    New messages in a Gmail mailbox since a checkpointed historyId: one
+    (paged) history.list call per poll, then only the threads it touched
+    are fetched. Gmail messages never change, so parsed messages are
+    cached by id and a thread's earlier messages are not downloaded again.
+    An expired historyId falls back to a full sync.
+    """
+
+    def __init__(self, client, parse_raw, cache_size=1024):
+        self.client = client
+        self.parse_raw = parse_raw     # (message id, RFC 822 bytes) -> message dict
+        self.cache_size = cache_size
+        self._messages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def changes(self, state):
+        """(touched threads as lists of parsed messages, the state to checkpoint); an empty state lists everything"""
+        history_id = state.get("history_id")
+        if history_id is None:
+            # Read the historyId first: anything added during the listing is in the next poll
+            latest = self.client.history_id()
+            refs = self.client.message_refs()
+        else:
+            try:
+                refs, latest = self.client.history(history_id)
+            except HistoryExpired:
+                return self.changes({})
+        thread_ids = list(dict.fromkeys(ref["threadId"] for ref in refs))
+        threads = [[self._message(message_id) for message_id in self.client.thread_message_ids(thread_id)]
+                   for thread_id in thread_ids]
+        return threads, {"history_id": latest}
+
+    def _message(self, message_id):
+        with self._lock:
+            message = self._messages.get(message_id)
+            if message is not None:
+                self._messages.move_to_end(message_id)
+                return message
+        message = self.parse_raw(message_id, self.client.raw_message(message_id))
+        with self._lock:
+            self._messages[message_id] = message
+            while len(self._messages) > self.cache_size:
+                self._messages.popitem(last=False)
+        return message
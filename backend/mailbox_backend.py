@@ -0,0 +1,79 @@
+import time
+import threading
+
+# Supported bulk actions -> (state field, value); label actions carry a label name
+MAILBOX_ACTIONS = {
+    "archive": ("archived", True),
+    "unarchive": ("archived", False),
+    "mark_read": ("read", True),
+    "mark_unread": ("read", False),
+    "trash": ("trashed", True),
+    "label": ("labels", True),
+    "unlabel": ("labels", False),
+}
+
+class MockMailbox:
+    """
+    In-memory mailbox standing in for the Gmail API.
+    modify() mirrors users.messages.batchModify: up to MAX_BATCH ids per call,
+    idempotent, with an optional per-call latency to model the network round trip.
+    """
+
+    MAX_BATCH = 1000
+
+    def __init__(self, threads=(), latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._source = threads
+        self._state = None
+        self._lock = threading.Lock()
+
+    def _threads(self):
+        # The feed is read on first use so building the app stays cheap
+        with self._lock:
+            if self._state is None:
+                self._state = {}
+                for thread in self._source:
+                    self._state[thread["id"]] = {"thread": thread, "archived": False, "read": False, "trashed": False, "labels": set()}
+                self._source = None
+            return self._state
+
+    def iter_threads(self):
+        """Every thread in the mailbox (trashed threads excluded)"""
+        for entry in list(self._threads().values()):
+            if not entry["trashed"]:
+                yield entry["thread"]
+
+    def state(self, thread_id):
+        entry = self._threads().get(thread_id)
+        if entry is None:
+            return None
+        return {k: (sorted(v) if k == "labels" else v) for k, v in entry.items() if k != "thread"}
+
+    def modify(self, action, thread_ids, label=None):
+        """Apply one action to up to MAX_BATCH threads; returns how many threads exist"""
+        if action not in MAILBOX_ACTIONS:
+            raise ValueError(f"Unknown action '{action}'")
+        if len(thread_ids) > self.MAX_BATCH:
+            raise ValueError(f"At most {self.MAX_BATCH} threads per call")
+        if self.latency:
+            time.sleep(self.latency)
+
+        field, value = MAILBOX_ACTIONS[action]
+        state = self._threads()
+        modified = 0
+        with self._lock:
+            self.calls += 1
+            for thread_id in thread_ids:
+                entry = state.get(thread_id)
+                if entry is None:
+                    continue
+                if field == "labels":
+                    if value:
+                        entry["labels"].add(label)
+                    else:
+                        entry["labels"].discard(label)
+                else:
+                    entry[field] = value
+                modified += 1
+        return modified
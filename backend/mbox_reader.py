@@ -0,0 +1,118 @@
+import os
+import re
+import mmap
+import struct
+from array import array
+
+INDEX_MAGIC = b"MBOXIDX1"
+INDEX_HEADER = struct.Struct("<8sQQ")   # magic, indexed file size, file mtime_ns
+SEPARATOR = b"\nFrom "
+
+# mboxrd/mboxo escape body lines that start with "From " as ">From "
+_ESCAPED_FROM = re.compile(rb"^>(>*From )", re.MULTILINE)
+
+class MboxReader:
+    """
+    Random access to the messages of a (possibly multi-GB) mbox file.
+    The file is memory-mapped and the byte offsets of its "From " separators
+    are indexed once and persisted next to it (<path>.idx), so opening it
+    again costs a stat. Message N is an O(1) slice; only what is read is paged in.
+    """
+
+    def __init__(self, path, index_path=None, persist_index=True):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self.persist_index = persist_index
+        self._file = open(path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else None
+        self._offsets = self._load_index()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def get_bytes(self, index):
+        """Raw RFC 822 bytes of message `index` (the "From " line removed, escaping undone)"""
+        start = self._offsets[index]
+        end = self._offsets[index + 1] - 1 if index + 1 < len(self._offsets) else self._size
+        data = self._mmap[start:end]
+        newline = data.find(b"\n")
+        data = data[newline + 1:] if newline != -1 else b""
+        return _ESCAPED_FROM.sub(rb"\1", data)
+
+    def iter_bytes(self, start=0, stop=None):
+        """(index, raw bytes) for messages in [start, stop)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            yield index, self.get_bytes(index)
+
+    def _load_index(self):
+        mtime_ns = os.fstat(self._file.fileno()).st_mtime_ns
+        offsets = array("Q")
+        indexed_size = 0
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, indexed_size, indexed_mtime = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic == INDEX_MAGIC and indexed_size <= self._size:
+                    offsets.frombytes(f.read())
+                    if indexed_size == self._size and indexed_mtime == mtime_ns:
+                        return offsets
+                else:
+                    indexed_size = 0
+        except (OSError, struct.error, ValueError):
+            offsets, indexed_size = array("Q"), 0
+
+        # Appended to since indexing: only scan the new tail (mbox files only grow).
+        # A rewritten file, where the last indexed separator moved, is re-indexed from scratch.
+        if indexed_size and not self._is_separator(offsets[-1] if offsets else 0):
+            offsets, indexed_size = array("Q"), 0
+        self._scan(offsets, indexed_size)
+        if self.persist_index:
+            self._save_index(offsets, mtime_ns)
+        return offsets
+
+    def _is_separator(self, offset):
+        if self._mmap is None or self._mmap[offset:offset + 5] != b"From ":
+            return False
+        return offset == 0 or self._mmap[offset - 1:offset] == b"\n"
+
+    def _scan(self, offsets, start):
+        if self._mmap is None:
+            return
+        if start == 0:
+            if self._mmap[:5] == b"From ":
+                offsets.append(0)
+            position = 0
+        else:
+            # Separators straddling the old end of file were not seen by the last scan
+            position = max(0, start - len(SEPARATOR) + 1)
+        find = self._mmap.find
+        while True:
+            position = find(SEPARATOR, position)
+            if position == -1:
+                return
+            offsets.append(position + 1)
+            position += 1
+
+    def _save_index(self, offsets, mtime_ns):
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, self._size, mtime_ns))
+                offsets.tofile(f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            # A read-only location just means indexing again next time
+            pass
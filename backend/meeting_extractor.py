@@ -1,20 +1,182 @@
 import re
+from datetime import datetime, timedelta
+
+# Invites put the when/where near the top; a newsletter's remaining megabyte is never scanned
+MAX_SCAN_CHARS = 4096
+# Newsletters list an event per story; the first few are all a calendar card needs
+MAX_RANGES = 10
+DEFAULT_DURATION = timedelta(hours=1)
+
+_MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+# Full names and abbreviations only: "3 decisions" or "marketing 2" must not read as Dec 3 / Mar 2
+_MONTH = (r'(?=[adfjmnos])(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+          r'|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)(?:\.|\b)')
+_MERIDIEM = r'\s?(?:[ap]\.m\.|[ap]m\b)'
+_HOUR = r'\d{1,2}(?!\d)'
+_CLOCK = _HOUR + r'(?::[0-5]\d)?(?:' + _MERIDIEM + r')?'
+# A clock needs minutes or am/pm; a bare hour only counts as the start of a range ("3-4pm")
+_TIMED_CLOCK = _HOUR + r'(?::[0-5]\d(?:' + _MERIDIEM + r')?|' + _MERIDIEM + r')'
+_RANGE = r'\s?(?:-|–|to|until)\s?'
+
+# One alternation, one pass: every date, time (range), meeting link and keyword
+# in the scanned prefix. re tries every branch at every position, so the
+# branches are guarded: one \b check rejects positions inside words, a
+# first-character class rejects most word starts, and digit-led tokens are
+# only tried at digits. Bare numbers fail inside the regex, not in Python.
+_TOKENS = re.compile(
+    r'\b(?=[\dhtmzjfasond])(?:'
+    r'(?=\d)(?:'
+    r'(?P<iso>(?P<iso_y>\d{4})-(?P<iso_m>[01]\d)-(?P<iso_d>[0-3]\d))\b'
+    r'|(?P<dmy>(?P<dmy_d>\d{1,2})(?:st|nd|rd|th)?\s+(?P<dmy_m>' + _MONTH + r')(?:,?\s+(?P<dmy_y>\d{4}))?)(?!\w)'
+    r'|(?P<time>(?P<start>' + _TIMED_CLOCK + r')(?:' + _RANGE + r'(?P<end>' + _CLOCK + r'))?'
+    r'|(?P<bare_start>' + _HOUR + r')' + _RANGE + r'(?P<bare_end>' + _TIMED_CLOCK + r'))'
+    r')'
+    r'|(?P<link>https?://(?:[\w-]+\.)*(?P<provider>zoom\.us|meet\.google\.com|teams\.microsoft\.com|teams\.live\.com)'
+    r'/[^\s<>"\')\]]*)'
+    r'|(?P<mdy>(?P<mdy_m>' + _MONTH + r')\s+(?P<mdy_d>\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(?P<mdy_y>\d{4}))?)(?!\w)'
+    r'|(?P<relative>today|tomorrow)\b'
+    r'|(?P<keyword>meeting|zoom)'
+    r')',
+    re.IGNORECASE
+)
+_CLOCK_PARTS = re.compile(r'(\d{1,2})(?::(\d{2}))?\s?(?:([ap])\.?m\.?)?', re.IGNORECASE)
+
+def _clock(text):
+    """(hour, minute, 'a'/'p'/None) of a clock token"""
+    hour, minute, meridiem = _CLOCK_PARTS.match(text).groups()
+    return int(hour), int(minute or 0), meridiem.lower() if meridiem else None
+
+def _to_24h(hour, meridiem):
+    if meridiem is None:
+        return hour if hour <= 23 else None
+    if not 1 <= hour <= 12:
+        return None
+    return hour % 12 + (12 if meridiem == "p" else 0)
+
+def parse_time_range(start, end=None):
+    """((hour, minute), (hour, minute) or None) for "3pm", "15:00", "3-4pm", "11am to 1pm"; None if not a time"""
+    h1, m1, ap1 = _clock(start)
+    if end is None:
+        # A bare number is not a time: it needs am/pm or minutes
+        if ap1 is None and ':' not in start:
+            return None
+        hour = _to_24h(h1, ap1)
+        return ((hour, m1), None) if hour is not None else None
+
+    h2, m2, ap2 = _clock(end)
+    if ap1 is None and ap2 is None and ':' not in start + end:
+        return None
+    end_hour = _to_24h(h2, ap2)
+    start_hour = _to_24h(h1, ap1 or ap2)
+    if start_hour is None or end_hour is None:
+        return None
+    if ap1 is None and ap2 == "p" and start_hour > end_hour:
+        start_hour -= 12   # "11-1pm" starts at 11am
+    return (start_hour, m1), (end_hour, m2)
 
 class MeetingExtractor:
-    def extract(self, text):
+    """
+    Meeting detection and scheduling info in a single regex pass over the first
+    max_chars of a body (stopping after max_ranges), so the cost per email does
+    not grow with its size.
+    Dates are paired with the next time (range) after them; a date with no time
+    becomes an all-day range. Datetimes are naive (the sender's local time).
+    """
+
+    def __init__(self, max_chars=MAX_SCAN_CHARS, max_ranges=MAX_RANGES):
+        self.max_chars = max_chars
+        self.max_ranges = max_ranges
+
+    def scan(self, text, reference=None):
+        """
+        (dates, times, ranges, links, keyword seen) for a body.
+        reference (a datetime, e.g. the email's date) resolves missing years and today/tomorrow.
+        """
+        reference = reference or datetime.now()
+        dates, times, ranges, links = [], [], [], []
+        keyword = False
+        day = None          # date waiting for a time
+        for match in _TOKENS.finditer(text[:self.max_chars]):
+            kind = match.lastgroup
+            if kind == "keyword":
+                keyword = True
+            elif kind == "link":
+                url = match.group("link").rstrip(".,;:!?")
+                links.append({"provider": match.group("provider").split(".")[0].lower(), "url": url})
+            elif kind == "time":
+                parsed = parse_time_range(match.group("start") or match.group("bare_start"),
+                                          match.group("end") or match.group("bare_end"))
+                if parsed is None:
+                    continue
+                times.append(match.group("time"))
+                if day is not None:
+                    (h1, m1), end = parsed
+                    start = day.replace(hour=h1, minute=m1)
+                    stop = day.replace(hour=end[0], minute=end[1]) if end else start + DEFAULT_DURATION
+                    ranges.append((start, stop if stop > start else start + DEFAULT_DURATION))
+                    day = None
+                    if len(ranges) >= self.max_ranges:
+                        break
+            else:
+                parsed = self._date(match, reference)
+                if parsed is None:
+                    continue
+                if day is not None:
+                    ranges.append((day, day + timedelta(days=1)))
+                    if len(ranges) >= self.max_ranges:
+                        day = None
+                        break
+                dates.append(match.group(kind))
+                day = parsed
+        if day is not None:
+            ranges.append((day, day + timedelta(days=1)))
+        return dates, times, ranges, links, keyword
+
+    @staticmethod
+    def _date(match, reference):
+        kind = match.lastgroup
+        if kind == "relative":
+            base = reference.replace(hour=0, minute=0, second=0, microsecond=0)
+            return base + timedelta(days=1 if match.group("relative").lower() == "tomorrow" else 0)
+        if kind == "iso":
+            year, month, day = match.group("iso_y"), match.group("iso_m"), match.group("iso_d")
+        else:
+            prefix = kind  # dmy or mdy
+            year = match.group(f"{prefix}_y")
+            month = _MONTHS.index(match.group(f"{prefix}_m")[:3].lower()) + 1
+            day = match.group(f"{prefix}_d")
+        try:
+            parsed = datetime(int(year) if year else reference.year, int(month), int(day))
+        except ValueError:
+            return None
+        # "Mon, 3 Jan" read in late December means next year
+        if not year and parsed < reference.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=180):
+            parsed = parsed.replace(year=parsed.year + 1)
+        return parsed
+
+    def extract(self, text, reference=None):
         """Detect calendar invites + auto-add to Google Calendar (Mock)"""
-        # Simple regex for date/time patterns
-        date_pattern = r'\b(Mon|Tue|Wed|Thu|Fri|Sat|Sun), \d{1,2} (Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)( \d{4})?\b'
-        time_pattern = r'\b\d{1,2}(:\d{2})? ?(am|pm|AM|PM)\b'
-        
-        dates = re.findall(date_pattern, text)
-        times = re.findall(time_pattern, text)
-        
-        if dates or times or 'meeting' in text.lower() or 'zoom' in text.lower():
-            return {
-                "is_meeting": True,
-                "suggested_title": "Meeting", # Would use NLP to extract title
-                "dates_detected": [d[0] for d in dates] if dates else [],
-                "times_detected": [t[0] for t in times] if times else []
-            }
-        return {"is_meeting": False}
+        dates, times, ranges, links, keyword = self.scan(text or "", reference)
+        if not (dates or times or links or keyword):
+            return {"is_meeting": False}
+
+        info = {
+            "is_meeting": True,
+            "suggested_title": "Meeting", # Would use NLP to extract title
+            "dates_detected": dates,
+            "times_detected": times,
+            "ranges": [{"start": start.isoformat(), "end": end.isoformat()} for start, end in ranges],
+            "links": links,
+        }
+        details = []
+        if ranges:
+            start, end = ranges[0]
+            if end - start == timedelta(days=1) and not start.hour and not start.minute:
+                details.append(start.strftime("%a %d %b %Y"))
+            else:
+                details.append(f"{start.strftime('%a %d %b %Y %H:%M')}-{end.strftime('%H:%M')}")
+        if links:
+            details.append(links[0]["provider"].capitalize())
+        if details:
+            info["details"] = " · ".join(details)
+        return info
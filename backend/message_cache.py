@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class MessageCache:
+    """
+    Parsed-message cache keyed by (path, mtime, size).
+    Keeps an in-memory LRU in front of an optional on-disk JSON store,
+    so an unchanged .eml file is only ever parsed once.
+    """
+
+    def __init__(self, max_entries=1024, cache_dir=None, version="1"):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.version = version  # part of every disk key: a new parser never reads old entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(file_path):
+        """Build the cache key for a file from its current stat"""
+        st = os.stat(file_path)
+        return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+    def get_or_load(self, file_path, loader):
+        """Return the cached value for file_path, calling loader(file_path) on a miss"""
+        key = self.key_for(file_path)
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key)
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, value)
+            return value
+
+        value = loader(file_path)
+        with self._lock:
+            self.misses += 1
+        self._remember(key, value)
+        self._write_disk(key, value)
+        return value
+
+    def clear(self):
+        """Drop the in-memory layer (the disk store is left alone)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+            }
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr((self.version,) + key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.json')
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            pass
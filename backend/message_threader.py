@@ -0,0 +1,209 @@
+import re
+import bisect
+
+_MESSAGE_ID = re.compile(r'<([^<>\s]+)>')
+_REPLY_PREFIX = re.compile(r'^(?:\s*(?:re|fwd?|aw|sv)(?:\[\d+\])?\s*:)+\s*', re.IGNORECASE)
+
+def parse_ids(value):
+    """Message-IDs in a header value ("<a@x> <b@y>"), in order; a bare id without brackets is kept as is"""
+    if not value:
+        return []
+    value = str(value)
+    ids = _MESSAGE_ID.findall(value)
+    if not ids and value.strip() and not any(c.isspace() for c in value.strip()):
+        ids = [value.strip()]
+    return ids
+
+def normalize_subject(subject):
+    """(subject without Re:/Fwd: prefixes, whether it had one)"""
+    subject = " ".join(str(subject or "").split())
+    stripped = _REPLY_PREFIX.sub("", subject)
+    return stripped.lower(), stripped != subject
+
+def _reference_chain(in_reply_to, references):
+    """Ancestor Message-IDs, oldest first: References, then In-Reply-To when References lack it"""
+    chain = parse_ids(references)
+    for reply_to in parse_ids(in_reply_to)[:1]:
+        if reply_to not in chain:
+            chain.append(reply_to)
+    return chain
+
+class _Container:
+    __slots__ = ("key", "subject", "parent")
+
+    def __init__(self):
+        self.key = None       # None: a message we only know from someone's References
+        self.subject = None
+        self.parent = None
+
+    def root(self):
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def is_ancestor_of(self, other):
+        while other is not None:
+            if other is self:
+                return True
+            other = other.parent
+        return False
+
+class MessageThreader:
+    """
+    Groups messages into conversations with the JWZ algorithm
+    (https://www.jwz.org/doc/threading.html): an index from Message-ID to
+    container, parents taken from References / In-Reply-To, loops refused.
+    Messages whose parent was never seen still share a thread through the
+    placeholder container of that parent.
+    With group_by_subject, a conversation whose root is a reply ("Re: x") is
+    attached to the one original "x" thread, for clients that drop References.
+    """
+
+    def __init__(self, group_by_subject=True):
+        self.group_by_subject = group_by_subject
+
+    def thread(self, messages):
+        """
+        messages: (key, message_id, in_reply_to, references, subject) tuples.
+        Returns lists of keys, one per conversation, ordered by their first
+        message in the input; keys keep their input order within a list.
+        """
+        return self.build(messages).groups
+
+    def build(self, messages):
+        """Like thread(), but returns the Conversations, which later messages can be added to"""
+        containers = {}
+        order = []
+        for key, message_id, in_reply_to, references, subject in messages:
+            ids = parse_ids(message_id)
+            container = containers.setdefault(ids[0], _Container()) if ids else _Container()
+            if container.key is not None:
+                # Duplicate Message-ID: the copy gets a container of its own
+                container = _Container()
+            container.key = key
+            container.subject = subject
+            order.append(container)
+
+            parent = None
+            for ref in _reference_chain(in_reply_to, references):
+                node = containers.setdefault(ref, _Container())
+                if parent is not None and node.parent is None and not node.is_ancestor_of(parent):
+                    node.parent = parent
+                parent = node
+            # The message's own References win over whatever a sibling implied
+            if parent is not None and not container.is_ancestor_of(parent):
+                container.parent = parent
+
+        groups = {}
+        roots = []
+        for container in order:
+            root = container.root()
+            if root not in groups:
+                groups[root] = []
+                roots.append(root)
+            groups[root].append(container.key)
+        first_keys = {root: groups[root][0] for root in roots}
+        merged = self._merge_by_subject(roots, groups, order) if self.group_by_subject else {}
+        subjects = {}
+        for container in order:
+            subject = normalize_subject(container.subject)[0]
+            subjects[subject] = subjects.get(subject, 0) + 1
+        return Conversations(self.group_by_subject, containers, roots, groups, merged, first_keys, subjects)
+
+    @staticmethod
+    def _merge_by_subject(roots, groups, order):
+        """Merge reply-rooted groups into their original's; returns {merged root: anchor root}"""
+        first_subject = {}
+        for container in order:
+            first_subject.setdefault(container.root(), container.subject)
+        positions = {container.key: index for index, container in enumerate(order)}
+        merged = {}
+        originals = {}
+        for root in roots:
+            # Only a real, non-reply root message can anchor other threads
+            if root.key is None:
+                continue
+            subject, is_reply = normalize_subject(root.subject)
+            if subject and not is_reply:
+                originals.setdefault(subject, []).append(root)
+        for root in roots:
+            subject, is_reply = normalize_subject(first_subject[root] if root.key is None else root.subject)
+            anchors = originals.get(subject, ())
+            # Several originals share the subject (weekly reports): too ambiguous to merge
+            if not subject or len(anchors) != 1 or anchors[0] is root:
+                continue
+            if root.key is not None and not is_reply:
+                continue
+            anchor = anchors[0]
+            groups[anchor] = sorted(groups[anchor] + groups.pop(root), key=positions.__getitem__)
+            merged[root] = anchor
+        return merged
+
+class Conversations:
+    """
+    MessageThreader.build() result: `groups` (lists of keys, one per
+    conversation) plus the Message-ID index behind them. add() threads a
+    new message into that index without re-threading the others, as long
+    as the outcome is what a full build would give; otherwise it returns
+    None and the caller builds again. Keys must sort in input order.
+    """
+
+    def __init__(self, group_by_subject, containers, roots, groups, merged, first_keys, subjects):
+        self.group_by_subject = group_by_subject
+        self.containers = containers       # Message-ID -> _Container
+        self.groups = [groups[root] for root in roots if root in groups]
+        self._group_keys = [first_keys[root] for root in roots if root in groups]   # what groups are ordered by
+        self._root_groups = {root: groups[merged.get(root, root)] for root in roots}
+        self._first_keys = first_keys      # root -> key of its first message
+        self._subjects = subjects          # normalized subject -> messages with it
+
+    def add(self, key, message_id, in_reply_to, references, subject):
+        """Thread one more message; returns the conversation (a list in groups) it joined, or None"""
+        ids = parse_ids(message_id)
+        chain = _reference_chain(in_reply_to, references)
+        # A known Message-ID would fill a placeholder or be a duplicate
+        if (ids and (ids[0] in self.containers or ids[0] in chain)) or len(set(chain)) != len(chain):
+            return None
+        # Known ancestors must lead the chain and already be linked as it says: only new nodes are added
+        known = 0
+        while known < len(chain) and chain[known] in self.containers:
+            known += 1
+        if any(ref in self.containers for ref in chain[known:]):
+            return None
+        for previous, ref in zip(chain, chain[1:known]):
+            if self.containers[ref].parent is not self.containers[previous]:
+                return None
+        normalized = normalize_subject(subject)[0]
+        # Known ancestors without a message of their own (left behind by re-parenting) have no group yet
+        group = self._root_groups.get(self.containers[chain[known - 1]].root()) if known else None
+        if group is not None:
+            # An earlier first message would move the conversation or rename a placeholder root
+            if key < self._first_keys[self.containers[chain[known - 1]].root()]:
+                return None
+        elif self.group_by_subject and normalized and self._subjects.get(normalized):
+            # A new conversation on a known subject may merge with (or split) others
+            return None
+
+        parent = self.containers[chain[known - 1]] if known else None
+        for ref in chain[known:]:
+            node = self.containers[ref] = _Container()
+            node.parent = parent
+            parent = node
+        container = _Container()
+        if ids:
+            self.containers[ids[0]] = container
+        container.key = key
+        container.subject = subject
+        container.parent = parent
+        self._subjects[normalized] = self._subjects.get(normalized, 0) + 1
+        if group is None:
+            group = []
+            root = container.root()
+            self._first_keys[root] = key
+            self._root_groups[root] = group
+            position = bisect.bisect(self._group_keys, key)
+            self._group_keys.insert(position, key)
+            self.groups.insert(position, group)
+        bisect.insort(group, key)
+        return group
@@ -0,0 +1,114 @@
+import time
+import threading
+
+from histogram import LogHistogram
+
+# Pipeline stages timed on the hot path, in pipeline order
+STAGES = (
+    "mime_parse", "html_strip", "scale_down", "priority", "categorize",
+    "smart_folders", "meeting_extractor", "unsubscribe_detector", "rank",
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+def _histogram():
+    # 1us .. 60s in 25% steps: stages range from microseconds to whole batches
+    return LogHistogram(minimum=1e-6, maximum=60.0, growth=1.25)
+
+class StageTimer:
+    """Times a block into one histogram; used as `with metrics.timer("rank"):`"""
+
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+
+class MetricsRegistry:
+    """
+    Latency histograms per pipeline stage and per endpoint.
+    Recording is one dict lookup, a bisect and three increments with no lock:
+    under the GIL a lost increment needs a thread switch inside `+= 1`,
+    which is rare enough for latency metrics. Formatting happens at scrape time.
+    """
+
+    def __init__(self):
+        self._stages = {stage: _histogram() for stage in STAGES}
+        self._requests = {}
+        self._lock = threading.Lock()   # only guards creating new series
+
+    def stage(self, name):
+        histogram = self._stages.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(name, _histogram())
+        return histogram
+
+    def observe(self, stage, seconds):
+        histogram = self._stages.get(stage) or self.stage(stage)
+        histogram.record(seconds)
+
+    def timer(self, stage):
+        return StageTimer(self, stage)
+
+    def observe_request(self, endpoint, seconds):
+        histogram = self._requests.get(endpoint)
+        if histogram is None:
+            with self._lock:
+                histogram = self._requests.setdefault(endpoint, _histogram())
+        histogram.record(seconds)
+
+    def percentiles(self, stage):
+        histogram = self._copy(self.stage(stage))
+        return {f"p{round(q * 100)}": histogram.percentile(q * 100) for q in QUANTILES}
+
+    def render_prometheus(self):
+        """Prometheus text exposition (format 0.0.4)"""
+        with self._lock:
+            stages = list(self._stages.items())
+            requests = sorted(self._requests.items())
+        stages = [(name, self._copy(h)) for name, h in stages]
+        requests = [(name, self._copy(h)) for name, h in requests]
+
+        lines = []
+        self._render(lines, "triage_stage_seconds", "Time spent in each triage pipeline stage", "stage", stages)
+        self._render(lines, "http_request_duration_seconds", "Request latency per endpoint", "endpoint", requests)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _copy(histogram):
+        # Consistent view for one scrape: the count is derived from the copied buckets
+        snapshot = _histogram()
+        snapshot.counts = list(histogram.counts)
+        snapshot.total = sum(snapshot.counts)
+        snapshot.sum = histogram.sum
+        return snapshot
+
+    @staticmethod
+    def _render(lines, metric, help_text, label, histograms):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, histogram in histograms:
+            for bound, count in histogram.cumulative():
+                lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound:.6g}"}} {count}')
+            lines.append(f'{metric}_bucket{{{label}="{name}",le="+Inf"}} {histogram.total}')
+            lines.append(f'{metric}_sum{{{label}="{name}"}} {histogram.sum:.9g}')
+            lines.append(f'{metric}_count{{{label}="{name}"}} {histogram.total}')
+
+        # Precomputed quantiles (bucket upper bounds) so p50/p95/p99 need no PromQL
+        quantile_metric = f"{metric}_quantile"
+        lines.append(f"# HELP {quantile_metric} {help_text} (p50/p95/p99, accurate to one bucket)")
+        lines.append(f"# TYPE {quantile_metric} gauge")
+        for name, histogram in histograms:
+            for q in QUANTILES:
+                value = histogram.percentile(q * 100)
+                lines.append(f'{quantile_metric}{{{label}="{name}",quantile="{q}"}} {"NaN" if value is None else f"{value:.6g}"}')
+
+# Shared by every module so one /metrics scrape covers the whole pipeline
+default_registry = MetricsRegistry()
@@ -0,0 +1,87 @@
+import codecs
+import logging
+import binascii
+
+from body_extractor import extract_text
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on decoded body bytes handed to triage
+MAX_BODY_BYTES = 256 * 1024
+
+def is_attachment(part):
+    """Attachments are skipped without decoding their payload"""
+    disposition = part.get_content_disposition()
+    if disposition == "attachment":
+        return True
+    # Named non-text parts (e.g. inline images) are attachments in all but name
+    return disposition != "inline" and part.get_filename() is not None and part.get_content_maintype() != "text"
+
+def iter_text_parts(msg):
+    """text/* leaves of a message in one pass, never descending into attachments"""
+    stack = [msg]
+    while stack:
+        part = stack.pop()
+        if part is not msg and is_attachment(part):
+            continue
+        if part.is_multipart():
+            stack.extend(reversed(part.get_payload()))
+        elif part.get_content_maintype() == "text":
+            yield part
+
+def _charset(part):
+    charset = part.get_content_charset() or "utf-8"
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return "utf-8"
+
+def _raw_payload(part, limit):
+    """Transfer-decoded bytes of a part, decoding little more than `limit` bytes when possible"""
+    encoding = str(part.get("Content-Transfer-Encoding", "")).strip().lower()
+    if encoding == "base64":
+        encoded = part.get_payload(decode=False)
+        # 4 base64 chars per 3 bytes, plus room for line breaks
+        encoded = "".join(encoded[:(limit // 3 + 1) * 4 * 80 // 76 + 4].split())
+        encoded = encoded[:len(encoded) - len(encoded) % 4]
+        return binascii.a2b_base64(encoded)[:limit]
+    payload = part.get_payload(decode=True)
+    return (payload or b"")[:limit]
+
+def decode_part(part, limit=MAX_BODY_BYTES):
+    """Text of one part in its declared charset, capped at `limit` bytes"""
+    data = _raw_payload(part, limit)
+    decoder = codecs.getincrementaldecoder(_charset(part))(errors="replace")
+    # final=False drops a multi-byte character cut by the cap instead of mangling it
+    return decoder.decode(data, final=len(data) < limit)
+
+def extract_body(msg, max_bytes=MAX_BODY_BYTES):
+    """
+    Triage text for a parsed message: text/plain parts joined, or the first
+    text/html part when there is no plain text, cleaned by extract_text.
+    Attachments are never decoded and at most max_bytes are decoded in total.
+    """
+    plain = []
+    html = None
+    budget = max_bytes
+    for part in iter_text_parts(msg):
+        content_type = part.get_content_type()
+        if content_type not in ("text/plain", "text/html") or budget <= 0:
+            continue
+        if content_type == "text/html" and (html is not None or plain):
+            continue
+        try:
+            text = decode_part(part, budget)
+        except (binascii.Error, ValueError) as e:
+            logger.warning("Skipping undecodable %s part: %s", content_type, e)
+            continue
+        if content_type == "text/plain":
+            plain.append(text)
+            budget -= len(text.encode("utf-8", "replace"))
+            html = None  # plain text wins over an html part seen earlier
+        else:
+            html = text
+
+    if plain:
+        return "".join(plain)
+    return extract_text(html or "", "text/html")
@@ -0,0 +1,116 @@
+import re
+import threading
+
+# Blasts differ in a name, a token or a footer link; the top of the body says
+# what they are. Fingerprinting has to stay far cheaper than triage itself.
+FINGERPRINT_CHARS = 256
+SIMILARITY_THRESHOLD = 0.7
+# Below this many distinct words a body is too short to call a near duplicate
+MIN_WORDS = 8
+# Representatives compared per bucket (the most recent ones); bounds the cost of common hashes
+MAX_CANDIDATES = 4
+
+_ADDRESS = re.compile(r'<([^<>]*)>\s*$')
+
+def sender_address(sender):
+    """Lowercase address of a From header ("Name <a@b>" or a bare address)"""
+    match = _ADDRESS.search(sender)
+    return (match.group(1) if match else sender).strip().lower()
+
+def fingerprint(thread, max_chars=FINGERPRINT_CHARS):
+    """Distinct lowercase words of the subject and the first max_chars of the body"""
+    text = (thread.get('subject') or '') + "\n" + (thread.get('body') or '')[:max_chars]
+    return frozenset(text.lower().split())
+
+def minhashes(words):
+    """
+    Two min-wise hashes of a word set: the smallest word hash under h and
+    under -h. Each matches between two sets with probability equal to their
+    Jaccard similarity, so near duplicates nearly always share one.
+    """
+    hashes = list(map(hash, words))
+    return min(hashes), max(hashes)
+
+def similarity(a, b):
+    """Jaccard similarity of two word sets"""
+    shared = len(a & b)
+    total = len(a) + len(b) - shared
+    return shared / total if total else 0.0
+
+class NearDuplicateClusterer:
+    """
+    Clusters a batch into near-duplicates (newsletters, notification blasts)
+    ahead of triage, so only one representative per cluster is triaged.
+    Messages only cluster with the same sender address and the same keyword
+    hits, which fixes everything priority and category depend on. Within that
+    key, word sets are bucketed by their min-hashes (LSH) and a candidate must
+    reach `threshold` Jaccard similarity with the cluster's representative.
+    Word hashes use hash(), so buckets are only comparable within one process.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_chars=FINGERPRINT_CHARS, min_words=MIN_WORDS,
+                 max_candidates=MAX_CANDIDATES):
+        self.threshold = threshold
+        self.max_chars = max_chars
+        self.min_words = min_words
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        self.threads = 0
+        self.triaged = 0
+        self.fingerprint_seconds = 0.0
+        self.triage_seconds = 0.0
+
+    def cluster(self, threads, hits):
+        """Index of each thread's representative (its own index when it is one)"""
+        buckets = {}        # (sender, hits, band, min-hash) -> representatives
+        fingerprints = {}
+        representatives = []
+        for index, thread in enumerate(threads):
+            words = fingerprint(thread, self.max_chars)
+            if len(words) < self.min_words:
+                representatives.append(index)
+                continue
+            key = (sender_address(thread.get('sender') or ''), hits[index])
+            bands = [key + (band, value) for band, value in enumerate(minhashes(words))]
+            match = self._match(buckets, fingerprints, bands, words)
+            if match is None:
+                match = index
+                fingerprints[index] = words
+                for band in bands:
+                    buckets.setdefault(band, []).append(index)
+            representatives.append(match)
+        return representatives
+
+    def _match(self, buckets, fingerprints, bands, words):
+        seen = set()
+        # Jaccard can never exceed the ratio of the two set sizes
+        smallest, largest = len(words) * self.threshold, len(words) / self.threshold
+        for band in bands:
+            for candidate in reversed(buckets.get(band, ())[-self.max_candidates:]):
+                if candidate not in seen:
+                    seen.add(candidate)
+                    other = fingerprints[candidate]
+                    if smallest <= len(other) <= largest and similarity(other, words) >= self.threshold:
+                        return candidate
+        return None
+
+    def record(self, threads, triaged, fingerprint_seconds, triage_seconds):
+        """Account for one clustered batch"""
+        with self._lock:
+            self.threads += threads
+            self.triaged += triaged
+            self.fingerprint_seconds += fingerprint_seconds
+            self.triage_seconds += triage_seconds
+
+    def stats(self):
+        """Work skipped so far; the saving assumes a skipped thread costs what a triaged one did"""
+        with self._lock:
+            skipped = self.threads - self.triaged
+            per_thread = self.triage_seconds / self.triaged if self.triaged else 0.0
+            return {
+                "threads": self.threads,
+                "triaged": self.triaged,
+                "skipped": skipped,
+                "fingerprint_seconds": round(self.fingerprint_seconds, 6),
+                "estimated_saved_seconds": round(skipped * per_thread - self.fingerprint_seconds, 6),
+            }
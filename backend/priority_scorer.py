@@ -1,28 +1,35 @@
+from keyword_matcher import default_matcher as keywords
+
+URGENT_SUBJECT = keywords.mask('subject', 'urgent', 'asap', 'deadline')
+IMPORTANT_SUBJECT = keywords.mask('subject', 'important')
+EXECUTIVE_SENDER = keywords.mask('sender', 'boss', 'ceo')
+CLIENT_SENDER = keywords.mask('sender', 'client')
+ACTION_BODY = keywords.mask('body', 'review', 'approve')
+
 class PriorityScorer:
-    def calculate(self, thread_data):
+    def calculate(self, thread_data, hits=None):
         """
         1-5 priority algorithm
         Urgency(40%) + Sender(30%) + Keywords(30%)
         """
+        if hits is None:
+            hits = keywords.scan(thread_data)
         score = 0
-        subject = thread_data.get('subject', '').lower()
-        sender = thread_data.get('sender', '').lower()
-        body = thread_data.get('body', '').lower()
         
         # Urgency
-        if 'urgent' in subject or 'asap' in subject or 'deadline' in subject:
+        if hits & URGENT_SUBJECT:
             score += 2.0
-        elif 'important' in subject:
+        elif hits & IMPORTANT_SUBJECT:
             score += 1.5
             
         # Sender
-        if 'boss' in sender or 'ceo' in sender:
+        if hits & EXECUTIVE_SENDER:
             score += 1.5
-        elif 'client' in sender:
+        elif hits & CLIENT_SENDER:
             score += 1.5
             
         # Keywords
-        if 'review' in body or 'approve' in body:
+        if hits & ACTION_BODY:
             score += 1.5
             
         return min(max(round(score), 1), 5)
@@ -1,17 +1,61 @@
+import os
+import sqlite3
+import threading
+
 class ProductivityTracker:
-    def __init__(self):
+    """
+    Processed-email and time-saved counters.
+    In memory by default; with db_path the counters live in SQLite and are
+    updated with atomic increments, so every worker process sees the same totals.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path
         self.stats = {
             "processed": 0,
             "time_saved_minutes": 0
         }
+        self._reset()
+        if db_path:
+            with self._connection() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS productivity (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+                conn.executemany("INSERT OR IGNORE INTO productivity VALUES (?, 0)", [(name,) for name in self.stats])
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        # SQLite handles (and a lock possibly held at fork time) must not cross a fork
+        if self._pid != os.getpid():
+            self._reset()
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, timeout=10.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        return self._conn
 
     def track_batch(self, count, avg_time_saved_per_email=2.0):
         """Track processing stats. Assume 2 mins saved per email."""
-        self.stats["processed"] += count
-        self.stats["time_saved_minutes"] += count * avg_time_saved_per_email
-        
+        if not self.db_path:
+            with self._lock:
+                self.stats["processed"] += count
+                self.stats["time_saved_minutes"] += count * avg_time_saved_per_email
+            return
+        conn = self._connection()
+        with self._lock, conn:
+            conn.executemany(
+                "UPDATE productivity SET value = value + ? WHERE name = ?",
+                [(count, "processed"), (count * avg_time_saved_per_email, "time_saved_minutes")]
+            )
+
     def get_stats(self):
+        stats = self.stats
+        if self.db_path:
+            conn = self._connection()
+            with self._lock:
+                stats = dict(conn.execute("SELECT name, value FROM productivity"))
         return {
-            "processed_total": self.stats["processed"],
-            "time_saved_hours": round(self.stats["time_saved_minutes"] / 60, 1)
+            "processed_total": int(stats["processed"]),
+            "time_saved_hours": round(stats["time_saved_minutes"] / 60, 1)
         }
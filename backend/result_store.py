@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from thread_ranker import parse_epoch
+
+# Bump when TriageEngine output changes so stored results are recomputed
+ENGINE_VERSION = "1"
+
+# Fields that describe the delivery rather than the content; they are not
+# stored and are always taken from the thread being served.
+PER_THREAD_FIELDS = ("id", "date", "timestamp")
+
+def content_hash(thread):
+    """Stable hash of the fields triage depends on (subject, sender, body, and a conversation's earlier messages)"""
+    digest = hashlib.sha256()
+    for field in ("subject", "sender", "body"):
+        digest.update((thread.get(field) or "").encode("utf-8", "replace"))
+        digest.update(b"\0")
+    messages = thread.get("messages") or ()
+    if len(messages) > 1:
+        for message in messages:
+            digest.update((message.get("content") or "").encode("utf-8", "replace"))
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+def rules_version(ruleset):
+    """Store version for results triaged with a user's rule set"""
+    return f"{ENGINE_VERSION}:{ruleset.version}"
+
+class ResultStore:
+    """
+    SQLite-backed store of triage results keyed by (content hash, rules version).
+    Already-triaged threads are read back instead of recomputed; a rule
+    change only misses entries stored under the old version.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._connect()
+
+    def _connect(self):
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS triage_results ("
+                " content_hash TEXT NOT NULL,"
+                " rules_version TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (content_hash, rules_version)) WITHOUT ROWID"
+            )
+
+    def _check_fork(self):
+        # A forked worker must not reuse the parent's SQLite handle (or a lock held at fork time)
+        if self._pid != os.getpid():
+            self._connect()
+
+    def get_many(self, hashes, version):
+        """Stored results for the given hashes under a version, as {hash: result}"""
+        self._check_fork()
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT content_hash, result FROM triage_results"
+                    f" WHERE rules_version = ? AND content_hash IN ({placeholders})",
+                    [version] + batch,
+                )
+                for digest, result in rows:
+                    found[digest] = json.loads(result)
+        return found
+
+    def put_many(self, items, version):
+        """Store (hash, result) pairs under a version"""
+        self._check_fork()
+        now = time.time()
+        rows = [
+            (digest, version, json.dumps({k: v for k, v in result.items() if k not in PER_THREAD_FIELDS}), now)
+            for digest, result in items
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO triage_results VALUES (?, ?, ?, ?)", rows)
+
+    def get_or_compute(self, threads, version, compute):
+        """
+        Triage results for threads, in order. Only threads without a stored
+        result are passed (as one list) to compute(threads) -> results.
+        """
+        threads = list(threads)
+        hashes = [content_hash(thread) for thread in threads]
+        stored = self.get_many(hashes, version)
+
+        missing = [i for i, digest in enumerate(hashes) if digest not in stored]
+        computed = compute([threads[i] for i in missing]) if missing else []
+        if computed:
+            self.put_many([(hashes[i], result) for i, result in zip(missing, computed)], version)
+        with self._lock:
+            self.hits += len(threads) - len(missing)
+            self.misses += len(missing)
+
+        results = [None] * len(threads)
+        for i, result in zip(missing, computed):
+            results[i] = result
+        for i, digest in enumerate(hashes):
+            if results[i] is None:
+                result = dict(stored[digest])
+                result["id"] = threads[i].get("id")
+                result["date"] = threads[i].get("date")
+                result["timestamp"] = parse_epoch(result["date"])
+                results[i] = result
+        return results
+
+    def invalidate(self, version):
+        """Drop every result stored under a version (e.g. a user's previous rule set)"""
+        self._check_fork()
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM triage_results WHERE rules_version = ?", (version,)).rowcount
+
+    def stats(self):
+        self._check_fork()
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM triage_results").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": count,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,214 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from email.utils import parseaddr
+
+from keyword_matcher import KeywordMatcher
+from lazy import is_installed, optional_import
+
+logger = logging.getLogger(__name__)
+
+RULE_FIELDS = ("subject", "sender", "body")
+_USER_ID = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
+def _sender_address(sender):
+    return parseaddr(sender or "")[1].lower()
+
+class CompiledRuleSet:
+    """
+    A user's custom rules compiled for matching:
+    exact senders and sender domains become dict lookups, keywords share one
+    KeywordMatcher scan. Evaluation cost follows the number of matching
+    rules, not the number of rules defined.
+
+    Rule format (JSON/YAML list under "rules"), one matcher plus actions:
+        {"sender": "boss@company.com", "weight": 2}
+        {"sender_domain": "client.com", "weight": 1.5}
+        {"keyword": "invoice", "field": "subject", "folder": "Finance"}
+    """
+
+    def __init__(self, rules, version="none"):
+        self.rules = [self._validate(index, rule) for index, rule in enumerate(rules)]
+        self.version = version
+        self._by_sender = {}
+        self._by_domain = {}
+        keywords = {field: [] for field in RULE_FIELDS}
+        keyword_rules = []
+
+        for index, rule in enumerate(self.rules):
+            if "sender" in rule:
+                self._by_sender.setdefault(rule["sender"].lower(), []).append(index)
+            elif "sender_domain" in rule:
+                self._by_domain.setdefault(rule["sender_domain"].lower().lstrip("@"), []).append(index)
+            else:
+                field = rule.get("field", "subject")
+                keywords[field].append(rule["keyword"])
+                keyword_rules.append((field, rule["keyword"], index))
+
+        self._matcher = KeywordMatcher(keywords)
+        self._by_bit = {}
+        for field, keyword, index in keyword_rules:
+            self._by_bit.setdefault(self._matcher.mask(field, keyword), []).append(index)
+
+    def __len__(self):
+        return len(self.rules)
+
+    @staticmethod
+    def _validate(index, rule):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Rule {index} must be an object")
+        matchers = [key for key in ("sender", "sender_domain", "keyword") if key in rule]
+        if len(matchers) != 1:
+            raise ValueError(f"Rule {index} needs exactly one of sender, sender_domain or keyword")
+        if not isinstance(rule[matchers[0]], str) or not rule[matchers[0]].strip():
+            raise ValueError(f"Rule {index}: {matchers[0]} must be a non-empty string")
+        if rule.get("field", "subject") not in RULE_FIELDS:
+            raise ValueError(f"Rule {index}: field must be one of {', '.join(RULE_FIELDS)}")
+        if "weight" not in rule and "folder" not in rule:
+            raise ValueError(f"Rule {index} needs a weight or a folder")
+        if "weight" in rule and (isinstance(rule["weight"], bool) or not isinstance(rule["weight"], (int, float))):
+            raise ValueError(f"Rule {index}: weight must be a number")
+        if "folder" in rule and not isinstance(rule["folder"], str):
+            raise ValueError(f"Rule {index}: folder must be a string")
+        return rule
+
+    def match(self, thread):
+        """Indices of the rules matching a thread, in rule-file order"""
+        matched = []
+        address = _sender_address(thread.get("sender"))
+        if address:
+            matched.extend(self._by_sender.get(address, ()))
+            # "a@mail.client.com" matches both "mail.client.com" and "client.com"
+            domain = address.rpartition("@")[2]
+            while domain:
+                matched.extend(self._by_domain.get(domain, ()))
+                domain = domain.partition(".")[2]
+
+        hits = self._matcher.scan(thread)
+        while hits:
+            bit = hits & -hits
+            matched.extend(self._by_bit.get(bit, ()))
+            hits ^= bit
+        return sorted(matched)
+
+    def evaluate(self, thread):
+        """(total priority weight, folder or None) for a thread; the first folder rule wins"""
+        weight, folder = 0.0, None
+        for index in self.match(thread):
+            rule = self.rules[index]
+            weight += rule.get("weight", 0)
+            if folder is None and "folder" in rule:
+                folder = rule["folder"]
+        return weight, folder
+
+    def apply(self, result, thread):
+        """Adjust a triage result in place with this rule set"""
+        if not self.rules:
+            return result
+        weight, folder = self.evaluate(thread)
+        if weight:
+            result['priority'] = min(max(round(result.get('priority', 1) + weight), 1), 5)
+        if folder:
+            result['smart_folder'] = folder
+        return result
+
+EMPTY_RULESET = CompiledRuleSet([])
+
+class RuleStore:
+    """
+    Per-user rule files (<rules_dir>/<user>.json, or .yaml with PyYAML installed).
+    Compiled rule sets are cached and swapped atomically when a file changes,
+    so edits take effect without restarting the server.
+    """
+
+    def __init__(self, rules_dir, check_interval=1.0):
+        self.rules_dir = rules_dir
+        self.check_interval = check_interval
+        self._cache = {}  # user -> (path, stat signature, ruleset, last check)
+        self._lock = threading.Lock()
+
+    def get(self, user="default"):
+        """Current compiled rule set for a user (empty when the user has no rule file)"""
+        self._check_user(user)
+        entry = self._cache.get(user)
+        now = time.monotonic()
+        if entry is not None and now - entry[3] < self.check_interval:
+            return entry[2]
+
+        with self._lock:
+            path = self._find_file(user)
+            signature = self._signature(path)
+            entry = self._cache.get(user)
+            if entry is not None and entry[:2] == (path, signature):
+                ruleset = entry[2]
+            elif path is None:
+                ruleset = EMPTY_RULESET
+            else:
+                try:
+                    ruleset = self._load(path)
+                except (OSError, ValueError) as e:
+                    if entry is None:
+                        raise
+                    # Keep serving the last good rule set while the file is being fixed
+                    logger.warning("Ignoring invalid rule file %s: %s", path, e)
+                    ruleset = entry[2]
+            self._cache[user] = (path, signature, ruleset, now)
+            return ruleset
+
+    def save(self, user, rules):
+        """Validate, compile and persist a user's rules; returns the compiled set"""
+        self._check_user(user)
+        payload = json.dumps({"rules": rules}, indent=2).encode("utf-8")
+        ruleset = CompiledRuleSet(rules, version=hashlib.sha1(payload).hexdigest()[:12])
+
+        os.makedirs(self.rules_dir, exist_ok=True)
+        path = os.path.join(self.rules_dir, f"{user}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._cache[user] = (path, self._signature(path), ruleset, time.monotonic())
+        return ruleset
+
+    @staticmethod
+    def _check_user(user):
+        if not _USER_ID.match(user or ""):
+            raise ValueError(f"Invalid user id: {user!r}")
+
+    def _find_file(self, user):
+        extensions = (".json", ".yaml", ".yml") if is_installed("yaml") else (".json",)
+        for extension in extensions:
+            path = os.path.join(self.rules_dir, user + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def _signature(path):
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _load(path):
+        with open(path, "rb") as f:
+            payload = f.read()
+        if path.endswith(".json"):
+            data = json.loads(payload)
+        else:
+            # PyYAML is only imported once a YAML rule file turns up
+            data = optional_import("yaml").safe_load(payload)
+        rules = data.get("rules", []) if isinstance(data, dict) else data
+        if not isinstance(rules, list):
+            raise ValueError("'rules' must be a list")
+        return CompiledRuleSet(rules, version=hashlib.sha1(payload).hexdigest()[:12])
@@ -0,0 +1,128 @@
+import os
+import re
+import json
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ScaleDown_config.json')
+
+DEFAULT_CONFIG = {
+    "compression_level": "high",
+    "remove_signatures": True,
+    "remove_quoted_text": True,
+    "target_reduction": 0.85
+}
+
+# compression_level -> (leading sentences kept, trailing sentences kept, summarise above N sentences)
+COMPRESSION_LEVELS = {
+    "high": (2, 1, 5),
+    "medium": (3, 2, 8),
+    "low": None
+}
+
+# Never squeeze a body below what the summary card shows anyway
+MIN_BUDGET_CHARS = 200
+
+# Cut markers all start with a literal so the regex engine can jump between
+# candidates. Reply headers ("On <date>, <name> wrote:") must start a line and
+# may wrap once; the bounded repeats keep the scan linear instead of
+# backtracking to the end of the body.
+_QUOTE_HEADER = r'On [^\n]{1,200}?(?:\n[^\n]{0,200}?)?wrote:'
+_QUOTE_HEADER_LINE = re.compile(r'\n' + _QUOTE_HEADER)
+_QUOTE_HEADER_AT_START = re.compile(_QUOTE_HEADER)
+_SIGNATURE_LITERALS = ('Best regards,', 'Sincerely,')
+_SIGNATURE_DELIMITER = re.compile(r'\n-- ?(?:\n|$)')
+_QUOTED_LINE = re.compile(r'^[ \t]*>[^\n]*', re.MULTILINE)
+
+def load_config(path=CONFIG_PATH):
+    """Read ScaleDown_config.json, falling back to defaults for missing keys"""
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    return config
+
+class ScaleDownCompressor:
+    """
+    ScaleDown compression pipeline.
+    Cuts the body at the first quote/signature marker in a single search,
+    drops quoted lines, collapses whitespace and keeps the leading/trailing
+    sentences, all driven by ScaleDown_config.json.
+    """
+
+    def __init__(self, config=None):
+        config = load_config() if config is None else dict(DEFAULT_CONFIG, **config)
+        level = config["compression_level"]
+        if level not in COMPRESSION_LEVELS:
+            raise ValueError(f"Unknown compression_level '{level}'. Expected one of {', '.join(COMPRESSION_LEVELS)}")
+
+        self.remove_quoted_text = bool(config["remove_quoted_text"])
+        self.remove_signatures = bool(config["remove_signatures"])
+        self.compression_level = level
+        self.target_reduction = float(config["target_reduction"])
+        self._sentence_window = COMPRESSION_LEVELS[level]
+
+        # Cheap literal markers first so the regex scans only see the prefix before them
+        self._cut_literals = _SIGNATURE_LITERALS if self.remove_signatures else ()
+        self._cut_patterns = ()
+        if self.remove_signatures:
+            self._cut_patterns += (_SIGNATURE_DELIMITER,)
+        if self.remove_quoted_text:
+            self._cut_patterns += (_QUOTE_HEADER_LINE,)
+
+    def compress(self, text):
+        """Compress one email body"""
+        if not text:
+            return ""
+        original_length = len(text)
+
+        # 1. Cut everything after the first reply header / signature. Each
+        #    marker only searches the part before the earliest cut found so far.
+        if self.remove_quoted_text and _QUOTE_HEADER_AT_START.match(text):
+            return ""
+        cut = len(text)
+        for literal in self._cut_literals:
+            position = text.find(literal, 0, cut)
+            if position != -1:
+                cut = position
+        for pattern in self._cut_patterns:
+            match = pattern.search(text, 0, cut)
+            if match:
+                cut = match.start()
+        if cut < len(text):
+            text = text[:cut]
+
+        # 2. Remove quoted lines
+        if self.remove_quoted_text and '>' in text:
+            text = _QUOTED_LINE.sub('', text)
+
+        # 3. Remove excess whitespace
+        text = " ".join(text.split())
+
+        # 4. If still long, take first and last few sentences (Summarization heuristic)
+        if self._sentence_window:
+            text = self._summarise(text, *self._sentence_window)
+
+        # 5. Enforce the configured reduction target
+        budget = max(int(original_length * (1 - self.target_reduction)), MIN_BUDGET_CHARS)
+        if len(text) > budget:
+            cut = text.rfind(' ', 0, budget)
+            text = text[:cut if cut > 0 else budget]
+
+        return text
+
+    @staticmethod
+    def _summarise(text, head, tail, max_sentences):
+        """Keep `head` leading and `tail` trailing sentences without splitting the whole text"""
+        if text.count('. ') + 1 <= max_sentences:
+            return text
+
+        head_end = -2
+        for _ in range(head):
+            head_end = text.find('. ', head_end + 2)
+
+        tail_start = len(text)
+        for _ in range(tail):
+            tail_start = text.rfind('. ', 0, tail_start)
+
+        return text[:head_end] + ". " + text[tail_start + 2:] + "."
@@ -0,0 +1,128 @@
+"""
+Production entry point: waitress behind a gunicorn-style pre-fork master.
+
+    python serve.py --port 5000 --threads 8 --workers 4
+
+The app, its engines and every user's compiled rule set are loaded once in
+the master and the heap is frozen before forking, so workers share those
+pages copy-on-write. The master starts no threads: worker pools are built
+in each worker, and interrupted bulk jobs are resumed by the first worker
+only. Each worker runs a waitress thread pool on the shared listening
+socket; a worker that dies is replaced. Debug mode is always off.
+"""
+import os
+import gc
+import sys
+import signal
+import socket
+import logging
+import argparse
+
+logger = logging.getLogger("serve")
+
+def preload():
+    """Import the app and warm everything a first request would otherwise build"""
+    import app as app_module
+    # Resuming jobs starts threads, which would not survive fork(); see serve_forever
+    application = app_module.create_app({'DEBUG': False, 'PROPAGATE_EXCEPTIONS': False}, resume_jobs=False)
+    # Engines are lazy by default; build them all before workers are forked
+    app_module.load_engines()
+    # Compile every known user's rule set now so each worker inherits it
+    users = {'default'}
+    if os.path.isdir(app_module.rule_store.rules_dir):
+        users.update(os.path.splitext(name)[0] for name in os.listdir(app_module.rule_store.rules_dir))
+    for user in users:
+        try:
+            app_module.rule_store.get(user)
+        except ValueError:
+            pass
+    # Parse the first feed page into the message cache
+    app_module.gmail_parser.fetch_threads(limit=50)
+    return application
+
+def listen(host, port, backlog=1024):
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+def run_worker(application, sock, threads):
+    from waitress import serve
+    # The master's signal handlers must not run in workers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    serve(application, sockets=[sock], threads=threads, ident="email-triage")
+
+def spawn(application, sock, threads, resume_jobs=False):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            if resume_jobs:
+                import app as app_module
+                app_module.resume_bulk_jobs()
+            run_worker(application, sock, threads)
+        finally:
+            os._exit(0)
+    return pid
+
+def serve_forever(host="127.0.0.1", port=5000, threads=8, workers=1):
+    if workers > 1:
+        # Counters must be shared between worker processes
+        os.environ.setdefault('PRODUCTIVITY_DB', 'productivity.db')
+    application = preload()
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        from waitress import serve
+        if workers > 1:
+            logger.warning("fork() is unavailable on this platform; serving with one worker")
+        import app as app_module
+        app_module.resume_bulk_jobs()
+        serve(application, host=host, port=port, threads=threads, ident="email-triage")
+        return
+
+    sock = listen(host, port)
+    # Objects created so far are never collected, so the GC does not dirty shared pages
+    gc.freeze()
+    # Jobs interrupted by the last shutdown run in exactly one worker. A replacement
+    # worker never resumes: the jobs still running in the other workers look unfinished too.
+    children = {spawn(application, sock, threads, resume_jobs=index == 0) for index in range(workers)}
+    logger.info("Serving on http://%s:%d with %d workers x %d threads", host, port, workers, threads)
+
+    stopping = []
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            logger.warning("Worker %d exited with status %d; replacing it", pid, status)
+            children.add(spawn(application, sock, threads))
+    sock.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Email Triage Assistant backend")
+    parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("WEB_THREADS", 8)),
+                        help="request threads per worker")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_WORKERS", 1)),
+                        help="worker processes (pre-forked; POSIX only)")
+    args = parser.parse_args(argv)
+    serve_forever(args.host, args.port, args.threads, args.workers)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,20 +1,29 @@
+from keyword_matcher import default_matcher as keywords
+
+MEETING_SUBJECT = keywords.mask('subject', 'meeting')
+FINANCE_SUBJECT = keywords.mask('subject', 'invoice', 'payment')
+NEWSLETTER = keywords.mask('subject', 'newsletter') | keywords.mask('body', 'unsubscribe')
+RECEIPT_SUBJECT = keywords.mask('subject', 'receipt')
+UPDATE_SUBJECT = keywords.mask('subject', 'update')
+
 class SmartFolders:
-    def categorize(self, thread):
-        """Auto-categorize into 8 folders"""
+    def categorize(self, thread, hits=None):
+        """Auto-categorize into 8 folders (hits: precomputed keyword bitmap, optional)"""
         priority = thread.get('priority', 1)
-        subject = thread.get('subject', '').lower()
+        if hits is None:
+            hits = keywords.scan(thread)
         
         if priority == 5:
             return "Urgent"
-        elif 'meeting' in subject:
+        elif hits & MEETING_SUBJECT:
             return "Calendar"
-        elif 'invoice' in subject or 'payment' in subject:
+        elif hits & FINANCE_SUBJECT:
             return "Finance"
-        elif 'newsletter' in subject or 'unsubscribe' in thread.get('body', '').lower():
+        elif hits & NEWSLETTER:
             return "Newsletters"
-        elif 'receipt' in subject:
+        elif hits & RECEIPT_SUBJECT:
             return "Receipts"
-        elif 'update' in subject:
+        elif hits & UPDATE_SUBJECT:
             return "Awaiting"
         else:
             return "Inbox"
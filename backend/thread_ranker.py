@@ -1,6 +1,80 @@
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, insort
+from email.utils import parsedate_tz, mktime_tz
+
+def parse_epoch(date):
+    """RFC 2822 date string -> epoch seconds (0 when missing or unparseable)"""
+    if not date:
+        return 0
+    parsed = parsedate_tz(str(date))
+    if parsed is None:
+        return 0
+    try:
+        return int(mktime_tz(parsed))
+    except (OverflowError, ValueError):
+        return 0
+
 class ThreadRanker:
+    """
+    Ranks threads by priority (descending) then date (newest first).
+    Besides one-shot ranking it keeps a bounded sorted index that takes
+    incremental inserts in O(log n) search time and serves top_k in O(k).
+    """
+
+    def __init__(self, max_indexed=10000):
+        self.max_indexed = max_indexed
+        self._index = []       # ascending (-priority, -epoch, seq, id)
+        self._keys = {}        # id -> index key
+        self._threads = {}     # id -> thread
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def rank_key(thread):
+        """(priority, epoch) - larger ranks higher; uses the parsed timestamp when present"""
+        epoch = thread.get('timestamp')
+        if epoch is None:
+            epoch = parse_epoch(thread.get('date'))
+        return (thread.get('priority', 0), epoch)
+
     def rank_threads(self, threads):
         """Sort threads by priority (descending) then date"""
-        # Assuming threads have 'priority' and 'date' fields
-        # Date parsing might be needed if date is a string
-        return sorted(threads, key=lambda x: (x.get('priority', 0), x.get('date', '')), reverse=True)
+        return sorted(threads, key=self.rank_key, reverse=True)
+
+    def top_k(self, k, threads=None):
+        """
+        The k highest-ranked threads: from `threads` in O(n log k) when given,
+        otherwise from the incremental index in O(k).
+        """
+        if threads is not None:
+            return heapq.nlargest(k, threads, key=self.rank_key)
+        with self._lock:
+            return [self._threads[key[3]] for key in self._index[:k]]
+
+    def add(self, thread):
+        """Insert or update one thread in the index"""
+        priority, epoch = self.rank_key(thread)
+        thread_id = thread.get('id')
+        with self._lock:
+            old_key = self._keys.pop(thread_id, None)
+            if old_key is not None:
+                del self._index[bisect_left(self._index, old_key)]
+            key = (-priority, -epoch, next(self._seq), thread_id)
+            insort(self._index, key)
+            self._keys[thread_id] = key
+            self._threads[thread_id] = thread
+
+            # Keep the index bounded: the lowest-ranked entry is always last
+            while len(self._index) > self.max_indexed:
+                dropped = self._index.pop()
+                del self._keys[dropped[3]]
+                del self._threads[dropped[3]]
+
+    def add_many(self, threads):
+        for thread in threads:
+            self.add(thread)
+
+    def __len__(self):
+        return len(self._index)
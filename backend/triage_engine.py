@@ -1,102 +1,233 @@
-import re
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import partial
+from time import perf_counter
+
+from scale_down import ScaleDownCompressor
+from keyword_matcher import default_matcher as keywords
+from batch_scorer import BatchPriorityScorer
+from thread_ranker import parse_epoch
+from metrics import default_registry as metrics
+
+URGENT_SUBJECT = keywords.mask('subject', 'urgent', 'asap', 'deadline')
+IMPORTANT_SUBJECT = keywords.mask('subject', 'important')
+EXECUTIVE_SENDER = keywords.mask('sender', 'boss', 'ceo')
+CLIENT_SENDER = keywords.mask('sender', 'client')
+ACTION_BODY = keywords.mask('body', 'review', 'approve')
+UNSUBSCRIBE_BODY = keywords.mask('body', 'unsubscribe')
+MEETING_SUBJECT = keywords.mask('subject', 'meeting', 'invite')
+UPDATE_SUBJECT = keywords.mask('subject', 'update')
+
+# Compressed messages kept for reuse by later replies in the same thread
+MESSAGE_CACHE_SIZE = 4096
+
+def compression_ratio(compressed_length, original_length):
+    return f"{int((1 - (compressed_length / (original_length + 1))) * 100)}%"
 
 class TriageEngine:
-    def __init__(self):
+    def __init__(self, scale_down_config=None, message_cache_size=MESSAGE_CACHE_SIZE, near_duplicates=None):
         self.categories = ["Urgent", "Action", "Awaiting", "Information", "Newsletter", "Spam"]
+        self.compressor = ScaleDownCompressor(scale_down_config)
+        self.batch_scorer = BatchPriorityScorer()
+        # A NearDuplicateClusterer makes process_batch triage one thread per cluster
+        self.near_duplicates = near_duplicates
+        self.message_cache_size = message_cache_size
+        self._reset_message_cache()
+
+    def _reset_message_cache(self):
+        self._compressed = OrderedDict()   # sha1 of a message body -> its ScaleDown output
+        self._compressed_lock = threading.Lock()
+        self.message_hits = 0
+        self.message_misses = 0
+
+    def __getstate__(self):
+        # Process-pool workers get the engine without its cache (or locks); they never cluster
+        state = dict(self.__dict__)
+        for name in ("_compressed", "_compressed_lock", "message_hits", "message_misses"):
+            state.pop(name)
+        state["near_duplicates"] = None
+        return state
 
-    def process_single(self, thread_data):
-        """Process a single thread"""
-        compressed_body = self.scale_down(thread_data.get('body', ''))
-        priority_score = self.calculate_priority(thread_data)
-        category = self.categorize(thread_data, priority_score)
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_message_cache()
+
+    def process_single(self, thread_data, hits=None, rules=None, priority=None):
+        """
+        Process a single thread
+        hits: precomputed keyword bitmap; rules: a user's CompiledRuleSet;
+        priority: precomputed score from the batch scorer (all optional)
+        """
+        start = perf_counter()
+        compressed_body = self.compress_thread(thread_data)
+        scaled = perf_counter()
+        if hits is None:
+            hits = keywords.scan(thread_data)
+        priority_score = self.calculate_priority(thread_data, hits) if priority is None else priority
+        prioritized = perf_counter()
+        category = self.categorize(thread_data, priority_score, hits)
+        metrics.observe("scale_down", scaled - start)
+        if priority is None:
+            metrics.observe("priority", prioritized - scaled)
+        metrics.observe("categorize", perf_counter() - prioritized)
         
-        return {
+        result = {
             "id": thread_data.get('id'),
             "subject": thread_data.get('subject'),
             "sender": thread_data.get('sender'),
+            "date": thread_data.get('date'),
+            "timestamp": parse_epoch(thread_data.get('date')),
             "priority": priority_score,
             "category": category,
             "summary": compressed_body[:200] + "..." if len(compressed_body) > 200 else compressed_body,
             "original_length": len(thread_data.get('body', '')),
             "compressed_length": len(compressed_body),
-            "compression_ratio": f"{int((1 - (len(compressed_body) / (len(thread_data.get('body', '')) + 1))) * 100)}%"
+            "compression_ratio": compression_ratio(len(compressed_body), len(thread_data.get('body', '')))
         }
+        if rules is not None:
+            rules.apply(result, thread_data)
+        return result
+
+    def process_batch(self, threads, executor=None, rules=None):
+        """Process multiple threads, optionally fanned out over a BatchExecutor"""
+        if self.near_duplicates is not None:
+            return self._process_clustered(list(threads), executor, rules)
+        if executor is None:
+            return self._process_chunk(threads, rules)
+        return list(executor.map_chunks(partial(self._process_chunk, rules=rules), threads))
+
+    def _process_clustered(self, threads, executor=None, rules=None):
+        """
+        Triage one representative per near-duplicate cluster and copy its
+        result to the members. Members keep their own id, subject, sender and
+        date, and rules are applied to each thread; the summary is the
+        representative's.
+        """
+        start = perf_counter()
+        hits = [keywords.scan(thread) for thread in threads]
+        representatives = self.near_duplicates.cluster(threads, hits)
+        unique = sorted(set(representatives))
+        clustered = perf_counter()
+        if executor is None:
+            triaged = self._process_chunk([threads[i] for i in unique])
+        else:
+            triaged = list(executor.map_chunks(self._process_chunk, [threads[i] for i in unique]))
+        triaged = dict(zip(unique, triaged))
+        finished = perf_counter()
+        metrics.observe("near_duplicates", clustered - start)
+        self.near_duplicates.record(len(threads), len(unique), clustered - start, finished - clustered)
 
-    def process_batch(self, threads):
-        """Process multiple threads"""
         results = []
-        for thread in threads:
-            results.append(self.process_single(thread))
+        for index, (thread, representative) in enumerate(zip(threads, representatives)):
+            result = dict(triaged[representative])
+            if representative != index:
+                body_length = len(thread.get('body', ''))
+                result.update({
+                    "id": thread.get('id'),
+                    "subject": thread.get('subject'),
+                    "sender": thread.get('sender'),
+                    "date": thread.get('date'),
+                    "timestamp": parse_epoch(thread.get('date')),
+                    "original_length": body_length,
+                    "compression_ratio": compression_ratio(result["compressed_length"], body_length),
+                })
+            if rules is not None:
+                rules.apply(result, thread)
+            results.append(result)
         return results
 
+    def _process_chunk(self, threads, rules=None):
+        """Process one chunk of threads (runs inside pool workers), scoring it column-wise"""
+        threads = list(threads)
+        start = perf_counter()
+        hits = [keywords.scan(thread) for thread in threads]
+        priorities = self.batch_scorer.score(threads, hits)
+        if threads:
+            # One observation per chunk: the per-thread cost of column-wise scoring
+            metrics.observe("priority", (perf_counter() - start) / len(threads))
+        return [
+            self.process_single(thread, hits=h, rules=rules, priority=p)
+            for thread, h, p in zip(threads, hits, priorities)
+        ]
+
+    def compress_thread(self, thread_data):
+        """
+        ScaleDown output for a thread. A conversation is compressed message by
+        message, newest first, so quoted history is never summarised again
+        inside each reply and earlier messages come from the cache.
+        """
+        messages = thread_data.get('messages') or ()
+        if len(messages) < 2:
+            return self.scale_down(thread_data.get('body', ''))
+        parts = (self.compress_message(message.get('content') or '') for message in reversed(messages))
+        return "\n".join(part for part in parts if part)
+
+    def compress_message(self, text):
+        """ScaleDown one message, reusing the result when the same message was compressed before"""
+        key = hashlib.sha1(text.encode('utf-8', 'replace')).digest()
+        with self._compressed_lock:
+            compressed = self._compressed.get(key)
+            if compressed is not None:
+                self._compressed.move_to_end(key)
+                self.message_hits += 1
+                return compressed
+        compressed = self.scale_down(text)
+        with self._compressed_lock:
+            self.message_misses += 1
+            self._compressed[key] = compressed
+            while len(self._compressed) > self.message_cache_size:
+                self._compressed.popitem(last=False)
+        return compressed
+
     def scale_down(self, text):
         """
         ScaleDown Core Innovation: 
         Compresses email threads by removing headers, signatures, and redundant text.
-        Simulates 85% reduction.
+        Delegates to the precompiled ScaleDownCompressor (see ScaleDown_config.json).
         """
-        if not text:
-            return ""
-            
-        # 1. Remove quoted text (replies)
-        text = re.sub(r'On .* wrote:.*', '', text, flags=re.DOTALL)
-        text = re.sub(r'>.*', '', text)
-        
-        # 2. Remove signatures (heuristic)
-        text = re.sub(r'Best regards,.*', '', text, flags=re.DOTALL)
-        text = re.sub(r'Sincerely,.*', '', text, flags=re.DOTALL)
-        
-        # 3. Remove excess whitespace
-        text = " ".join(text.split())
-        
-        # 4. If still long, take first and last few sentences (Summarization heuristic)
-        sentences = text.split('. ')
-        if len(sentences) > 5:
-            return ". ".join(sentences[:2] + sentences[-1:]) + "."
-            
-        return text
+        return self.compressor.compress(text)
 
-    def calculate_priority(self, thread_data):
+    def calculate_priority(self, thread_data, hits=None):
         """
         1-5 priority algorithm
         Urgency(40%) + Sender(30%) + Keywords(30%)
         """
+        if hits is None:
+            hits = keywords.scan(thread_data)
         score = 0
-        subject = thread_data.get('subject', '').lower()
-        sender = thread_data.get('sender', '').lower()
-        body = thread_data.get('body', '').lower()
         
         # Urgency (Keywords in subject)
-        if 'urgent' in subject or 'asap' in subject or 'deadline' in subject:
+        if hits & URGENT_SUBJECT:
             score += 2.0  # Max 2 for urgency (40% of 5)
-        elif 'important' in subject:
+        elif hits & IMPORTANT_SUBJECT:
             score += 1.5
             
         # Sender (Boss or Client)
-        if 'boss' in sender or 'ceo' in sender:
+        if hits & EXECUTIVE_SENDER:
             score += 1.5 # Max 1.5 for sender (30% of 5)
-        elif 'client' in sender:
+        elif hits & CLIENT_SENDER:
             score += 1.5
             
         # Keywords in body
-        if 'review' in body or 'approve' in body:
+        if hits & ACTION_BODY:
             score += 1.5 # Max 1.5 for keywords (30% of 5)
             
         # Cap at 5, min 1
         return min(max(round(score), 1), 5)
 
-    def categorize(self, thread_data, priority):
+    def categorize(self, thread_data, priority, hits=None):
         """Auto-categorize based on content and priority"""
-        subject = thread_data.get('subject', '').lower()
-        sender = thread_data.get('sender', '').lower()
+        if hits is None:
+            hits = keywords.scan(thread_data)
         
-        if 'unsubscribe' in thread_data.get('body', '').lower():
+        if hits & UNSUBSCRIBE_BODY:
             return "Newsletter"
         if priority >= 4:
             return "Urgent"
-        if 'meeting' in subject or 'invite' in subject:
+        if hits & MEETING_SUBJECT:
             return "Action"
-        if 'update' in subject:
+        if hits & UPDATE_SUBJECT:
             return "Information"
             
         return "Awaiting"
@@ -1,7 +1,13 @@
+from keyword_matcher import default_matcher as keywords
+
+UNSUBSCRIBE_BODY = keywords.mask('body', 'unsubscribe', 'manage preferences')
+
 class UnsubscribeDetector:
-    def detect(self, text):
+    def detect(self, text, hits=None):
         """Smart spam filtering + one-click unsubscribe"""
-        if 'unsubscribe' in text.lower() or 'manage preferences' in text.lower():
+        if hits is None:
+            hits = keywords.scan_text('body', text)
+        if hits & UNSUBSCRIBE_BODY:
             return {
                 "can_unsubscribe": True,
                 "link": "http://mock-unsubscribe-link.com"
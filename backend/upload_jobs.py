@@ -0,0 +1,326 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import logging
+import zipfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email import policy
+from email.parser import BytesParser
+
+from batch_executor import chunked
+from mime_decoder import extract_body
+from mbox_reader import MboxReader
+from metrics import default_registry as metrics
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_EXTENSIONS = ('.eml', '.mbox', '.zip')
+
+# Zip members larger than this are skipped rather than inflated
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+
+def parse_eml(fp, thread_id):
+    """Parse an uploaded .eml (file object or bytes) into a thread dict, stripping HTML and scripts/styles"""
+    with metrics.timer("mime_parse"):
+        parser = BytesParser(policy=policy.default)
+        msg = parser.parsebytes(fp) if isinstance(fp, bytes) else parser.parse(fp)
+
+        # Extract body (one MIME walk; attachments skipped, HTML and scripts/styles stripped)
+        body = extract_body(msg)
+
+    return {
+        "id": thread_id,
+        "subject": msg['subject'] or "No Subject",
+        "sender": msg['from'] or "Unknown",
+        "body": body,
+        "date": msg['date']
+    }
+
+def iter_mbox(path, name):
+    """(thread id, raw message bytes) for every message in an mbox file"""
+    with MboxReader(path, persist_index=False) as box:
+        for index, raw in box.iter_bytes():
+            yield f"{name}#{index}", raw
+
+def iter_upload(path, name):
+    """
+    (thread id, raw bytes) for every message in a stored upload:
+    a single .eml, an .mbox, or a .zip holding either.
+    """
+    lowered = name.lower()
+    if lowered.endswith('.eml'):
+        with open(path, 'rb') as f:
+            yield name, f.read()
+    elif lowered.endswith('.mbox'):
+        yield from iter_mbox(path, name)
+    elif lowered.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.infolist():
+                member_name = f"{name}/{member.filename}"
+                if member.is_dir() or not member.filename.lower().endswith(('.eml', '.mbox')):
+                    continue
+                if member.file_size > MAX_MEMBER_BYTES:
+                    raise ValueError(f"{member_name} exceeds {MAX_MEMBER_BYTES} bytes")
+                if member.filename.lower().endswith('.eml'):
+                    yield member_name, archive.read(member)
+                else:
+                    # MboxReader maps a real file; inflate next to the upload
+                    extracted = f"{path}.{member.CRC:08x}.mbox"
+                    with archive.open(member) as src, open(extracted, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    try:
+                        yield from iter_mbox(extracted, member_name)
+                    finally:
+                        os.remove(extracted)
+    else:
+        raise ValueError(f"Unsupported upload type: {name}")
+
+# How often a job run by another worker process is re-read from its journal while streaming
+FOLLOW_INTERVAL = 0.1
+
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+class UploadJob:
+    """
+    Progress and results of one upload; results are appended as batches finish.
+    A job read back from another process's journal has `follow` set, which
+    reads the records appended since.
+    """
+
+    def __init__(self, job_id, files):
+        self.id = job_id
+        self.files = files   # [(original name, spooled path)]
+        self.status = "queued"
+        self.results = []
+        self.errors = []
+        self.created_at = time.time()
+        self.finished_at = None
+        self.owner_pid = os.getpid()
+        self.follow = None
+        self.changed = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "failed")
+
+    def progress(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "files": [name for name, _ in self.files],
+            "processed": len(self.results),
+            "errors": self.errors,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+    def iter_results(self, timeout=30.0):
+        """Yield results as they are appended, until the job finishes (or stalls past timeout)"""
+        sent = 0
+        while True:
+            with self.changed:
+                if sent == len(self.results) and not self.finished:
+                    if not self._wait(timeout):
+                        return
+                batch = self.results[sent:]
+                finished = self.finished
+            for result in batch:
+                yield result
+            sent += len(batch)
+            if finished and sent == len(self.results):
+                return
+
+    def _wait(self, timeout):
+        # Called holding `changed`; False when nothing happened within timeout
+        if self.follow is None:
+            return self.changed.wait(timeout)
+        deadline = time.monotonic() + timeout
+        count = len(self.results)
+        while True:
+            self.follow()
+            if len(self.results) != count or self.finished:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            self.changed.wait(FOLLOW_INTERVAL)
+
+class UploadJobManager:
+    """
+    Spools uploaded files to disk and triages their messages on a background pool.
+    The request thread only copies bytes; parsing happens in the workers.
+    Each job appends its progress and results to <spool_dir>/<job id>.jsonl,
+    so any worker process can report on (and stream) a job another one runs.
+    Journals are removed along with their jobs when max_jobs evicts them.
+    """
+
+    def __init__(self, spool_dir, workers=2, batch_size=25, max_jobs=100):
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+
+    def submit(self, files, process):
+        """
+        files: [(filename, readable stream)]; process(threads) -> triage results.
+        Returns the queued job once every file is on disk.
+        """
+        for name, _ in files:
+            if not name or not name.lower().endswith(UPLOAD_EXTENSIONS):
+                raise ValueError(f"Invalid file type: {name!r}. Allowed: {', '.join(UPLOAD_EXTENSIONS)}")
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.spool_dir, job_id)
+        os.makedirs(job_dir)
+        stored = []
+        for index, (name, stream) in enumerate(files):
+            # Never trust the client's name for the path
+            path = os.path.join(job_dir, f"{index}_{re.sub(r'[^A-Za-z0-9_.-]', '_', os.path.basename(name))}")
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(stream, f)
+            stored.append((name, path))
+
+        job = UploadJob(job_id, stored)
+        self._journal(job, {"event": "created", "files": [name for name, _ in stored], "created_at": job.created_at})
+        with self._lock:
+            self._jobs[job_id] = job
+            self._evict()
+        self._get_pool().submit(self._run, job, process)
+        return job
+
+    def get(self, job_id):
+        """
+        A job by id. Jobs run by another worker process (or still running in the
+        process this one was forked from) are read back from their journal.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None and (job.finished or job.owner_pid == os.getpid()):
+            return job
+        if not _JOB_ID.fullmatch(job_id):
+            return job
+        replayed = UploadJob(job_id, [])
+        replayed.owner_pid = None
+        offset = 0
+
+        def follow():
+            nonlocal offset
+            offset = self._replay(replayed, offset)
+            return offset
+
+        replayed.follow = follow
+        try:
+            if not follow():
+                return job   # the created record is still being written
+        except FileNotFoundError:
+            return job
+        return replayed
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def _get_pool(self):
+        # Built on first use in each process: a pool inherited across fork() has no threads
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _evict(self):
+        # Forget the oldest finished jobs beyond max_jobs
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                return
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+                try:
+                    os.remove(self._journal_path(job_id))
+                except FileNotFoundError:
+                    pass
+
+    def _threads(self, job):
+        for name, path in job.files:
+            try:
+                for thread_id, raw in iter_upload(path, name):
+                    try:
+                        yield parse_eml(raw, thread_id)
+                    except Exception as e:
+                        self._error(job, thread_id, e)
+            except Exception as e:
+                self._error(job, name, e)
+
+    def _error(self, job, source, error):
+        logger.warning("Upload %s: skipping %s: %s", job.id, source, error)
+        error = {"source": source, "error": str(error)}
+        self._journal(job, dict(error, event="error"))
+        with job.changed:
+            job.errors.append(error)
+
+    def _run(self, job, process):
+        self._journal(job, {"event": "running"})
+        with job.changed:
+            job.status = "running"
+        try:
+            for batch in chunked(self._threads(job), self.batch_size):
+                results = process(batch)
+                self._journal(job, {"event": "results", "results": results})
+                with job.changed:
+                    job.results.extend(results)
+                    job.changed.notify_all()
+            status = "completed"
+        except Exception as e:
+            logger.error("Upload job %s failed: %s", job.id, e, exc_info=True)
+            self._error(job, "job", e)
+            status = "failed"
+        finally:
+            shutil.rmtree(os.path.join(self.spool_dir, job.id), ignore_errors=True)
+        finished_at = time.time()
+        self._journal(job, {"event": "finished", "status": status, "finished_at": finished_at})
+        with job.changed:
+            job.status = status
+            job.finished_at = finished_at
+            job.changed.notify_all()
+
+    def _journal_path(self, job_id):
+        return os.path.join(self.spool_dir, f"{job_id}.jsonl")
+
+    def _journal(self, job, record):
+        # One write per record: readers in other processes never see a partial line as complete
+        with open(self._journal_path(job.id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _replay(self, job, offset=0):
+        """Apply the journal records after byte `offset` to job; returns the new offset"""
+        with open(self._journal_path(job.id), "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break   # still being written
+                offset += len(line)
+                record = json.loads(line)
+                event = record.pop("event")
+                if event == "created":
+                    job.files = [(name, None) for name in record["files"]]
+                    job.created_at = record["created_at"]
+                elif event == "running":
+                    job.status = "running"
+                elif event == "results":
+                    job.results.extend(record["results"])
+                elif event == "error":
+                    job.errors.append(record)
+                elif event == "finished":
+                    job.status = record["status"]
+                    job.finished_at = record["finished_at"]
+        return offset
@@ -9,6 +9,7 @@ let currentUser = {
 
 // Pagination State
 let currentPage = 1;
+let nextCursor = null;
 let isLoadingMore = false;
 let hasMorePosts = true;
 
@@ -287,35 +288,64 @@ function showNotification(title, message) {
 async function runBatchProcess() {
     toggleLoading(true);
     try {
-        const response = await fetch(`${API_URL}/batch`, { method: 'POST' });
-        const data = await response.json();
+        // Results are streamed as NDJSON: one frame per thread, then a ranked summary
+        const response = await fetch(`${API_URL}/batch/stream?format=ndjson`, { method: 'POST' });
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
         
         const container = document.getElementById('batch-results');
         container.innerHTML = ''; // Clear previous
         
-        // Create a summary header
+        // Create a summary header, updated as results arrive
         const summary = document.createElement('div');
         summary.className = 'post-card';
-        summary.innerHTML = `
-            <h3>Batch Analysis Complete</h3>
-            <p>Processed ${data.processed_count} emails in ${data.time_taken}s</p>
-        `;
+        summary.innerHTML = `<h3>Batch Analysis Running</h3><p>Processed 0 emails</p>`;
         container.appendChild(summary);
         
-        data.results.forEach(thread => {
-            const div = document.createElement('div');
-            div.className = 'post-card';
-            div.style.padding = '1rem';
-            div.innerHTML = `
-                <div style="display:flex; justify-content:space-between;">
-                    <strong>${escapeHtml(thread.sender)}</strong>
-                    <span class="badge badge-urgent">P${thread.priority}</span>
-                </div>
-                <div>${escapeHtml(thread.subject)}</div>
-                <div style="color:var(--text-secondary); font-size:0.875rem;">${escapeHtml(thread.summary)}</div>
-            `;
-            container.appendChild(div);
-        });
+        const cards = {};
+        let received = 0;
+        const handleFrame = (frame) => {
+            if (frame.type === 'result') {
+                const thread = frame.data;
+                const div = document.createElement('div');
+                div.className = 'post-card';
+                div.style.padding = '1rem';
+                div.innerHTML = `
+                    <div style="display:flex; justify-content:space-between;">
+                        <strong>${escapeHtml(thread.sender)}</strong>
+                        <span class="badge badge-urgent">P${thread.priority}</span>
+                    </div>
+                    <div>${escapeHtml(thread.subject)}</div>
+                    <div style="color:var(--text-secondary); font-size:0.875rem;">${escapeHtml(thread.summary)}</div>
+                `;
+                cards[thread.id] = div;
+                container.appendChild(div);
+                received++;
+                summary.querySelector('p').textContent = `Processed ${received} emails`;
+            } else if (frame.type === 'summary') {
+                const data = frame.data;
+                summary.innerHTML = `
+                    <h3>Batch Analysis Complete</h3>
+                    <p>Processed ${data.processed_count} emails in ${data.time_taken}s</p>
+                `;
+                // Re-order the rendered cards by final rank
+                data.ranked_ids.forEach(id => {
+                    if (cards[id]) container.appendChild(cards[id]);
+                });
+            }
+        };
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffered += decoder.decode(value, { stream: true });
+            const lines = buffered.split('\n');
+            buffered = lines.pop(); // keep a partial trailing line for the next read
+            lines.filter(line => line.trim()).forEach(line => handleFrame(JSON.parse(line)));
+        }
+        if (buffered.trim()) handleFrame(JSON.parse(buffered));
         
     } catch (error) {
         console.error('Batch error:', error);
@@ -385,8 +415,10 @@ async function loadFeed() {
     if (currentPage === 1) toggleLoading(true);
 
     try {
-        const response = await fetch(`${API_URL}/threads?page=${currentPage}&limit=5`);
+        const cursorParam = nextCursor ? `&cursor=${encodeURIComponent(nextCursor)}` : '';
+        const response = await fetch(`${API_URL}/threads?limit=5${cursorParam}`);
         if (!response.ok) throw new Error('Failed to load feed');
+        nextCursor = response.headers.get('X-Next-Cursor');
         
         const threads = await response.json();
         
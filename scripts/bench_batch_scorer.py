@@ -0,0 +1,38 @@
+"""
+Benchmark: scalar vs NumPy priority scoring at 1k, 10k and 100k threads.
+Run from the repo root:  python scripts/bench_batch_scorer.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from gmail_parser import GmailParser
+from priority_scorer import PriorityScorer
+from batch_scorer import BatchPriorityScorer
+from keyword_matcher import default_matcher as keywords
+
+def make_threads(count):
+    parser = GmailParser(test_cases_dir=os.path.join(os.path.dirname(__file__), '..', 'test_cases'))
+    real = parser.fetch_threads(limit=10)
+    return [real[i % len(real)] if i % 3 == 0 else parser._generate_mock_thread(i) for i in range(count)]
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, (time.perf_counter() - start) * 1000
+
+if __name__ == "__main__":
+    scalar, vector = PriorityScorer(), BatchPriorityScorer()
+    # Warm-up: the first vectorized call imports NumPy and builds the weight columns
+    warmup = make_threads(100)
+    vector.score(warmup, [keywords.scan(t) for t in warmup])
+    print(f"{'threads':>8}{'scan ms':>10}{'scalar ms':>12}{'numpy ms':>11}{'speedup':>10}")
+    for count in (1000, 10000, 100000):
+        threads = make_threads(count)
+        hits, scan_ms = timed(lambda: [keywords.scan(t) for t in threads])
+        expected, scalar_ms = timed(lambda: [scalar.calculate(t, h) for t, h in zip(threads, hits)])
+        actual, numpy_ms = timed(lambda: vector.score(threads, hits))
+        assert actual == expected, "vectorized scores diverged from the scalar path"
+        print(f"{count:>8}{scan_ms:>10.1f}{scalar_ms:>12.1f}{numpy_ms:>11.1f}{scalar_ms / numpy_ms:>9.1f}x")
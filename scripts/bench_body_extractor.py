@@ -0,0 +1,81 @@
+"""
+Benchmark: body cleanup latency, BeautifulSoup tree vs the tiered extractor.
+Runs on the test_cases/ corpus (mostly text/plain) and on large synthetic
+HTML newsletters. Run from the repo root:  python scripts/bench_body_extractor.py
+"""
+import os
+import sys
+import glob
+import time
+from email import policy
+from email.parser import BytesParser
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from body_extractor import extract_text
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+TEST_CASES = os.path.join(os.path.dirname(__file__), '..', 'test_cases')
+
+def soup_text(body, content_type=None):
+    """What /triage used to do for every body"""
+    soup = BeautifulSoup(body, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return soup.get_text()
+
+def corpus_bodies():
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(TEST_CASES, '*.eml'))):
+        with open(path, 'rb') as f:
+            msg = BytesParser(policy=policy.default).parse(f)
+        part = msg.get_body(preferencelist=('plain', 'html'))
+        if part is not None:
+            bodies.append((part.get_content(), part.get_content_type()))
+    return bodies
+
+def newsletter(items):
+    rows = "".join(
+        f'<tr><td class="item"><a href="https://example.com/{i}"><img src="https://cdn.example.com/{i}.png" alt="">'
+        f'<b>Story {i}</b></a><p style="color:#333">Summary of story {i} &amp; more &mdash; read on.</p></td></tr>'
+        for i in range(items)
+    )
+    return (
+        '<!DOCTYPE html><html><head><style>.item { padding: 4px; } td { font-family: sans-serif; }</style>'
+        '<script>var tracking = {"id": 1};</script></head>'
+        f'<body><table>{rows}</table><p>Unsubscribe | Manage preferences</p></body></html>'
+    )
+
+def best_of(fn, bodies, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body, content_type in bodies:
+            fn(body, content_type)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    if BeautifulSoup is None:
+        sys.exit("beautifulsoup4 is required for the baseline (pip install beautifulsoup4)")
+
+    corpora = [("test_cases (x100)", corpus_bodies() * 100)]
+    for items in (50, 500, 5000):
+        html = newsletter(items)
+        corpora.append((f"newsletter {len(html) // 1024}KB", [(html, "text/html")] * 5))
+
+    print(f"{'corpus':<22} {'bs4 ms/msg':>11} {'tiered ms/msg':>14} {'speedup':>8}")
+    for name, bodies in corpora:
+        for body, content_type in bodies[:1]:
+            # Same visible text as the old path (whitespace aside)
+            assert " ".join(extract_text(body, content_type).split()) == " ".join(soup_text(body).split()) or content_type == "text/plain"
+        old = best_of(soup_text, bodies) / len(bodies) * 1000
+        new = best_of(extract_text, bodies) / len(bodies) * 1000
+        print(f"{name:<22} {old:>11.3f} {new:>14.3f} {old / new:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: bulk-action job throughput at 100, 10,000 and 100,000 threads
+against the local mock mailbox (with a simulated per-call round trip).
+Compares one worker with a pool, both journaled to a temporary directory.
+Run from the repo root:  python scripts/bench_bulk_jobs.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from bulk_jobs import JobManager
+from mailbox_backend import MockMailbox
+
+ROUND_TRIP = 0.005  # seconds per batchModify call
+CHUNK_SIZE = 500
+
+def make_mailbox(count):
+    threads = [{"id": f"thread_{i}", "priority": 1 + i % 5} for i in range(count)]
+    return MockMailbox(threads, latency=ROUND_TRIP), threads
+
+def run(count, workers):
+    mailbox, threads = make_mailbox(count)
+    priorities = {thread["id"]: thread["priority"] for thread in threads}
+
+    def select(selector, user):
+        return (thread_id for thread_id in priorities if selector.matches({"priority": priorities[thread_id]}))
+
+    journal_dir = tempfile.mkdtemp()
+    try:
+        jobs = JobManager(mailbox, select, journal_dir=journal_dir, workers=workers, chunk_size=CHUNK_SIZE)
+        start = time.perf_counter()
+        job = jobs.submit("archive", selector={"max_priority": 5})
+        progress = jobs.wait(job.id)
+        elapsed = time.perf_counter() - start
+        jobs.shutdown()
+    finally:
+        shutil.rmtree(journal_dir)
+    assert progress["status"] == "completed" and progress["modified"] == count, progress
+    return elapsed, mailbox.calls
+
+def main():
+    print(f"{'threads':>8} {'workers':>8} {'calls':>6} {'seconds':>9} {'threads/s':>11}")
+    for count in (100, 10000, 100000):
+        for workers in (1, 8):
+            elapsed, calls = run(count, workers)
+            print(f"{count:>8} {workers:>8} {calls:>6} {elapsed:>9.3f} {count / elapsed:>11,.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: exporting meeting detections to the calendar feed, one write per
+email (what a per-email calendar API call amounts to) vs one write per batch.
+Run from the repo root:  python scripts/bench_calendar_export.py --count 10000
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from calendar_sink import FileCalendarSink, thread_events
+from meeting_extractor import MeetingExtractor
+
+EPOCH = datetime(2024, 1, 1, 9, 0)
+
+def meeting_threads(count):
+    threads = []
+    for i in range(count):
+        day = EPOCH + timedelta(days=i % 300)
+        hour = i % 8 + 1
+        threads.append({
+            "id": f"thread_{i}",
+            "subject": f"Sync #{i}",
+            "sender": f"user{i % 50}@example.com",
+            "date": format_datetime(EPOCH),
+            "body": f"Hi,\n\nCan we meet on {day.strftime('%a, %d %b %Y')} at {hour}-{hour + 1}pm?\n"
+                    f"Join: https://us02web.zoom.us/j/{100000 + i}\n\nThanks",
+        })
+    return threads
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+
+    threads = meeting_threads(args.count)
+    extractor = MeetingExtractor()
+    detect, events = timed(lambda: [event for thread in threads for event in thread_events(thread, extractor)])
+
+    directory = tempfile.mkdtemp(prefix="triage-calendar-")
+    try:
+        per_email_sink = FileCalendarSink(directory)
+        per_email, _ = timed(lambda: [per_email_sink.write([event], calendar="per_email") for event in events])
+
+        bulk_sink = FileCalendarSink(directory)
+        bulk, written = timed(lambda: bulk_sink.write(events, calendar="bulk"))
+        # Re-running the same batch (e.g. /batch over the same page) writes nothing
+        again, rewritten = timed(lambda: FileCalendarSink(directory).write(events, calendar="bulk"))
+        size = os.path.getsize(bulk_sink.path("bulk"))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{len(events):,} detections from {args.count:,} threads")
+    print(f"{'step':<34} {'total ms':>10} {'us/event':>10}")
+    for name, seconds in (("detect (MeetingExtractor.scan)", detect), ("export, one write per email", per_email),
+                          ("export, one write per batch", bulk), ("re-export, all duplicates", again)):
+        print(f"{name:<34} {seconds * 1000:>10.1f} {seconds / len(events) * 1e6:>10.1f}")
+    print(f"\nbulk feed: {written:,} events written, {rewritten} on re-export, {size / 1024:.0f} KB; "
+          f"batching is {per_email / bulk:.0f}x faster")
+
+if __name__ == '__main__':
+    main()
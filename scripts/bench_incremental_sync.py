@@ -0,0 +1,99 @@
+"""
+Benchmark: incremental sync (GmailParser.poll) vs re-reading the whole
+mailbox, for an .eml directory and for the fake Gmail API from tests/.
+Run from the repo root:  python scripts/bench_incremental_sync.py --sizes 1000,10000 --delta 10
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests')))
+
+from gmail_parser import GmailParser
+from synthetic_mailbox import SyntheticMailbox
+from fake_gmail_api import FakeGmailApi
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def settle(directory):
+    # Steady state: the directory was last modified well before the poll (outside the racy window)
+    stat = os.stat(directory)
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 * 10 ** 9))
+
+def sync(parser):
+    threads, checkpoint = parser.poll()
+    parser.commit(checkpoint)
+    return threads
+
+def bench_directory(size, delta):
+    mailbox = SyntheticMailbox(html_ratio=0, attachment_ratio=0)
+    directory = tempfile.mkdtemp(prefix="triage-sync-")
+    try:
+        mailbox.write(directory, size)
+        settle(directory)
+        parser = GmailParser(test_cases_dir=directory)
+        first, threads = timed(lambda: sync(parser))
+        # What every refresh cost before: the whole mailbox again (messages cached, so no parsing)
+        reread, _ = timed(lambda: parser.fetch_threads(limit=len(threads)))
+        idle, unchanged = timed(lambda: sync(parser))
+        for index in range(size, size + delta):
+            with open(os.path.join(directory, f"new_{index:07d}.eml"), "wb") as f:
+                f.write(mailbox.eml_bytes(index))
+        settle(directory)
+        changed, new = timed(lambda: sync(parser))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return first, reread, idle, len(unchanged), changed, len(new)
+
+def bench_api(size, delta):
+    mailbox = SyntheticMailbox(html_ratio=0, attachment_ratio=0)
+    api = FakeGmailApi(page_size=500).start()
+    try:
+        for index in range(size):
+            api.add_message(mailbox.eml_bytes(index))
+        parser = GmailParser(test_cases_dir=os.devnull, api_url=api.url)
+        first, threads = timed(lambda: sync(parser))
+        requests = len(api.requests)
+        idle, unchanged = timed(lambda: sync(parser))
+        idle_requests = len(api.requests) - requests
+        for index in range(size, size + delta):
+            api.add_message(mailbox.eml_bytes(index))
+        requests = len(api.requests)
+        changed, new = timed(lambda: sync(parser))
+        changed_requests = len(api.requests) - requests
+    finally:
+        api.stop()
+    return first, idle, len(unchanged), idle_requests, changed, len(new), changed_requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--api-sizes", default="500,2000")
+    parser.add_argument("--delta", type=int, default=10)
+    args = parser.parse_args()
+
+    print(".eml directory")
+    print(f"{'messages':>9} {'first sync ms':>14} {'re-read all ms':>15} {'idle poll ms':>13} "
+          f"{'+' + str(args.delta) + ' poll ms':>12} {'returned':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        first, reread, idle, unchanged, changed, new = bench_directory(size, args.delta)
+        print(f"{size:>9,} {first * 1000:>14.1f} {reread * 1000:>15.1f} {idle * 1000:>13.3f} "
+              f"{changed * 1000:>12.1f} {f'{unchanged}/{new}':>9}")
+
+    print("\nGmail API (local fake)")
+    print(f"{'messages':>9} {'first sync ms':>14} {'idle poll ms':>13} {'requests':>9} "
+          f"{'+' + str(args.delta) + ' poll ms':>12} {'requests':>9} {'returned':>9}")
+    for size in (int(s) for s in args.api_sizes.split(",")):
+        first, idle, unchanged, idle_requests, changed, new, changed_requests = bench_api(size, args.delta)
+        print(f"{size:>9,} {first * 1000:>14.1f} {idle * 1000:>13.2f} {idle_requests:>9} "
+              f"{changed * 1000:>12.1f} {changed_requests:>9} {f'{unchanged}/{new}':>9}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: meeting extraction latency, the old per-call-compiled regexes vs the
+bounded single-pass MeetingExtractor, on bodies from 1KB to 1MB newsletters.
+Run from the repo root:  python scripts/bench_meeting_extractor.py
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from meeting_extractor import MeetingExtractor
+
+def legacy_extract(text):
+    """MeetingExtractor.extract before it was bounded"""
+    date_pattern = r'\b(Mon|Tue|Wed|Thu|Fri|Sat|Sun), \d{1,2} (Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)( \d{4})?\b'
+    time_pattern = r'\b\d{1,2}(:\d{2})? ?(am|pm|AM|PM)\b'
+    dates = re.findall(date_pattern, text)
+    times = re.findall(time_pattern, text)
+    if dates or times or 'meeting' in text.lower() or 'zoom' in text.lower():
+        return {
+            "is_meeting": True,
+            "suggested_title": "Meeting",
+            "dates_detected": [d[0] for d in dates] if dates else [],
+            "times_detected": [t[0] for t in times] if times else []
+        }
+    return {"is_meeting": False}
+
+def newsletter_text(size):
+    """Plain text of a newsletter (what enrich() sees after HTML stripping), about `size` chars"""
+    header = ("Community digest - join our webinar Thu, 17 Oct 2024 at 3-4pm on https://us02web.zoom.us/j/8812345678\n\n")
+    story = ("Story {i}: product news, 25 customers and 3 releases this quarter. Read more at https://example.com/{i} "
+             "- event on Oct {day} at {hour}:30pm, tickets from $40.\n")
+    lines = [header]
+    length = len(header)
+    i = 0
+    while length < size:
+        line = story.format(i=i, day=i % 28 + 1, hour=i % 11 + 1)
+        lines.append(line)
+        length += len(line)
+        i += 1
+    return "".join(lines)[:size]
+
+def best_per_call(fn, text, repeat):
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(text)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+def main():
+    extractor = MeetingExtractor()
+    print(f"{'body':>8} {'legacy ms/msg':>14} {'bounded ms/msg':>15} {'speedup':>8}")
+    for size in (1024, 16 * 1024, 128 * 1024, 1024 * 1024):
+        text = newsletter_text(size)
+        repeat = max(3, 2 * 1024 * 1024 // size)
+        legacy = best_per_call(legacy_extract, text, repeat)
+        bounded = best_per_call(extractor.extract, text, repeat)
+        label = f"{size // 1024}KB"
+        print(f"{label:>8} {legacy * 1000:>14.3f} {bounded * 1000:>15.3f} {legacy / bounded:>7.1f}x")
+
+    sample = extractor.extract(newsletter_text(1024 * 1024))
+    print(f"\n1MB newsletter: {len(sample['ranges'])} ranges, first {sample['ranges'][0]}, links {sample['links']}")
+
+if __name__ == '__main__':
+    main()
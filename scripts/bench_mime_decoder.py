@@ -0,0 +1,64 @@
+"""
+Benchmark: body extraction on messages with large attachments.
+Compares the old GmailParser loop (decodes every part, keeps the last one)
+with mime_decoder.extract_body (one walk, attachments never decoded).
+Run from the repo root:  python scripts/bench_mime_decoder.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+from email import policy
+from email.message import EmailMessage
+from email.parser import BytesParser
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from mime_decoder import extract_body
+
+def make_message(attachment_mb, attachments=2):
+    msg = EmailMessage()
+    msg["Subject"] = "Quarterly report"
+    msg["From"] = "client@client.com"
+    msg.set_content("Please review the attached report before Friday.")
+    msg.add_alternative("<p>Please review the attached report before <b>Friday</b>.</p>", subtype="html")
+    blob = os.urandom(attachment_mb * 1024 * 1024)
+    for i in range(attachments):
+        msg.add_attachment(blob, maintype="application", subtype="pdf", filename=f"report-{i}.pdf")
+    return BytesParser(policy=policy.default).parsebytes(msg.as_bytes())
+
+def legacy_body(msg):
+    """GmailParser before the shared decoder"""
+    body = ""
+    if msg.is_multipart():
+        for part in msg.walk():
+            try:
+                body = part.get_payload(decode=True).decode()
+            except:
+                pass
+    else:
+        body = msg.get_payload(decode=True).decode()
+    return body
+
+def measure(fn, msg, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(msg)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(msg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def main():
+    print(f"{'attachments':<14} {'legacy ms':>10} {'legacy peak':>12} {'unified ms':>11} {'unified peak':>13}")
+    for size in (1, 5, 20):
+        msg = make_message(size)
+        old_time, old_peak = measure(legacy_body, msg)
+        new_time, new_peak = measure(extract_body, msg)
+        print(f"{f'2 x {size}MB':<14} {old_time * 1000:>10.2f} {old_peak / 1e6:>10.1f}MB {new_time * 1000:>11.3f} {new_peak / 1e6:>11.3f}MB")
+
+if __name__ == '__main__':
+    main()
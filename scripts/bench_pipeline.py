@@ -0,0 +1,222 @@
+"""
+Offline benchmark suite for the triage pipeline.
+Generates synthetic mailboxes (see synthetic_mailbox.py) and measures
+throughput and latency of GmailParser.fetch_threads, TriageEngine.process_batch,
+ThreadRanker.rank_threads and the /triage and /batch Flask paths - no server needed.
+Results are written as JSON; --compare prints the change against an earlier run.
+
+    python scripts/bench_pipeline.py --sizes 100,1000 --output bench.json
+    python scripts/bench_pipeline.py --sizes 100,1000 --compare bench.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import logging
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(SCRIPTS_DIR, '..', 'backend'))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+# Keep the app's on-disk state out of the working tree before it is imported
+WORK_DIR = tempfile.mkdtemp(prefix="triage-bench-")
+os.environ.setdefault('TRIAGE_STORE_PATH', ':memory:')
+for variable, name in (('USER_RULES_DIR', 'rules'), ('BULK_JOBS_DIR', 'jobs'), ('UPLOAD_SPOOL_DIR', 'spool')):
+    os.environ.setdefault(variable, os.path.join(WORK_DIR, name))
+
+from synthetic_mailbox import SyntheticMailbox
+from gmail_parser import GmailParser
+from triage_engine import TriageEngine
+from thread_ranker import ThreadRanker
+from result_store import ResultStore
+
+# Max /triage requests per size: each one is a full multipart upload
+TRIAGE_REQUESTS = 200
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+def summarize(name, size, items, durations, latencies=None):
+    """One result row; latencies (per item or per request) default to the run durations"""
+    latencies = latencies or durations
+    best = min(durations)
+    return {
+        "name": name,
+        "size": size,
+        "items_per_sec": round(items / best, 1) if best else None,
+        "best_s": round(best, 6),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+        "runs": len(durations),
+    }
+
+def timed(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def bench_fetch(mail_dir, size, repeat):
+    rows = []
+    # Cold: a fresh parser (and cache) per run, so every file is parsed
+    cold = []
+    for _ in range(repeat):
+        parser = GmailParser(test_cases_dir=mail_dir, cache_size=size)
+        start = time.perf_counter()
+        parser.fetch_threads(limit=size)
+        cold.append(time.perf_counter() - start)
+    rows.append(summarize("fetch_threads.cold", size, size, cold))
+
+    parser = GmailParser(test_cases_dir=mail_dir, cache_size=size)
+    parser.fetch_threads(limit=size)
+    rows.append(summarize("fetch_threads.cached", size, size, timed(lambda: parser.fetch_threads(limit=size), repeat)))
+    return rows
+
+def bench_engine(threads, size, repeat):
+    engine = TriageEngine()
+    results = []
+    durations = timed(lambda: results.append(engine.process_batch(threads)), repeat)
+    rows = [summarize("TriageEngine.process_batch", size, size, durations)]
+
+    ranker = ThreadRanker()
+    processed = results[-1]
+    rows.append(summarize("ThreadRanker.rank_threads", size, size, timed(lambda: ranker.rank_threads(processed), repeat)))
+    return rows
+
+def bench_flask(mailbox, mail_dir, size, repeat):
+    import app as app_module
+    client = app_module.app.test_client()
+    rows = []
+
+    def post_batch():
+        # /batch caps ?limit= at MAX_PAGE_LIMIT: larger mailboxes are walked page by page
+        cursor, remaining = None, size
+        while remaining:
+            limit = min(remaining, app_module.MAX_PAGE_LIMIT)
+            response = client.post(f'/batch?limit={limit}' + (f'&cursor={cursor}' if cursor else ''))
+            assert response.status_code == 200, response.get_data(as_text=True)
+            cursor, remaining = response.get_json()['next_cursor'], remaining - limit
+
+    original_parser, original_store = app_module.gmail_parser, app_module.result_store
+    try:
+        # /triage: one multipart upload per message, per-request latency. /triage reads
+        # through the result store, so each run gets a fresh one or repeats would only time hits
+        requests = min(size, TRIAGE_REQUESTS)
+        payloads = [mailbox.eml_bytes(i) for i in range(requests)]
+        latencies, durations = [], []
+        for _ in range(repeat):
+            app_module.result_store = ResultStore()
+            start = time.perf_counter()
+            for index, payload in enumerate(payloads):
+                request_start = time.perf_counter()
+                response = client.post('/triage', data={'file': (io.BytesIO(payload), f'message_{index}.eml')},
+                                       content_type='multipart/form-data')
+                latencies.append(time.perf_counter() - request_start)
+                assert response.status_code == 200, response.get_data(as_text=True)
+            durations.append(time.perf_counter() - start)
+        rows.append(summarize("POST /triage", size, requests, durations, latencies))
+
+        # /batch over the synthetic directory; a fresh parser and result store per run keep it cold
+        cold = []
+        for _ in range(repeat):
+            app_module.gmail_parser = GmailParser(test_cases_dir=mail_dir, cache_size=size)
+            app_module.result_store = ResultStore()
+            start = time.perf_counter()
+            post_batch()
+            cold.append(time.perf_counter() - start)
+        rows.append(summarize("POST /batch.cold", size, size, cold))
+
+        # Later passes hit the message cache and read triage results back from the store
+        warm = timed(post_batch, repeat)
+        rows.append(summarize("POST /batch.stored", size, size, warm))
+    finally:
+        app_module.gmail_parser, app_module.result_store = original_parser, original_store
+    return rows
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(rows, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    print(f"\nChange vs {baseline_path} (items/s, higher is better):")
+    for row in rows:
+        old = baseline.get((row["name"], row["size"]))
+        if old and old.get("items_per_sec") and row["items_per_sec"]:
+            change = (row["items_per_sec"] / old["items_per_sec"] - 1) * 100
+            print(f"  {row['name']:<28} {row['size']:>7} {change:>+8.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline triage pipeline benchmarks")
+    parser.add_argument("--sizes", default="100,1000", help="comma-separated mailbox sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--html-ratio", type=float, default=0.3)
+    parser.add_argument("--attachment-ratio", type=float, default=0.1)
+    parser.add_argument("--attachment-kb", type=int, default=256)
+    parser.add_argument("--skip-flask", action="store_true", help="only benchmark the library entry points")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier JSON output to compare against")
+    args = parser.parse_args()
+
+    # Request logging would dominate the Flask numbers
+    logging.disable(logging.INFO)
+    mailbox = SyntheticMailbox(seed=args.seed, html_ratio=args.html_ratio,
+                               attachment_ratio=args.attachment_ratio, attachment_kb=args.attachment_kb)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    rows = []
+    try:
+        for size in sizes:
+            mail_dir = os.path.join(WORK_DIR, f"mailbox_{size}")
+            mailbox.write(mail_dir, size)
+            threads = mailbox.threads(size)
+            rows += bench_fetch(mail_dir, size, args.repeat)
+            rows += bench_engine(threads, size, args.repeat)
+            if not args.skip_flask:
+                rows += bench_flask(mailbox, mail_dir, size, args.repeat)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "html_ratio": args.html_ratio,
+            "attachment_ratio": args.attachment_ratio,
+            "attachment_kb": args.attachment_kb,
+        },
+        "results": rows,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'benchmark':<28} {'size':>7} {'items/s':>11} {'p50 ms':>9} {'p95 ms':>9}")
+    for row in rows:
+        print(f"{row['name']:<28} {row['size']:>7} {row['items_per_sec']:>11,.1f} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f}")
+    print(f"\nWrote {args.output}")
+    if args.compare:
+        compare(rows, args.compare)
+
+if __name__ == '__main__':
+    main()
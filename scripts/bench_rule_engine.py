@@ -0,0 +1,63 @@
+"""
+Benchmark: custom rule evaluation cost at 1, 100 and 10,000 rules.
+Compares the compiled rule set with a naive loop over every rule.
+Run from the repo root:  python scripts/bench_rule_engine.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from rule_engine import CompiledRuleSet, _sender_address
+from gmail_parser import GmailParser
+
+def make_rules(count):
+    """A realistic mix: exact senders, sender domains and subject/body keywords"""
+    rules = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            rules.append({"sender": f"person{i}@partner{i % 97}.com", "weight": 1})
+        elif kind == 1:
+            rules.append({"sender_domain": f"vendor{i}.io", "folder": "Vendors"})
+        elif kind == 2:
+            rules.append({"keyword": f"project {i}", "field": "subject", "weight": 0.5})
+        else:
+            rules.append({"keyword": f"ticket-{i}x", "field": "body", "folder": "Support"})
+    return rules
+
+def naive_match(rules, thread):
+    """One check per rule, lowercasing per rule - what hardcoded if-chains scale to"""
+    matched = []
+    for index, rule in enumerate(rules):
+        if "sender" in rule:
+            hit = _sender_address(thread.get("sender")) == rule["sender"]
+        elif "sender_domain" in rule:
+            hit = _sender_address(thread.get("sender")).endswith("@" + rule["sender_domain"])
+        else:
+            hit = rule["keyword"] in (thread.get(rule.get("field", "subject")) or "").lower()
+        if hit:
+            matched.append(index)
+    return matched
+
+def per_email_us(fn, threads, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for thread in threads:
+            fn(thread)
+        best = min(best, time.perf_counter() - start)
+    return best / len(threads) * 1e6
+
+if __name__ == "__main__":
+    threads = GmailParser(test_cases_dir=os.path.join(os.path.dirname(__file__), '..', 'test_cases')).fetch_threads(limit=200)
+    print(f"{'rules':>8}{'compile ms':>12}{'compiled us/email':>20}{'naive us/email':>17}")
+    for count in (1, 100, 10000):
+        rules = make_rules(count)
+        start = time.perf_counter()
+        ruleset = CompiledRuleSet(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+        compiled = per_email_us(ruleset.match, threads)
+        naive = per_email_us(lambda thread: naive_match(rules, thread), threads, repeat=1)
+        print(f"{count:>8}{compile_ms:>12.1f}{compiled:>20.1f}{naive:>17.1f}")
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: ScaleDownCompressor vs the original regex chain.
+Run from the repo root:  python scripts/bench_scale_down.py
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from scale_down import ScaleDownCompressor
+
+def legacy_scale_down(text):
+    """The pre-compiled-pipeline implementation, kept verbatim for comparison"""
+    if not text:
+        return ""
+    text = re.sub(r'On .* wrote:.*', '', text, flags=re.DOTALL)
+    text = re.sub(r'>.*', '', text)
+    text = re.sub(r'Best regards,.*', '', text, flags=re.DOTALL)
+    text = re.sub(r'Sincerely,.*', '', text, flags=re.DOTALL)
+    text = " ".join(text.split())
+    sentences = text.split('. ')
+    if len(sentences) > 5:
+        return ". ".join(sentences[:2] + sentences[-1:]) + "."
+    return text
+
+def make_corpus():
+    """Typical replies and signed messages plus one large body without any cut marker"""
+    paragraph = (
+        "Hi team, please review the attached proposal before Friday. "
+        "Budget-wise we are on track. The client asked for a revised timeline. "
+        "Let me know if anything is blocking you.\n"
+    )
+    # "On ..." mid-sentence is the worst case for the legacy `On .* wrote:.*` pattern
+    aside = "On the budget side nothing changed since last week.\n"
+    quoted = "".join(f"> previous message line {i}\n" for i in range(40))
+    reply = paragraph * 3 + "\nOn Wed, 12 Feb 2025 at 10:00, Alice <alice@example.com> wrote:\n" + quoted
+    signed = paragraph * 2 + "\nBest regards,\nBob\nVP Sales | Example Corp\n"
+    large = (paragraph + aside) * 4000  # ~1MB without any reply header
+    return {
+        "reply_with_quotes": [reply] * 2000,
+        "signed_message": [signed] * 2000,
+        "large_plain_body": [large],
+    }
+
+def measure(fn, bodies, repeat=3):
+    """Best-of-`repeat` throughput in MB/s"""
+    elapsed = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            fn(body)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    megabytes = sum(len(body) for body in bodies) / (1024 * 1024)
+    return megabytes / elapsed if elapsed else float('inf')
+
+if __name__ == "__main__":
+    compressor = ScaleDownCompressor()
+    print(f"{'corpus':<22}{'legacy MB/s':>14}{'compiled MB/s':>16}{'speedup':>10}")
+    for name, bodies in make_corpus().items():
+        legacy = measure(legacy_scale_down, bodies)
+        compiled = measure(compressor.compress, bodies)
+        print(f"{name:<22}{legacy:>14.1f}{compiled:>16.1f}{compiled / legacy:>9.1f}x")
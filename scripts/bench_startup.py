@@ -0,0 +1,125 @@
+"""
+Cold-start benchmark for the backend, based on `python -X importtime`.
+Each run is a fresh interpreter that imports app, builds the application with
+create_app() and serves one /health request; the importtime report shows
+which modules the import paid for.
+
+    python scripts/bench_startup.py --runs 5
+    python scripts/bench_startup.py --runs 5 --budget-ms 150 --output startup.json
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(SCRIPTS_DIR, '..', 'backend'))
+
+# Imported by the web framework itself; everything else under app is the backend's own cost
+FRAMEWORK_MODULES = ("flask", "flask_cors")
+# Must only be imported when a request needs them
+HEAVY_MODULES = (
+    "numpy", "yaml", "bs4", "multiprocessing",
+    "nltk", "textblob", "openai", "googleapiclient", "google_auth_oauthlib",
+)
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+application.test_client().get('/health')
+served = time.perf_counter()
+print(json.dumps({"create_app_ms": (created - imported) * 1000, "first_request_ms": (served - created) * 1000}))
+"""
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `-X importtime` output, in report order"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def app_import_cost(rows):
+    """(total, backend-only) microseconds for `import app`; backend-only excludes the framework"""
+    total = next(cumulative for name, _, cumulative, depth in rows if name == "app" and depth == 0)
+    # Direct children of app are reported (depth 1) just before it
+    framework = sum(cumulative for name, _, cumulative, depth in rows
+                    if depth == 1 and name.split(".")[0] in FRAMEWORK_MODULES)
+    return total, total - framework
+
+def probe(work_dir, probe_code=PROBE):
+    """One cold start in a fresh interpreter: (importtime rows, probe timings)"""
+    # Every on-disk path points into work_dir, so files created at startup show up there
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR,
+               TRIAGE_STORE_PATH=os.path.join(work_dir, 'results.db'),
+               USER_RULES_DIR=os.path.join(work_dir, 'rules'),
+               BULK_JOBS_DIR=os.path.join(work_dir, 'jobs'),
+               UPLOAD_SPOOL_DIR=os.path.join(work_dir, 'spool'))
+    env.pop('LOG_FILE', None)
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", probe_code], cwd=work_dir,
+                               env=env, capture_output=True, text=True, check=True)
+    output = completed.stdout.strip()
+    timings = json.loads(output.splitlines()[-1]) if output else {}
+    return parse_importtime(completed.stderr), timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend cold-start benchmark (python -X importtime)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if the backend-only import median exceeds this")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="triage-startup-")
+    runs = []
+    try:
+        for _ in range(args.runs):
+            runs.append(probe(work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    costs = [app_import_cost(rows) for rows, _ in runs]
+    report = {
+        "runs": args.runs,
+        "import_app_ms": round(statistics.median(total for total, _ in costs) / 1000, 1),
+        "import_backend_ms": round(statistics.median(own for _, own in costs) / 1000, 1),
+        "create_app_ms": round(statistics.median(t["create_app_ms"] for _, t in runs), 1),
+        "first_request_ms": round(statistics.median(t["first_request_ms"] for _, t in runs), 1),
+        "heavy_modules_imported": sorted({name for rows, _ in runs for name, _, _, _ in rows
+                                          if name.split(".")[0] in HEAVY_MODULES}),
+    }
+    # Slowest top-level imports of the last run
+    rows = runs[-1][0]
+    report["slowest"] = [{"module": name, "cumulative_ms": round(cumulative / 1000, 1), "self_ms": round(self_us / 1000, 1)}
+                         for name, self_us, cumulative, depth in sorted(rows, key=lambda r: -r[2])[:args.top]]
+
+    print(f"import app (median of {args.runs}):  {report['import_app_ms']:.1f} ms "
+          f"(backend only {report['import_backend_ms']:.1f} ms)")
+    print(f"create_app():                {report['create_app_ms']:.1f} ms")
+    print(f"first /health request:       {report['first_request_ms']:.1f} ms")
+    print(f"heavy modules at startup:    {', '.join(report['heavy_modules_imported']) or 'none'}")
+    print(f"\n{'module':<40} {'cumulative ms':>14} {'self ms':>9}")
+    for row in report["slowest"]:
+        print(f"{row['module']:<40} {row['cumulative_ms']:>14.1f} {row['self_ms']:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.budget_ms is not None and report["import_backend_ms"] > args.budget_ms:
+        print(f"\nBackend import {report['import_backend_ms']:.1f} ms exceeds the {args.budget_ms:.1f} ms budget")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Benchmark: triaging long reply chains, one "thread" per .eml file (quoted
+history re-compressed in every reply) vs conversations threaded on
+Message-ID / In-Reply-To / References with per-message compression reuse.
+Run from the repo root:  python scripts/bench_threading.py --chains 20 --depth 40
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from gmail_parser import GmailParser
+from triage_engine import TriageEngine
+
+EPOCH = datetime(2024, 1, 1, 9, 0)
+
+def reply_text(chain, depth):
+    return (f"Reply {depth} on project {chain}: the numbers for step {depth} look fine, "
+            f"please review the attached notes before Friday. We agreed to ship in week {depth % 52}.")
+
+def write_chain(directory, chain, depth, start=0):
+    """Messages start..depth-1 of a chain; each reply quotes the whole conversation so far"""
+    quoted = [reply_text(chain, level) for level in range(start)]
+    for level in range(start, depth):
+        text = reply_text(chain, level)
+        body = text + "".join(f"\n\nOn {format_datetime(EPOCH)}, someone wrote:\n" + "\n".join(
+            "> " * (level - index) + line for line in old.split(". ")) for index, old in enumerate(reversed(quoted)))
+        references = " ".join(f"<{chain}.{index}@bench>" for index in range(level))
+        headers = [
+            f"From: user{level % 5}@example.com",
+            f"Subject: {'Re: ' if level else ''}Project {chain}",
+            f"Date: {format_datetime(EPOCH + timedelta(days=chain, minutes=level))}",
+            f"Message-ID: <{chain}.{level}@bench>",
+        ]
+        if level:
+            headers += [f"In-Reply-To: <{chain}.{level - 1}@bench>", f"References: {references}"]
+        with open(os.path.join(directory, f"chain{chain:04d}_{level:04d}.eml"), "w") as f:
+            f.write("\n".join(headers) + "\n\n" + body + "\n")
+        quoted.append(text)
+
+def triage_all(parser, engine, count):
+    start = time.perf_counter()
+    threads = parser.fetch_threads(limit=count)
+    results = engine.process_batch(threads)
+    return time.perf_counter() - start, results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chains", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=40)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="triage-threads-")
+    try:
+        for chain in range(args.chains):
+            write_chain(directory, chain, args.depth)
+        files = args.chains * args.depth
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+        # Parsing is the same for both (and cached); warm it so triage is what gets compared
+        per_file_parser = GmailParser(test_cases_dir=directory, thread_messages=False)
+        threaded_parser = GmailParser(test_cases_dir=directory)
+        per_file_parser.fetch_threads(limit=files)
+        threaded_parser.fetch_threads(limit=args.chains)
+
+        per_file, per_file_results = triage_all(per_file_parser, TriageEngine(), files)
+        engine = TriageEngine()
+        threaded, threaded_results = triage_all(threaded_parser, engine, args.chains)
+        cold_misses = engine.message_misses
+
+        # One more reply lands in every chain: only the new messages are compressed
+        for chain in range(args.chains):
+            write_chain(directory, chain, args.depth + 1, start=args.depth)
+        threaded_parser.fetch_threads(limit=args.chains)
+        incremental, _ = triage_all(threaded_parser, engine, args.chains)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{args.chains} chains x {args.depth} replies = {files:,} files, {size / 1024 / 1024:.1f} MB with quoted history")
+    print(f"{'mode':<40} {'results':>8} {'triage ms':>10}")
+    print(f"{'one thread per file':<40} {len(per_file_results):>8} {per_file * 1000:>10.1f}")
+    print(f"{'threaded, cold message cache':<40} {len(threaded_results):>8} {threaded * 1000:>10.1f}")
+    print(f"{'threaded, +1 reply per chain':<40} {len(threaded_results):>8} {incremental * 1000:>10.1f}")
+    print(f"\nmessages compressed: {cold_misses:,} cold, {engine.message_misses - cold_misses} after the new replies "
+          f"({engine.message_hits:,} reused); threading is {per_file / threaded:.1f}x faster cold, "
+          f"{per_file / incremental:.1f}x on the incremental pass")
+
+if __name__ == '__main__':
+    main()
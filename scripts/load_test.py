@@ -0,0 +1,145 @@
+"""
+HTTP load test: requests/sec of the Flask dev server vs serve.py.
+Each server runs in a subprocess on a free port with its on-disk state in a
+temp directory; concurrent keep-alive clients hit /health, /threads and a
+JSON /triage in turn.
+
+    python scripts/load_test.py --duration 10 --concurrency 16
+    python scripts/load_test.py --targets "serve:1x8,serve:4x8"
+"""
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(SCRIPTS_DIR, '..', 'backend'))
+
+TRIAGE_BODY = json.dumps({
+    "subject": "Urgent: contract review before Friday",
+    "sender": "ceo@example.com",
+    "body": "Please review the attached contract and approve the budget by Friday. "
+            "Can we meet tomorrow at 3pm to discuss?",
+}).encode()
+
+REQUESTS = (
+    ("GET", "/health", None),
+    ("GET", "/threads?limit=10", None),
+    ("POST", "/triage", TRIAGE_BODY),
+)
+
+# Dev server as `python app.py` runs it, minus the reloader (it would fork a second process)
+DEV_SERVER = "import sys, app; app.app.run(port=int(sys.argv[1]), debug=True, use_reloader=False)"
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(target, port, work_dir):
+    """target is "dev" or "serve:<workers>x<threads>"; returns the Popen"""
+    env = dict(os.environ, TRIAGE_STORE_PATH=os.path.join(work_dir, 'results.db'),
+               USER_RULES_DIR=os.path.join(work_dir, 'rules'), BULK_JOBS_DIR=os.path.join(work_dir, 'jobs'),
+               UPLOAD_SPOOL_DIR=os.path.join(work_dir, 'spool'), PRODUCTIVITY_DB=os.path.join(work_dir, 'productivity.db'))
+    if target == "dev":
+        command = [sys.executable, "-c", DEV_SERVER, str(port)]
+    else:
+        workers, threads = target.split(":", 1)[1].split("x")
+        command = [sys.executable, "serve.py", "--port", str(port), "--workers", workers, "--threads", threads]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_ready(port, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not come up")
+
+def client(port, deadline, latencies, errors):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    index = 0
+    while time.perf_counter() < deadline:
+        method, path, body = REQUESTS[index % len(REQUESTS)]
+        index += 1
+        headers = {"Content-Type": "application/json"} if body else {}
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+def run_load(port, duration, concurrency):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    workers = [threading.Thread(target=client, args=(port, deadline, latencies, errors)) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Dev server vs production server load test")
+    parser.add_argument("--targets", default="dev,serve:1x8,serve:4x8",
+                        help='comma-separated: "dev" or "serve:<workers>x<threads>"')
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per target")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    args = parser.parse_args()
+
+    rows = []
+    for target in args.targets.split(","):
+        work_dir = tempfile.mkdtemp(prefix="triage-load-")
+        port = free_port()
+        server = start_server(target, port, work_dir)
+        try:
+            wait_ready(port)
+            run_load(port, args.warmup, args.concurrency)
+            rows.append(dict(run_load(port, args.duration, args.concurrency), target=target))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'target':<14} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'requests':>9} {'errors':>7}")
+    for row in rows:
+        print(f"{row['target']:<14} {row['req_per_sec']:>9,.1f} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+              f"{row['requests']:>9} {row['errors']:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -10,8 +10,8 @@ if exist ..\venv\Scripts\activate call ..\venv\Scripts\activate
 :: Navigate to backend to ensure imports work correctly
 cd backend
 
-:: Start Waitress Server
+:: Start Waitress Server (engines preloaded, debug off; see serve.py for --threads/--workers)
 echo [INFO] Server listening on http://127.0.0.1:5000
-waitress-serve --listen=127.0.0.1:5000 --call app:app
+python serve.py --host 127.0.0.1 --port 5000
 
 pause
@@ -0,0 +1,173 @@
+"""
+Synthetic mailbox generator for offline benchmarks.
+Builds on GmailParser._generate_mock_thread and adds what real mail has:
+quoted reply chains, signatures, HTML alternatives, attachments and
+near-identical bulk mail (newsletters, notification blasts).
+Output is deterministic for a given seed (dates count back from a fixed epoch).
+
+    python scripts/synthetic_mailbox.py --count 1000 --output /tmp/mailbox
+"""
+import os
+import sys
+import random
+import argparse
+from email.message import EmailMessage
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from gmail_parser import GmailParser
+
+EPOCH = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+NAMES = ["Alex Morgan", "Priya Shah", "Sam Lee", "Jordan Kim", "Taylor Reed"]
+TITLES = ["Account Director", "Engineering Manager", "CEO", "Support Lead", "Finance"]
+PHRASES = [
+    "Please review the attached proposal before the deadline.",
+    "Can you approve the budget update by Friday?",
+    "Following up on the invoice from last month.",
+    "The meeting has moved to 3pm, invite to follow.",
+    "Here is the weekly newsletter with product news.",
+    "Unsubscribe or manage preferences at any time.",
+]
+
+# Bulk mail: one template per sender, personalised per copy (name, counts, tracking token)
+BLASTS = [
+    ("newsletter@spam.com", "Weekly Tech Trends #{issue}",
+     "Hi {first},\n\nHere are the top stories this week, picked for you from {count} articles:\n"
+     "- Chip makers race to ship smaller models on laptops\n"
+     "- Why every startup is rewriting its billing stack\n"
+     "- Ten keyboard shortcuts that save an hour a week\n\n"
+     "Read online: https://news.example.com/issue/{issue}?u={token}\n\n"
+     "You are receiving this because you subscribed to Tech Trends.\n"
+     "Unsubscribe: https://news.example.com/unsubscribe/{token}"),
+    ("noreply@social.com", "{who} followed you",
+     "{who} followed you on SocialPlatform.\n\n"
+     "You now have {count} followers. See their profile and follow back:\n"
+     "https://social.example.com/p/{token}\n\n"
+     "Manage preferences for which notifications you receive in your account settings."),
+    ("deals@shop.example.com", "{first}, your {percent}% coupon expires soon",
+     "Hi {first},\n\nYour exclusive coupon for {percent}% off everything in store ends this weekend.\n"
+     "Use code SAVE{percent} at checkout on orders over $50. Free shipping on all orders this week.\n\n"
+     "Shop now: https://shop.example.com/c/{token}\n\n"
+     "Unsubscribe from promotional emails: https://shop.example.com/u/{token}"),
+]
+
+class SyntheticMailbox:
+    """
+    Deterministic synthetic mail.
+    html_ratio / attachment_ratio: share of messages with an HTML part / attachment;
+    max_quoted: deepest quoted reply chain; attachment_kb: size of each attachment;
+    blast_ratio: share of messages that are personalised copies of a bulk mailing.
+    """
+
+    def __init__(self, seed=0, html_ratio=0.3, attachment_ratio=0.1, max_quoted=3, attachment_kb=256,
+                 blast_ratio=0.0):
+        self.seed = seed
+        self.blast_ratio = blast_ratio
+        self.html_ratio = html_ratio
+        self.attachment_ratio = attachment_ratio
+        self.max_quoted = max_quoted
+        self.attachment_kb = attachment_kb
+        self._mock = GmailParser(test_cases_dir=os.devnull)
+
+    def _rng(self, index):
+        return random.Random(self.seed * 1000003 + index)
+
+    def thread(self, index):
+        """Thread dict (as GmailParser yields) with a realistic body"""
+        rng = self._rng(index)
+        thread = self._mock._generate_mock_thread(index)
+        thread["date"] = format_datetime(EPOCH - timedelta(minutes=index * 10))
+        # A separate stream, so adding blasts leaves the other messages unchanged
+        blast_rng = random.Random(f"blast-{self.seed}-{index}")
+        if self.blast_ratio and blast_rng.random() < self.blast_ratio:
+            thread["sender"], thread["subject"], thread["body"] = self._blast(blast_rng, index)
+        else:
+            thread["body"] = self._body(rng, thread)
+        thread["snippet"] = thread["body"][:50] + "..."
+        thread["messages"] = [{"role": "user", "content": thread["body"]}]
+        return thread
+
+    def threads(self, count):
+        return [self.thread(i) for i in range(count)]
+
+    def _body(self, rng, thread):
+        name = rng.choice(NAMES)
+        lines = [thread["body"], ""]
+        lines.extend(rng.choice(PHRASES) for _ in range(rng.randint(1, 4)))
+        lines += ["", rng.choice(["Best regards,", "Sincerely,", "-- "]), name, rng.choice(TITLES)]
+        # Quoted history, one level deeper per earlier reply
+        for depth in range(1, rng.randint(0, self.max_quoted) + 1):
+            lines += ["", f"On {thread['date']}, {rng.choice(NAMES)} <{thread['sender']}> wrote:"]
+            lines.extend(">" * depth + " " + rng.choice(PHRASES) for _ in range(rng.randint(2, 6)))
+        return "\n".join(lines)
+
+    def _blast(self, rng, index):
+        sender, subject, body = rng.choice(BLASTS)
+        values = {
+            "first": rng.choice(NAMES).split()[0],
+            "who": rng.choice(NAMES),
+            "issue": 100 + index // 1000,
+            "count": rng.randint(2, 5000),
+            "percent": rng.choice((10, 15, 20)),
+            "token": "%016x" % rng.getrandbits(64),
+        }
+        return sender, subject.format(**values), body.format(**values)
+
+    def eml_bytes(self, index):
+        """RFC 822 message for thread `index`: text, optional HTML alternative and attachment"""
+        rng = self._rng(index)
+        thread = self.thread(index)
+        msg = EmailMessage()
+        msg["Subject"] = thread["subject"]
+        msg["From"] = thread["sender"]
+        msg["To"] = "me@example.com"
+        msg["Date"] = thread["date"]
+        msg["Message-ID"] = f"<{thread['id']}@synthetic.example>"
+        msg.set_content(thread["body"])
+        if rng.random() < self.html_ratio:
+            paragraphs = "".join(f"<p>{line}</p>" for line in thread["body"].split("\n") if line)
+            msg.add_alternative(
+                f"<html><head><style>p {{ margin: 0 }}</style><script>track({index})</script></head>"
+                f"<body><table><tr><td>{paragraphs}</td></tr></table></body></html>",
+                subtype="html",
+            )
+        if rng.random() < self.attachment_ratio:
+            msg.add_attachment(rng.randbytes(self.attachment_kb * 1024) if hasattr(rng, "randbytes")
+                               else os.urandom(self.attachment_kb * 1024),
+                               maintype="application", subtype="pdf", filename=f"document-{index}.pdf")
+        # Fixed boundaries keep the bytes reproducible
+        for number, part in enumerate(msg.walk()):
+            if part.is_multipart():
+                part.set_boundary(f"==synthetic-{index}-{number}==")
+        return msg.as_bytes()
+
+    def write(self, directory, count):
+        """Write `count` .eml files into directory; returns their paths"""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for index in range(count):
+            path = os.path.join(directory, f"synthetic_{index:07d}.eml")
+            with open(path, "wb") as f:
+                f.write(self.eml_bytes(index))
+            paths.append(path)
+        return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--output", required=True, help="directory for the .eml files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--html-ratio", type=float, default=0.3)
+    parser.add_argument("--attachment-ratio", type=float, default=0.1)
+    parser.add_argument("--blast-ratio", type=float, default=0.0)
+    args = parser.parse_args()
+    mailbox = SyntheticMailbox(seed=args.seed, html_ratio=args.html_ratio, attachment_ratio=args.attachment_ratio,
+                               blast_ratio=args.blast_ratio)
+    mailbox.write(args.output, args.count)
+    print(f"Wrote {args.count} messages to {args.output}")
+
+if __name__ == '__main__':
+    main()
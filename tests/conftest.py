@@ -0,0 +1,18 @@
+"""
+Test-run defaults: the app's bulk-job journals, result database, upload
+spool, calendars, rules and log go to a temporary directory instead of the
+checkout. Set before any test module imports the app.
+"""
+import os
+import atexit
+import shutil
+import tempfile
+
+STATE_DIR = tempfile.mkdtemp(prefix="triage-tests-")
+atexit.register(shutil.rmtree, STATE_DIR, ignore_errors=True)
+
+for name, default in (('BULK_JOBS_DIR', 'bulk_jobs'), ('TRIAGE_STORE_PATH', 'triage_results.db'),
+                      ('UPLOAD_SPOOL_DIR', 'upload_spool'), ('CALENDAR_DIR', 'calendars'),
+                      ('USER_RULES_DIR', 'user_rules')):
+    os.environ.setdefault(name, os.path.join(STATE_DIR, default))
+os.environ.setdefault('LOG_FILE', '')
@@ -0,0 +1,110 @@
+"""
+Local fake of the Gmail REST API for sync tests: users.getProfile,
+messages.list/get (format=raw), threads.get and history.list, served by
+http.server on 127.0.0.1 from an in-memory mailbox.
+"""
+import json
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PREFIX = "/gmail/v1/users/me/"
+
+class FakeGmailApi:
+    """In-memory mailbox; every added message gets the next historyId"""
+
+    def __init__(self, page_size=100):
+        self.page_size = page_size
+        self.history_id = 1000
+        self.oldest_history = self.history_id   # history.list before this returns 404
+        self.messages = {}       # id -> (threadId, raw bytes)
+        self.threads = {}        # threadId -> [message ids]
+        self.history = []        # (historyId, message id)
+        self.requests = []       # request paths, for asserting on API traffic
+        self._lock = threading.Lock()
+        self._server = None
+
+    def add_message(self, raw, thread_id=None):
+        """Deliver a message (to thread_id, or a new thread); returns its id"""
+        with self._lock:
+            self.history_id += 1
+            message_id = f"{self.history_id:x}"
+            thread_id = thread_id or message_id
+            self.messages[message_id] = (thread_id, raw)
+            self.threads.setdefault(thread_id, []).append(message_id)
+            self.history.append((self.history_id, message_id))
+            return message_id
+
+    def expire_history(self):
+        """Forget history up to now, like Gmail does after about a week"""
+        with self._lock:
+            self.oldest_history = self.history_id
+            self.history = []
+
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                with api._lock:
+                    api.requests.append(url.path)
+                    status, body = api._route(url.path, {k: v[0] for k, v in parse_qs(url.query).items()})
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _page(self, items, query):
+        start = int(query.get("pageToken", 0))
+        size = min(int(query.get("maxResults", self.page_size)), self.page_size)
+        page = {}
+        if start + size < len(items):
+            page["nextPageToken"] = str(start + size)
+        return items[start:start + size], page
+
+    def _route(self, path, query):
+        if not path.startswith(PREFIX):
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        parts = path[len(PREFIX):].split("/")
+        if parts == ["profile"]:
+            return 200, {"emailAddress": "me@example.com", "messagesTotal": len(self.messages),
+                         "historyId": str(self.history_id)}
+        if parts == ["messages"]:
+            refs = [{"id": mid, "threadId": tid} for mid, (tid, _) in self.messages.items()]
+            items, page = self._page(refs, query)
+            return 200, dict(page, messages=items, resultSizeEstimate=len(refs))
+        if len(parts) == 2 and parts[0] == "messages" and parts[1] in self.messages:
+            thread_id, raw = self.messages[parts[1]]
+            return 200, {"id": parts[1], "threadId": thread_id,
+                         "raw": base64.urlsafe_b64encode(raw).decode("ascii")}
+        if len(parts) == 2 and parts[0] == "threads" and parts[1] in self.threads:
+            return 200, {"id": parts[1], "messages": [{"id": mid, "threadId": parts[1]}
+                                                      for mid in self.threads[parts[1]]]}
+        if parts == ["history"]:
+            start = int(query["startHistoryId"])
+            if start < self.oldest_history:
+                return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+            records = [{"id": str(hid), "messagesAdded": [{"message": {"id": mid, "threadId": self.messages[mid][0]}}]}
+                       for hid, mid in self.history if hid > start]
+            items, page = self._page(records, query)
+            return 200, dict(page, history=items, historyId=str(self.history_id))
+        return 404, {"error": {"code": 404, "message": "Not Found"}}
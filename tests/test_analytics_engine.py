@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+import random
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from analytics_engine import AnalyticsEngine, SpaceSaving, DAY_SECONDS
+from app import app
+import app as app_module
+
+NOW = 1_700_000_000
+
+class TestSpaceSaving(unittest.TestCase):
+    def test_heavy_hitters_survive_bounded_memory(self):
+        counter = SpaceSaving(capacity=10)
+        rng = random.Random(7)
+        # N = 8500: both senders exceed N / capacity = 850, and even overestimated
+        # by up to 850, client@ stays below boss@, so the order is guaranteed
+        stream = ["boss@company.com"] * 3000 + ["client@corp.com"] * 1500
+        stream += [f"noise{i}@spam.com" for i in range(4000)]
+        rng.shuffle(stream)
+        for sender in stream:
+            counter.add(sender)
+        top = [sender for sender, _ in counter.top(2)]
+        self.assertEqual(top, ["boss@company.com", "client@corp.com"])
+        self.assertLessEqual(len(counter.top(100)), 10)
+
+class TestAnalyticsEngine(unittest.TestCase):
+    def test_trends_from_recorded_events(self):
+        engine = AnalyticsEngine()
+        for day_offset, count in ((0, 3), (1, 2), (40, 5)):
+            for _ in range(count):
+                engine.record({"sender": "Boss <boss@company.com>", "priority": 5, "timestamp": NOW - day_offset * DAY_SECONDS - 900},
+                              now=NOW - day_offset * DAY_SECONDS)
+        engine.record({"sender": "news@spam.com", "priority": 1, "timestamp": NOW - 2 * DAY_SECONDS}, now=NOW)
+
+        trends = engine.get_trends(now=NOW)
+        self.assertEqual(len(trends["daily_volume"]), 30)
+        self.assertEqual(trends["daily_volume"][-1], 4)
+        self.assertEqual(sum(trends["weekly_volume"]), 6)  # the 40-day-old events rolled out
+        self.assertEqual(trends["top_senders"][0], {"email": "boss@company.com", "count": 10})
+        # Percentiles are accurate to one histogram bucket (25%)
+        p50 = trends["response_time_percentiles"]["urgent"]["p50"]
+        self.assertTrue(900 <= p50 <= 900 * 1.25, p50)
+        self.assertEqual(trends["response_times"]["low"], "2d")
+        self.assertEqual(trends["response_times"]["normal"], "n/a")
+
+    def test_endpoint_reflects_triage(self):
+        client = app.test_client()
+        client.post('/triage', json={"subject": "Hello", "sender": "analytics-test@example.com", "body": "Body"})
+        senders = [s["email"] for s in client.get('/analytics').get_json()["top_senders"]]
+        self.assertIn("analytics-test@example.com", senders)
+
+    def test_repeated_content_is_counted_once(self):
+        # Like /batch, /triage records a thread when its content is first triaged
+        for name, value in (('analytics_engine', AnalyticsEngine()), ('result_store', app_module.ResultStore())):
+            self.addCleanup(setattr, app_module, name, getattr(app_module, name))
+            setattr(app_module, name, value)
+        client = app.test_client()
+        email = {"subject": "Standup", "sender": "repeat@example.com", "body": "Standup moved to 10am."}
+        for _ in range(3):
+            self.assertEqual(client.post('/triage', json=email).status_code, 200)
+        self.assertEqual(client.get('/analytics').get_json()["daily_volume"][-1], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,16 @@ import os
 import sys
 import io
 import json
+import shutil
+import tempfile
 
 # Add backend to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
 
 from app import app
+import app as app_module
+
+TEST_CASES = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'test_cases'))
 
 class TestEmailTriage(unittest.TestCase):
     def setUp(self):
@@ -63,5 +68,161 @@ class TestEmailTriage(unittest.TestCase):
         # Ensure content is different (mock data relies on index)
         self.assertNotEqual(data1[0]['id'], data2[0]['id'])
 
+    def test_cursor_pagination(self):
+        res1 = self.app.get('/threads?limit=5')
+        self.assertEqual(res1.status_code, 200)
+        cursor = res1.headers['X-Next-Cursor']
+
+        res2 = self.app.get(f'/threads?limit=5&cursor={cursor}')
+        self.assertEqual(res2.status_code, 200)
+
+        # Cursor walk matches the legacy page numbers
+        legacy = self.app.get('/threads?page=2&limit=5').get_json()
+        self.assertEqual([t['id'] for t in res2.get_json()], [t['id'] for t in legacy])
+
+    def test_batch_mode_parameter(self):
+        response = self.app.post('/batch?mode=thread&limit=10')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['mode'], 'thread')
+        self.assertEqual(data['processed_count'], 10)
+
+        response = self.app.post('/batch', json={"mode": "warp"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_stream_ndjson(self):
+        response = self.app.post('/batch/stream?limit=10')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        frames = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        results = [f['data'] for f in frames if f['type'] == 'result']
+        self.assertEqual(len(results), 10)
+        self.assertEqual(frames[-1]['type'], 'summary')
+
+        summary = frames[-1]['data']
+        self.assertEqual(summary['processed_count'], 10)
+        # Summary ranking matches the non-streaming endpoint
+        batch = self.app.post('/batch?limit=10').get_json()
+        self.assertEqual(summary['ranked_ids'], [t['id'] for t in batch['results']])
+
+    def test_batch_stream_sse(self):
+        response = self.app.get('/batch/stream?format=sse&limit=3')
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = response.get_data(as_text=True).strip().split('\n\n')
+        self.assertEqual([e.splitlines()[0] for e in events], ['event: result'] * 3 + ['event: summary'])
+
+        response = self.app.get('/batch/stream?format=xml')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_calendar_export(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for name, value in (('calendar_sink', app_module.FileCalendarSink(directory)),
+                            ('gmail_parser', app_module.GmailParser(test_cases_dir=TEST_CASES))):
+            self.addCleanup(setattr, app_module, name, getattr(app_module, name))
+            setattr(app_module, name, value)
+
+        self.assertNotIn('calendar', self.app.post('/batch?limit=50').get_json())
+        calendar = self.app.post('/batch?limit=50', json={"calendar": True}).get_json()['calendar']
+        self.assertGreater(calendar['detected'], 0)
+        self.assertEqual(calendar['written'], calendar['detected'])
+        # Same threads again: every event is already in the feed
+        self.assertEqual(self.app.post('/batch?limit=50&calendar=1').get_json()['calendar']['written'], 0)
+
+        feed = self.app.get(calendar['feed_url'])
+        self.assertEqual(feed.mimetype, 'text/calendar')
+        self.assertEqual(feed.get_data(as_text=True).count('BEGIN:VEVENT'), calendar['detected'])
+        feed.close()
+        self.assertEqual(self.app.get('/calendar.ics?user=nobody').status_code, 404)
+        self.assertEqual(self.app.get('/calendar.ics?user=../etc').status_code, 400)
+
+    def test_sync_triages_only_changes(self):
+        mailbox_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, mailbox_dir)
+        for name in os.listdir(TEST_CASES):
+            shutil.copy(os.path.join(TEST_CASES, name), mailbox_dir)
+        for name, value in (('gmail_parser', app_module.GmailParser(test_cases_dir=mailbox_dir)),
+                            ('result_store', app_module.ResultStore())):
+            self.addCleanup(setattr, app_module, name, getattr(app_module, name))
+            setattr(app_module, name, value)
+
+        first = self.app.post('/sync').get_json()
+        self.assertEqual(first['changed_count'], len(os.listdir(TEST_CASES)))
+        self.assertEqual(self.app.post('/sync').get_json()['changed_count'], 0)
+
+        shutil.copy(os.path.join(TEST_CASES, 'job_offer.eml'), os.path.join(mailbox_dir, 'job_offer_2.eml'))
+        latest = self.app.post('/sync').get_json()
+        self.assertEqual([r['id'] for r in latest['results']], ['job_offer_2'])
+        self.assertEqual(self.app.post('/sync?full=1').get_json()['changed_count'], len(os.listdir(mailbox_dir)))
+
+    def test_sync_errors(self):
+        mailbox_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, mailbox_dir)
+        parser = app_module.GmailParser(test_cases_dir=os.path.join(mailbox_dir, 'missing'))
+        self.addCleanup(setattr, app_module, 'gmail_parser', app_module.gmail_parser)
+        app_module.gmail_parser = parser
+
+        # The user id is checked before the (here failing) poll
+        self.assertEqual(self.app.post('/sync', headers={'X-User-Id': '../etc'}).status_code, 400)
+        self.assertEqual(self.app.post('/sync').status_code, 503)
+
+    def test_batch_near_duplicates(self):
+        patches = (('NEAR_DUPLICATES', True),
+                   ('triage_engine', app_module.TriageEngine(near_duplicates=app_module.NearDuplicateClusterer())),
+                   ('result_store', app_module.ResultStore()),
+                   ('gmail_parser', app_module.GmailParser(test_cases_dir=TEST_CASES)))
+        for name, value in patches:
+            self.addCleanup(setattr, app_module, name, getattr(app_module, name))
+            setattr(app_module, name, value)
+
+        results = self.app.post('/batch?limit=50').get_json()['results']
+        self.assertEqual(len({r['id'] for r in results}), 50)
+        stats = self.app.get('/health').get_json()['near_duplicates']
+        self.assertEqual(stats['threads'], 50)
+        # The mock filler repeats one template per sender
+        self.assertGreater(stats['skipped'], 0)
+
+    def test_bulk_action_job(self):
+        response = self.app.post('/bulk-action', json={"action": "archive", "selector": {"min_priority": 4}})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+
+        app_module.bulk_jobs.wait(job_id, timeout=10)
+        progress = self.app.get(f'/jobs/{job_id}').get_json()
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['processed'], progress['total'])
+
+        self.assertEqual(self.app.post('/bulk-action', json={"action": "label"}).status_code, 400)
+        self.assertEqual(self.app.get('/jobs/nope').status_code, 404)
+
+    def test_upload_job(self):
+        emls = [
+            (io.BytesIO(f"From: a{i}@example.com\r\nSubject: Urgent {i}\r\n\r\nPlease review {i}".encode()), f"m{i}.eml")
+            for i in range(3)
+        ]
+        response = self.app.post('/triage/jobs', data={'files': emls}, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+
+        frames = [json.loads(line) for line in self.app.get(f'/triage/jobs/{job_id}/stream').get_data(as_text=True).splitlines()]
+        self.assertEqual([f['data']['id'] for f in frames if f['type'] == 'result'], ['m0.eml', 'm1.eml', 'm2.eml'])
+        self.assertEqual(frames[-1]['data']['status'], 'completed')
+
+        polled = self.app.get(f'/triage/jobs/{job_id}?offset=1&limit=1').get_json()
+        self.assertEqual(polled['processed'], 3)
+        self.assertEqual([r['id'] for r in polled['results']], ['m1.eml'])
+        self.assertEqual(self.app.get('/triage/jobs/nope').status_code, 404)
+
+    def test_invalid_cursor(self):
+        response = self.app.get('/threads?cursor=garbage')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_limit(self):
+        for query in ('limit=abc', 'limit=-5', 'limit=0', f'limit={app_module.MAX_PAGE_LIMIT + 1}'):
+            self.assertEqual(self.app.post(f'/batch?{query}').status_code, 400, query)
+            self.assertEqual(self.app.get(f'/batch/stream?{query}').status_code, 400, query)
+            self.assertEqual(self.app.get(f'/threads?{query}').status_code, 400, query)
+        self.assertEqual(self.app.get('/threads?page=0&limit=5').status_code, 400)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
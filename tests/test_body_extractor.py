@@ -0,0 +1,37 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from body_extractor import extract_text, html_to_text
+from gmail_parser import GmailParser
+
+class TestBodyExtractor(unittest.TestCase):
+    def test_html_is_stripped(self):
+        html = "<html><head><style>p {color: red}</style><script>alert('x')</script></head><body><p>Hello &amp; welcome</p></body></html>"
+        self.assertEqual(html_to_text(html), "Hello & welcome")
+        self.assertEqual(extract_text(html, "text/html"), "Hello & welcome")
+
+    def test_plain_text_is_untouched(self):
+        text = "Use a < b and <script> literally & keep it"
+        self.assertIs(extract_text(text, "text/plain"), text)
+        # Unknown type: only stripped when it looks like HTML
+        self.assertEqual(extract_text("if a<b then", None), "if a<b then")
+        self.assertEqual(extract_text("<div>Hi</div>", None), "Hi")
+
+    def test_gmail_parser_strips_html(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(directory, "promo.eml"), "wb") as f:
+                f.write(b"Subject: Sale\r\nContent-Type: text/html\r\n\r\n<p>Big <b>sale</b></p><script>track()</script>")
+            thread = GmailParser(test_cases_dir=directory).fetch_threads(limit=1)[0]
+            self.assertEqual(thread["body"], "Big sale")
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
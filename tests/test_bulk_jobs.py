@@ -0,0 +1,136 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from bulk_jobs import JobManager, ThreadSelector
+from mailbox_backend import MockMailbox
+
+def make_threads(count):
+    return [{"id": f"t{i}", "subject": f"Subject {i}", "sender": "a@example.com", "body": ""} for i in range(count)]
+
+def select_all(selector, user):
+    return [thread["id"] for thread in mailbox_threads]
+
+mailbox_threads = make_threads(25)
+
+class TestThreadSelector(unittest.TestCase):
+    def test_matches(self):
+        selector = ThreadSelector.from_dict({"category": "Work", "min_priority": 3, "max_priority": 4})
+        self.assertTrue(selector.matches({"category": "Work", "priority": 3}))
+        self.assertFalse(selector.matches({"category": "Work", "priority": 5}))
+        self.assertFalse(selector.matches({"category": "Social", "priority": 3}))
+
+        folder = ThreadSelector.from_dict({"folder": "Newsletters"})
+        self.assertTrue(folder.matches({"smart_folder": "Newsletters"}))
+        self.assertTrue(ThreadSelector.from_dict(None).matches({"priority": 1}))
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            ThreadSelector.from_dict({"sender": "x"})
+        with self.assertRaises(ValueError):
+            ThreadSelector.from_dict({"min_priority": "high"})
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.journal_dir = tempfile.mkdtemp()
+        self.mailbox = MockMailbox(mailbox_threads)
+
+    def tearDown(self):
+        shutil.rmtree(self.journal_dir)
+
+    def manager(self):
+        return JobManager(self.mailbox, select_all, journal_dir=self.journal_dir, workers=2, chunk_size=10)
+
+    def test_job_runs_in_chunks(self):
+        jobs = self.manager()
+        job = jobs.submit("archive", selector={})
+        progress = jobs.wait(job.id, timeout=5)
+        self.assertEqual(progress["status"], "completed")
+        self.assertEqual(progress["total"], 25)
+        self.assertEqual(progress["processed"], 25)
+        self.assertEqual(progress["chunks_total"], 3)
+        self.assertEqual(self.mailbox.calls, 3)
+        self.assertTrue(self.mailbox.state("t24")["archived"])
+        jobs.shutdown()
+
+    def test_explicit_ids_and_labels(self):
+        jobs = self.manager()
+        job = jobs.submit("label", label="Later", thread_ids=["t1", "t2", "missing"])
+        progress = jobs.wait(job.id, timeout=5)
+        self.assertEqual(progress["total"], 3)
+        self.assertEqual(progress["modified"], 2)
+        self.assertEqual(self.mailbox.state("t1")["labels"], ["Later"])
+        self.assertFalse(self.mailbox.state("t3")["labels"])
+
+        with self.assertRaises(ValueError):
+            jobs.submit("label")
+        with self.assertRaises(ValueError):
+            jobs.submit("explode")
+        jobs.shutdown()
+
+    def test_resume_skips_applied_chunks(self):
+        # Journal of a job interrupted after its first chunk
+        job_id = "interrupted"
+        ids = [thread["id"] for thread in mailbox_threads]
+        with open(os.path.join(self.journal_dir, f"{job_id}.jsonl"), "w") as f:
+            f.write(json.dumps({"event": "created", "action": "mark_read", "label": None, "user": "default",
+                                "selector": {}, "chunk_size": 10, "created_at": 1.0}) + "\n")
+            f.write(json.dumps({"event": "selected", "thread_ids": ids}) + "\n")
+            f.write(json.dumps({"event": "chunk", "index": 0, "modified": 10}) + "\n")
+            f.write('{"event": "chu')  # torn write
+
+        jobs = self.manager()
+        resumed = jobs.resume()
+        self.assertEqual([job.id for job in resumed], [job_id])
+        progress = jobs.wait(job_id, timeout=5)
+        self.assertEqual(progress["status"], "completed")
+        self.assertEqual(progress["modified"], 25)
+        # Only the two remaining chunks hit the mailbox
+        self.assertEqual(self.mailbox.calls, 2)
+        self.assertFalse(self.mailbox.state("t0")["read"])
+        self.assertTrue(self.mailbox.state("t10")["read"])
+
+        # Finished jobs are reloaded for /jobs but not rerun
+        jobs.shutdown()
+        again = self.manager()
+        self.assertEqual(again.resume(), [])
+        self.assertEqual(again.get(job_id).status, "completed")
+        again.shutdown()
+
+    def test_finished_journal_is_compacted_then_expires(self):
+        jobs = self.manager()
+        job = jobs.submit("archive", selector={})
+        jobs.wait(job.id, timeout=5)
+        path = os.path.join(self.journal_dir, f"{job.id}.jsonl")
+        with open(path) as f:
+            self.assertEqual([json.loads(line)["event"] for line in f], ["created", "finished"])
+        progress = self.manager().get(job.id).progress()
+        self.assertEqual((progress["total"], progress["processed"], progress["chunks_done"]), (25, 25, 3))
+
+        expiring = JobManager(self.mailbox, select_all, journal_dir=self.journal_dir, chunk_size=10, retention=0)
+        self.assertEqual(expiring.resume(), [])
+        self.assertFalse(os.path.exists(path))
+        self.assertIsNone(expiring.get(job.id))
+        jobs.shutdown()
+        expiring.shutdown()
+
+    def test_progress_visible_to_other_workers(self):
+        # Another worker process sharing the journal directory
+        jobs, other = self.manager(), self.manager()
+        job = jobs.submit("trash", selector={})
+        jobs.wait(job.id, timeout=5)
+        progress = other.get(job.id).progress()
+        self.assertEqual(progress["status"], "completed")
+        self.assertEqual(progress["processed"], 25)
+        self.assertIsNone(other.get("unknown"))
+        jobs.shutdown()
+        other.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from calendar_sink import FileCalendarSink, CRLF, TRAILER, format_event, thread_events
+from meeting_extractor import MeetingExtractor
+
+THREAD = {
+    "id": "t1",
+    "subject": "Sync; budget, Q4",
+    "sender": "pm@example.com",
+    "date": "Thu, 10 Oct 2024 09:00:00 +0000",
+    "body": "Can we meet Mon, 14 Oct at 3-4pm? https://us02web.zoom.us/j/123 - otherwise Fri, 18 Oct.",
+}
+
+class TestCalendarSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.events = thread_events(THREAD, MeetingExtractor())
+
+    def read(self, calendar="default"):
+        with open(os.path.join(self.directory, f"{calendar}.ics"), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def test_thread_events(self):
+        self.assertEqual([(e["start"], e["end"], e["all_day"]) for e in self.events], [
+            (datetime(2024, 10, 14, 15), datetime(2024, 10, 14, 16), False),
+            (datetime(2024, 10, 18), datetime(2024, 10, 19), True),
+        ])
+        self.assertEqual(self.events[0]["location"], "https://us02web.zoom.us/j/123")
+        self.assertEqual(len({e["uid"] for e in self.events}), 2)
+
+    def test_format_event(self):
+        text = format_event(dict(self.events[0], summary="x" * 100), "20241010T090000Z")
+        lines = text.split(CRLF)
+        self.assertIn("DTSTART:20241014T150000", lines)
+        self.assertTrue(all(len(line.encode("utf-8")) <= 75 for line in lines))
+        self.assertEqual(lines[5], "SUMMARY:" + "x" * 67)
+        self.assertEqual(lines[6], " " + "x" * 33)
+        self.assertIn("SUMMARY:Sync\\; budget\\, Q4", format_event(self.events[0], "20241010T090000Z"))
+        self.assertIn("DTSTART;VALUE=DATE:20241018", format_event(self.events[1], "20241010T090000Z"))
+
+    def test_batches_append_and_dedupe(self):
+        sink = FileCalendarSink(self.directory)
+        self.assertEqual(sink.write(self.events[:1]), 1)
+        self.assertEqual(sink.write(self.events), 1)
+        content = self.read()
+        self.assertTrue(content.startswith("BEGIN:VCALENDAR" + CRLF))
+        self.assertTrue(content.endswith(TRAILER))
+        self.assertEqual(content.count("BEGIN:VEVENT"), 2)
+        self.assertEqual(content.count("END:VCALENDAR"), 1)
+
+        # A second writer (another worker process) sees what is already in the feed
+        other = FileCalendarSink(self.directory)
+        self.assertEqual(other.write(self.events + self.events), 0)
+        self.assertEqual(other.write(self.events, calendar="alice"), 2)
+
+    def test_torn_append_is_repaired(self):
+        sink = FileCalendarSink(self.directory)
+        sink.write(self.events[:1])
+        with open(sink.path(), "rb+") as f:
+            f.seek(-len(TRAILER), os.SEEK_END)
+            f.truncate()
+            f.write(b"BEGIN:VEVENT\r\nUID:half")
+        self.assertEqual(FileCalendarSink(self.directory).write(self.events), 1)
+        content = self.read()
+        self.assertNotIn("UID:half", content)
+        self.assertEqual(content.count("BEGIN:VEVENT"), 2)
+        self.assertTrue(content.endswith(TRAILER))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from gmail_parser import GmailParser
+
+TEST_CASES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'test_cases'))
+
+class TestGmailParser(unittest.TestCase):
+    def setUp(self):
+        self.mailbox_dir = tempfile.mkdtemp()
+        for name in sorted(os.listdir(TEST_CASES_DIR))[:3]:
+            shutil.copy(os.path.join(TEST_CASES_DIR, name), self.mailbox_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.mailbox_dir, ignore_errors=True)
+
+    def test_unchanged_files_parsed_once(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        first = parser.fetch_threads(limit=3)
+        second = parser.fetch_threads(limit=3)
+        self.assertEqual([t['id'] for t in first], [t['id'] for t in second])
+        stats = parser.cache.stats()
+        self.assertEqual(stats['misses'], 3)
+        self.assertEqual(stats['hits'], 3)
+
+    def test_page_only_parses_window(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        threads = parser.fetch_threads(limit=2, offset=1)
+        self.assertEqual(len(threads), 2)
+        self.assertEqual(parser.cache.stats()['misses'], 2)
+
+    def test_modified_file_is_reparsed(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        parser.fetch_threads(limit=1)
+        path = os.path.join(self.mailbox_dir, sorted(os.listdir(self.mailbox_dir))[0])
+        with open(path, 'ab') as f:
+            f.write(b"\nAppended line.\n")
+        threads = parser.fetch_threads(limit=1)
+        self.assertIn('Appended line.', threads[0]['body'])
+        self.assertEqual(parser.cache.stats()['misses'], 2)
+
+    def test_disk_store_survives_restart(self):
+        cache_dir = os.path.join(self.mailbox_dir, 'cache')
+        GmailParser(test_cases_dir=self.mailbox_dir, cache_dir=cache_dir).fetch_threads(limit=3)
+        parser = GmailParser(test_cases_dir=self.mailbox_dir, cache_dir=cache_dir)
+        parser.fetch_threads(limit=3)
+        stats = parser.cache.stats()
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['disk_hits'], 3)
+
+    def test_mock_threads_fill_deep_pages(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        threads = parser.fetch_threads(limit=5, offset=10)
+        self.assertEqual([t['id'] for t in threads], [f"mock_thread_{i}" for i in range(10, 15)])
+
+    def test_iter_threads_cursor_walk(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        cursor, seen = None, []
+        for _ in range(3):
+            seen.extend(t['id'] for t in parser.iter_threads(cursor=cursor, limit=2))
+            cursor = parser.next_cursor(cursor, limit=2)
+        self.assertEqual(seen, [t['id'] for t in parser.fetch_threads(limit=6)])
+
+    def test_deep_cursor_skips_files_without_parsing(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        threads = list(parser.iter_threads(cursor=parser.encode_cursor(100000), limit=2))
+        self.assertEqual([t['id'] for t in threads], ['mock_thread_100000', 'mock_thread_100001'])
+        self.assertEqual(parser.cache.stats()['misses'], 0)
+
+    def test_invalid_cursor(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        with self.assertRaises(ValueError):
+            parser.iter_threads(cursor='not-a-cursor')
+
+if __name__ == '__main__':
+    unittest.main()
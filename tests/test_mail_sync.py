@@ -0,0 +1,187 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest import mock
+
+# Add backend (and this directory, for the fake API server) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from gmail_parser import GmailParser
+from mail_sync import CheckpointStore
+from fake_gmail_api import FakeGmailApi
+
+def eml(message_id, subject, body, in_reply_to=None, date="Mon, 12 Feb 2024 09:00:00 +0000"):
+    headers = ["From: alice@example.com", "To: me@example.com", f"Subject: {subject}", f"Date: {date}",
+               f"Message-ID: {message_id}"]
+    if in_reply_to:
+        headers += [f"In-Reply-To: {in_reply_to}", f"References: {in_reply_to}"]
+    return ("\n".join(headers) + "\n\n" + body + "\n").encode("utf-8")
+
+class TestCheckpointStore(unittest.TestCase):
+    def test_round_trip_and_other_writers(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'checkpoint.json')
+        first, second = CheckpointStore(path), CheckpointStore(path)
+        self.assertEqual(first.load(), {})
+        first.save({"history_id": "7"})
+        self.assertEqual(second.load(), {"history_id": "7"})
+        self.assertEqual(CheckpointStore().load(), {})
+
+class TestDirectorySync(unittest.TestCase):
+    def setUp(self):
+        self.mailbox_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.mailbox_dir, ignore_errors=True)
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.checkpoint))
+        self.deliver("a.eml", eml("<1@x>", "Budget", "Please review the budget."))
+        self.deliver("b.eml", eml("<2@x>", "Lunch", "Lunch at noon?"))
+
+    def deliver(self, name, raw):
+        with open(os.path.join(self.mailbox_dir, name), 'wb') as f:
+            f.write(raw)
+        # Back-date the directory so its mtime is outside the racy window
+        os.utime(self.mailbox_dir, ns=(10 ** 18, 10 ** 18 + len(os.listdir(self.mailbox_dir))))
+
+    def parser(self):
+        return GmailParser(test_cases_dir=self.mailbox_dir, checkpoint_path=self.checkpoint)
+
+    def sync(self, parser, **kwargs):
+        threads, checkpoint = parser.poll(**kwargs)
+        parser.commit(checkpoint)
+        return sorted(thread['id'] for thread in threads)
+
+    def test_first_poll_is_full_then_only_changes(self):
+        parser = self.parser()
+        self.assertEqual(self.sync(parser), ['a', 'b'])
+        with mock.patch('mail_sync.os.scandir', side_effect=AssertionError("listed an unchanged directory")):
+            self.assertEqual(self.sync(parser), [])
+
+        self.deliver("c.eml", eml("<3@x>", "Invoice", "Invoice attached."))
+        self.assertEqual(self.sync(parser), ['c'])
+        self.assertEqual(self.sync(parser), [])
+
+    def test_reply_returns_its_whole_conversation(self):
+        parser = self.parser()
+        self.sync(parser)
+        self.deliver("c.eml", eml("<3@x>", "Re: Budget", "Approved.", in_reply_to="<1@x>",
+                                  date="Mon, 12 Feb 2024 10:00:00 +0000"))
+        threads, _ = parser.poll()
+        self.assertEqual([[m['id'] for m in t['messages']] for t in threads], [['a', 'c']])
+
+    def test_new_files_are_threaded_into_the_index(self):
+        parser = self.parser()
+        self.sync(parser)
+        self.deliver("c.eml", eml("<3@x>", "Re: Budget", "Approved.", in_reply_to="<1@x>",
+                                  date="Mon, 12 Feb 2024 10:00:00 +0000"))
+        self.deliver("d.eml", eml("<4@x>", "Offsite", "Offsite next week."))
+        with mock.patch.object(parser.threader, 'build', side_effect=AssertionError("re-threaded the mailbox")), \
+                mock.patch('gmail_parser.glob.glob', side_effect=AssertionError("listed the directory twice")):
+            threads, _ = parser.poll()
+        self.assertEqual([[m['id'] for m in t['messages']] for t in threads], [['a', 'c'], ['d']])
+        # Pages read the updated index, as a fresh parser would build it
+        self.assertEqual([t['id'] for t in parser.fetch_threads(limit=3)],
+                         [t['id'] for t in self.parser().fetch_threads(limit=3)])
+
+    def test_uncommitted_poll_is_returned_again(self):
+        parser = self.parser()
+        self.sync(parser)
+        self.deliver("c.eml", eml("<3@x>", "Invoice", "Invoice attached."))
+        self.assertEqual(len(parser.poll()[0]), 1)
+        self.assertEqual(len(parser.poll()[0]), 1)
+
+    def test_checkpoint_survives_restart(self):
+        self.sync(self.parser())
+        self.deliver("c.eml", eml("<3@x>", "Invoice", "Invoice attached."))
+        self.assertEqual(self.sync(self.parser()), ['c'])
+
+    def test_replaced_and_appended_files_are_returned(self):
+        parser = self.parser()
+        self.sync(parser)
+        tmp_path = os.path.join(self.mailbox_dir, '.b.eml.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(eml("<2@x>", "Lunch moved", "Lunch at one instead?"))
+        os.replace(tmp_path, os.path.join(self.mailbox_dir, 'b.eml'))
+        os.utime(self.mailbox_dir, ns=(10 ** 18, 10 ** 18 + 100))
+        threads, checkpoint = parser.poll()
+        parser.commit(checkpoint)
+        self.assertEqual([t['subject'] for t in threads], ['Lunch moved'])
+
+        # An append keeps the directory mtime; the next listing change finds it
+        with open(os.path.join(self.mailbox_dir, 'a.eml'), 'ab') as f:
+            f.write(b"Numbers attached.\n")
+        self.deliver("c.eml", eml("<3@x>", "Invoice", "Invoice attached."))
+        threads = {t['id']: t for t in parser.poll()[0]}
+        self.assertEqual(sorted(threads), ['a', 'c'])
+        self.assertIn('Numbers attached.', threads['a']['body'])
+
+    def test_full_sync_finds_in_place_edits(self):
+        parser = self.parser()
+        self.sync(parser)
+        path = os.path.join(self.mailbox_dir, 'b.eml')
+        stat = os.stat(self.mailbox_dir)
+        with open(path, 'ab') as f:
+            f.write(b"Make it 1pm.\n")
+        os.utime(self.mailbox_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(self.sync(parser), [])
+        threads = {t['id']: t for t in parser.poll(full=True)[0]}
+        self.assertEqual(sorted(threads), ['a', 'b'])
+        self.assertIn('Make it 1pm.', threads['b']['body'])
+
+    def test_mbox_source_is_rejected(self):
+        parser = GmailParser(mbox_path=os.path.join(self.mailbox_dir, 'export.mbox'))
+        with self.assertRaises(ValueError):
+            parser.poll()
+
+class TestApiSync(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeGmailApi(page_size=2).start()
+        self.addCleanup(self.api.stop)
+        self.budget = self.api.add_message(eml("<1@x>", "Budget", "Please review the budget."))
+        self.api.add_message(eml("<2@x>", "Lunch", "Lunch at noon?"))
+        self.api.add_message(eml("<3@x>", "Invoice", "Invoice attached."))
+        self.parser = GmailParser(test_cases_dir=os.devnull, api_url=self.api.url)
+
+    def sync(self, **kwargs):
+        threads, checkpoint = self.parser.poll(**kwargs)
+        self.parser.commit(checkpoint)
+        return threads
+
+    def test_connect(self):
+        self.assertTrue(self.parser.connect())
+        self.assertFalse(GmailParser(api_url="http://127.0.0.1:9").connect())
+
+    def test_history_polls_fetch_only_new_messages(self):
+        self.assertEqual(sorted(t['subject'] for t in self.sync()), ['Budget', 'Invoice', 'Lunch'])
+        del self.api.requests[:]
+        self.assertEqual(self.sync(), [])
+        self.assertEqual(self.api.requests, ['/gmail/v1/users/me/history'])
+
+        del self.api.requests[:]
+        reply = self.api.add_message(eml("<4@x>", "Re: Budget", "Approved.", in_reply_to="<1@x>",
+                                         date="Mon, 12 Feb 2024 10:00:00 +0000"), thread_id=self.budget)
+        threads = self.sync()
+        self.assertEqual([[m['id'] for m in t['messages']] for t in threads], [[self.budget, reply]])
+        self.assertEqual(threads[0]['body'], "Approved.\n")
+        # The budget message was cached from the first sync: only the reply is downloaded
+        self.assertEqual(self.api.requests, ['/gmail/v1/users/me/history', f'/gmail/v1/users/me/threads/{self.budget}',
+                                             f'/gmail/v1/users/me/messages/{reply}'])
+
+    def test_history_is_paged(self):
+        self.sync()
+        for index in range(5):
+            self.api.add_message(eml(f"<n{index}@x>", f"News {index}", "Top stories this week."))
+        self.assertEqual(len(self.sync()), 5)
+
+    def test_expired_history_falls_back_to_full_sync(self):
+        self.sync()
+        self.api.add_message(eml("<4@x>", "Offer", "Job offer attached."))
+        self.api.expire_history()
+        self.assertEqual(len(self.sync()), 4)
+        self.assertEqual(self.sync(), [])
+
+if __name__ == '__main__':
+    unittest.main()
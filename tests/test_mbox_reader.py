@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from mbox_reader import MboxReader
+from gmail_parser import GmailParser
+
+def mbox_message(index):
+    return (
+        f"From sender{index}@example.com Mon Jan  1 10:00:00 2024\n"
+        f"From: sender{index}@example.com\n"
+        f"Subject: Message {index}\n"
+        f"Date: Mon, 01 Jan 2024 10:00:00 +0000\n"
+        f"\n"
+        f"Body {index}\n"
+        f">From the desk of {index}\n"
+        f"\n"
+    ).encode()
+
+class TestMboxReader(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "export.mbox")
+        self.write(range(5))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, indices, mode="wb"):
+        with open(self.path, mode) as f:
+            for i in indices:
+                f.write(mbox_message(i))
+
+    def test_random_access(self):
+        with MboxReader(self.path) as mbox:
+            self.assertEqual(len(mbox), 5)
+            raw = mbox.get_bytes(3)
+            self.assertTrue(raw.startswith(b"From: sender3@example.com\n"))
+            # mboxo escaping is undone and the next separator is not included
+            self.assertTrue(raw.endswith(b"Body 3\nFrom the desk of 3\n"))
+            self.assertEqual([i for i, _ in mbox.iter_bytes(3, 10)], [3, 4])
+
+    def test_index_is_persisted_and_extended(self):
+        MboxReader(self.path).close()
+        self.assertTrue(os.path.exists(self.path + ".idx"))
+
+        scans = []
+        original = MboxReader._scan
+        def counting_scan(reader, offsets, start):
+            scans.append(start)
+            return original(reader, offsets, start)
+        MboxReader._scan = counting_scan
+        try:
+            MboxReader(self.path).close()
+            self.assertEqual(scans, [])  # unchanged file: index read back, no scan
+
+            size = os.path.getsize(self.path)
+            self.write([5, 6], mode="ab")
+            with MboxReader(self.path) as mbox:
+                self.assertEqual(scans, [size])  # only the appended tail is scanned
+                self.assertEqual(len(mbox), 7)
+                self.assertIn(b"Subject: Message 6", mbox.get_bytes(6))
+        finally:
+            MboxReader._scan = original
+
+    def test_rewritten_file_is_reindexed(self):
+        MboxReader(self.path).close()
+        with open(self.path, "wb") as f:
+            f.write(b"X" * 50 + b"\n" + b"".join(mbox_message(i) for i in range(8)))
+        with MboxReader(self.path) as mbox:
+            self.assertEqual(len(mbox), 8)
+
+    def test_gmail_parser_source(self):
+        parser = GmailParser(test_cases_dir=os.devnull, mbox_path=self.path)
+        page = parser.fetch_threads(limit=2, offset=3)
+        self.assertEqual([t['id'] for t in page], ["export_3", "export_4"])
+        self.assertEqual(page[0]['subject'], "Message 3")
+        self.assertEqual(parser.fetch_threads(limit=10, offset=5), [])
+
+if __name__ == '__main__':
+    unittest.main()
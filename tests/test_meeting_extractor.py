@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from meeting_extractor import MeetingExtractor, parse_time_range
+
+REFERENCE = datetime(2024, 10, 10, 9, 0)
+
+class TestMeetingExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = MeetingExtractor()
+
+    def test_full_date_time_range_and_link(self):
+        info = self.extractor.extract(
+            "Let's meet Mon, 14 Oct 2024 at 3-4pm on https://us02web.zoom.us/j/123?pwd=x.", REFERENCE)
+        self.assertTrue(info["is_meeting"])
+        self.assertEqual(info["dates_detected"], ["14 Oct 2024"])
+        self.assertEqual(info["times_detected"], ["3-4pm"])
+        self.assertEqual(info["ranges"], [{"start": "2024-10-14T15:00:00", "end": "2024-10-14T16:00:00"}])
+        self.assertEqual(info["links"], [{"provider": "zoom", "url": "https://us02web.zoom.us/j/123?pwd=x"}])
+        self.assertEqual(info["details"], "Mon 14 Oct 2024 15:00-16:00 · Zoom")
+
+    def test_date_formats_and_relative_days(self):
+        ranges = self.extractor.scan("Sync Oct 15th, 11am to 1pm; review 2024-11-01; standup tomorrow 09:30", REFERENCE)[2]
+        self.assertEqual(ranges, [
+            (datetime(2024, 10, 15, 11), datetime(2024, 10, 15, 13)),
+            (datetime(2024, 11, 1), datetime(2024, 11, 2)),            # no time: all day
+            (datetime(2024, 10, 11, 9, 30), datetime(2024, 10, 11, 10, 30)),
+        ])
+        # A month long past without a year means next year's
+        ranges = self.extractor.scan("Offsite Fri, 3 Jan", datetime(2024, 12, 20))[2]
+        self.assertEqual(ranges[0][0], datetime(2025, 1, 3))
+
+    def test_links_from_every_provider(self):
+        info = self.extractor.extract("Join https://meet.google.com/abc-defg-hij or https://teams.microsoft.com/l/meetup-join/x")
+        self.assertEqual([link["provider"] for link in info["links"]], ["meet", "teams"])
+
+    def test_numbers_are_not_times(self):
+        self.assertEqual(self.extractor.extract("We shipped 3 releases to 25 customers, call 555-1234"), {"is_meeting": False})
+        self.assertIsNone(parse_time_range("3", "4"))
+        self.assertIsNone(parse_time_range("13pm"))
+        self.assertEqual(parse_time_range("11", "1pm"), ((11, 0), (13, 0)))
+        self.assertEqual(parse_time_range("3 p.m."), ((15, 0), None))
+
+    def test_words_starting_with_a_month_are_not_dates(self):
+        for text in ("We made 3 decisions on the budget.", "Our marketing 2 team", "The 4 mayors",
+                     "3 janitors", "Augmented 5 times", "10 octopi", "2 novices"):
+            self.assertEqual(self.extractor.extract(text, REFERENCE), {"is_meeting": False}, text)
+        # Full names, abbreviations and "Sept." still are
+        self.assertEqual(self.extractor.extract("Due 3 December, Sept. 9 or March 4th", REFERENCE)["dates_detected"],
+                         ["3 December", "Sept. 9", "March 4th"])
+
+    def test_keywords_are_case_insensitive(self):
+        self.assertTrue(self.extractor.extract("Quick MEETING about the Zoom rollout")["is_meeting"])
+        self.assertEqual(self.extractor.extract(""), {"is_meeting": False})
+
+    def test_cost_is_bounded(self):
+        extractor = MeetingExtractor(max_chars=100, max_ranges=2)
+        self.assertFalse(extractor.extract("x" * 100 + " meeting on 14 Oct 2024 at 3pm")["is_meeting"])
+        events = " ".join(f"Event on Oct {day} at 2pm." for day in range(1, 20))
+        self.assertEqual(len(MeetingExtractor().scan(events, REFERENCE)[2]), 10)
+        self.assertEqual(len(extractor.scan(events, REFERENCE)[2]), 2)
+        self.assertEqual(len(MeetingExtractor(max_chars=30).scan(events, REFERENCE)[2]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
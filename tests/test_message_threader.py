@@ -0,0 +1,194 @@
+import unittest
+import os
+import sys
+import random
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from message_threader import MessageThreader, normalize_subject, parse_ids
+from gmail_parser import GmailParser
+from triage_engine import TriageEngine
+
+def message(key, message_id=None, in_reply_to=None, references=None, subject="Plan"):
+    return (key, message_id, in_reply_to, references, subject)
+
+def write_eml(directory, name, message_id, subject, date, body, in_reply_to=None, references=None,
+              sender="alice@example.com"):
+    headers = [f"From: {sender}", "To: bob@example.com", f"Subject: {subject}", f"Date: {date}"]
+    if message_id:
+        headers.append(f"Message-ID: {message_id}")
+    if in_reply_to:
+        headers.append(f"In-Reply-To: {in_reply_to}")
+    if references:
+        headers.append(f"References: {references}")
+    with open(os.path.join(directory, name), 'w') as f:
+        f.write("\n".join(headers) + "\n\n" + body + "\n")
+
+class TestMessageThreader(unittest.TestCase):
+    def setUp(self):
+        self.threader = MessageThreader()
+
+    def test_parse_ids(self):
+        self.assertEqual(parse_ids("<a@x>  <b@y>\n <c@z>"), ["a@x", "b@y", "c@z"])
+        self.assertEqual(parse_ids("bare@id"), ["bare@id"])
+        self.assertEqual(parse_ids(None), [])
+
+    def test_normalize_subject(self):
+        self.assertEqual(normalize_subject("Re: Fwd:  Q3  plan"), ("q3 plan", True))
+        self.assertEqual(normalize_subject("Q3 plan"), ("q3 plan", False))
+
+    def test_reply_chain_is_one_thread(self):
+        threads = self.threader.thread([
+            message(0, "<a@x>"),
+            message(1, "<b@x>", "<a@x>", "<a@x>", "Re: Plan"),
+            message(2, "<c@x>", "<b@x>", "<a@x> <b@x>", "Re: Plan"),
+            message(3, "<d@x>", subject="Lunch"),
+        ])
+        self.assertEqual(threads, [[0, 1, 2], [3]])
+
+    def test_missing_parent_still_groups_siblings(self):
+        # Both replies reference a message we never received
+        threads = self.threader.thread([
+            message(0, "<b@x>", "<a@x>", "<a@x>", "Re: Plan"),
+            message(1, "<c@x>", "<a@x>", "<a@x>", "Re: Plan"),
+        ])
+        self.assertEqual(threads, [[0, 1]])
+
+    def test_reply_before_parent_in_input(self):
+        threads = self.threader.thread([
+            message(0, "<b@x>", "<a@x>", None, "Re: Plan"),
+            message(1, "<a@x>"),
+        ])
+        self.assertEqual(threads, [[0, 1]])
+
+    def test_reference_loop_is_refused(self):
+        threads = self.threader.thread([
+            message(0, "<a@x>", "<b@x>", "<b@x>"),
+            message(1, "<b@x>", "<a@x>", "<a@x>"),
+        ])
+        self.assertEqual(threads, [[0, 1]])
+
+    def test_duplicate_and_missing_message_ids_are_kept(self):
+        threads = self.threader.thread([
+            message(0, "<a@x>", subject="One"),
+            message(1, "<a@x>", subject="Two"),
+            message(2, None, subject="Three"),
+        ])
+        self.assertEqual(sorted(key for thread in threads for key in thread), [0, 1, 2])
+
+    def test_subject_grouping(self):
+        threads = self.threader.thread([
+            message(0, "<a@x>", subject="Plan"),
+            message(1, "<b@x>", subject="RE: plan"),       # client dropped References
+            message(2, "<c@x>", subject="Plan v2"),
+        ])
+        self.assertEqual(threads, [[0, 1], [2]])
+        self.assertEqual(MessageThreader(group_by_subject=False).thread([
+            message(0, "<a@x>"), message(1, "<b@x>", subject="Re: Plan")]), [[0], [1]])
+
+    def test_ambiguous_subject_is_not_merged(self):
+        threads = self.threader.thread([
+            message(0, "<a@x>", subject="Weekly report"),
+            message(1, "<b@x>", subject="Weekly report"),
+            message(2, "<c@x>", subject="Re: Weekly report"),
+        ])
+        self.assertEqual(threads, [[0], [1], [2]])
+
+    def test_added_messages_match_a_full_build(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            messages = []
+            for key in rng.sample(range(1000), 12):
+                ids = [f"<{m[0]}@x>" for m in messages if m[1]] + [f"<ghost{rng.randrange(3)}@x>"]
+                chain = " ".join(rng.sample(ids, min(len(ids), rng.randrange(4))))
+                messages.append(message(key, rng.choice([f"<{key}@x>", f"<{key}@x>", None, "<dup@x>"]),
+                                        rng.choice([None, None, rng.choice(ids)]), chain or None,
+                                        subject=rng.choice(["", "Plan", "Re: Plan", "Lunch", "Re: Lunch", f"Topic {key}"])))
+            known, delivered = messages[:6], sorted(messages[6:])
+            conversations = self.threader.build(sorted(known))
+            for new in delivered:
+                known.append(new)
+                if conversations.add(*new) is None:
+                    conversations = self.threader.build(sorted(known))
+            self.assertEqual(conversations.groups, self.threader.thread(sorted(messages)), messages)
+
+    def test_add_threads_without_rebuilding(self):
+        conversations = self.threader.build([message(0, "<a@x>"), message(1, "<b@x>", subject="Lunch")])
+        reply = conversations.add(2, "<c@x>", "<a@x>", "<a@x>", "Re: Plan")
+        self.assertEqual(reply, [0, 2])
+        self.assertEqual(conversations.add(3, "<d@x>", None, None, "Offsite"), [3])
+        self.assertEqual(conversations.groups, [[0, 2], [1], [3]])
+        # Would start a second "Lunch" original, or fill in a known Message-ID
+        self.assertIsNone(conversations.add(4, "<e@x>", None, None, "Lunch"))
+        self.assertIsNone(conversations.add(5, "<a@x>", None, None, "Copy"))
+
+class TestParserThreading(unittest.TestCase):
+    def setUp(self):
+        self.mailbox_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.mailbox_dir, ignore_errors=True)
+        write_eml(self.mailbox_dir, "a.eml", "<1@x>", "Budget", "Mon, 12 Feb 2024 09:00:00 +0000",
+                  "Please review the budget.")
+        write_eml(self.mailbox_dir, "b.eml", "<2@x>", "Lunch", "Mon, 12 Feb 2024 09:30:00 +0000",
+                  "Lunch at noon?", sender="carol@example.com")
+        # Reply file sorts before its parent and arrives later
+        write_eml(self.mailbox_dir, "0_reply.eml", "<3@x>", "Re: Budget", "Mon, 12 Feb 2024 11:00:00 +0000",
+                  "Approved.\n\nOn Mon, 12 Feb 2024 Alice wrote:\n> Please review the budget.",
+                  in_reply_to="<1@x>", references="<1@x>", sender="boss@example.com")
+
+    def test_replies_are_grouped_into_one_thread(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        threads = parser.fetch_threads(limit=2)
+        budget, lunch = threads
+        self.assertEqual(budget['id'], 'a')
+        self.assertEqual(budget['subject'], 'Budget')
+        self.assertEqual(budget['sender'], 'boss@example.com')
+        self.assertIn('Approved.', budget['body'])
+        self.assertEqual([m['id'] for m in budget['messages']], ['a', '0_reply'])
+        self.assertEqual(budget['messages'][0]['message_id'], '<1@x>')
+        self.assertEqual(lunch['id'], 'b')
+        self.assertEqual(len(lunch['messages']), 1)
+        # Past the two conversations the mock filler starts
+        self.assertEqual(parser.fetch_threads(limit=1, offset=2)[0]['id'], 'mock_thread_2')
+
+    def test_index_reads_headers_not_bodies(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        parser.fetch_threads(limit=1, offset=1)
+        # Only the lunch thread was parsed; the budget thread's files were only indexed
+        self.assertEqual(parser.cache.stats()['misses'], 1)
+
+    def test_new_reply_joins_thread(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        parser.fetch_threads(limit=2)
+        write_eml(self.mailbox_dir, "c.eml", "<4@x>", "Re: Lunch", "Mon, 12 Feb 2024 10:00:00 +0000",
+                  "Sure.", in_reply_to="<2@x>", references="<2@x>")
+        lunch = parser.fetch_threads(limit=2)[1]
+        self.assertEqual([m['id'] for m in lunch['messages']], ['b', 'c'])
+        self.assertEqual(len(parser.fetch_threads(limit=3)), 3)
+
+    def test_threading_can_be_disabled(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir, thread_messages=False)
+        self.assertEqual([t['id'] for t in parser.fetch_threads(limit=3)], ['0_reply', 'a', 'b'])
+
+    def test_earlier_messages_are_compressed_once(self):
+        parser = GmailParser(test_cases_dir=self.mailbox_dir)
+        engine = TriageEngine()
+        budget = parser.fetch_threads(limit=1)[0]
+        result = engine.process_single(budget)
+        self.assertTrue(result['summary'].startswith('Approved.'))
+        self.assertNotIn('>', result['summary'])
+        self.assertEqual((engine.message_hits, engine.message_misses), (0, 2))
+
+        write_eml(self.mailbox_dir, "d.eml", "<5@x>", "Re: Budget", "Mon, 12 Feb 2024 12:00:00 +0000",
+                  "Thanks!\n\n> Approved.\n> > Please review the budget.",
+                  in_reply_to="<3@x>", references="<1@x> <3@x>")
+        budget = parser.fetch_threads(limit=1)[0]
+        self.assertEqual(len(budget['messages']), 3)
+        engine.process_single(budget)
+        # Only the new reply was compressed
+        self.assertEqual((engine.message_hits, engine.message_misses), (2, 3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from metrics import MetricsRegistry, STAGES
+from app import app
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_percentiles(self):
+        registry = MetricsRegistry()
+        for ms in range(1, 101):
+            registry.observe("rank", ms / 1000.0)
+        p = registry.percentiles("rank")
+        # Accurate to one bucket (25%)
+        self.assertTrue(0.05 <= p["p50"] <= 0.05 * 1.25)
+        self.assertTrue(0.099 <= p["p99"] <= 0.1 * 1.25)
+
+    def test_prometheus_format(self):
+        registry = MetricsRegistry()
+        with registry.timer("scale_down"):
+            pass
+        registry.observe_request("/batch", 0.2)
+        text = registry.render_prometheus()
+        self.assertIn("# TYPE triage_stage_seconds histogram", text)
+        self.assertIn('triage_stage_seconds_count{stage="scale_down"} 1', text)
+        self.assertIn('triage_stage_seconds_bucket{stage="rank",le="+Inf"} 0', text)
+        self.assertIn('http_request_duration_seconds_count{endpoint="/batch"} 1', text)
+        self.assertIn('triage_stage_seconds_quantile{stage="meeting_extractor",quantile="0.99"} NaN', text)
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def test_stages_recorded(self):
+        client = app.test_client()
+        client.post('/triage', json={"subject": "Urgent meeting", "sender": "boss@company.com", "body": "Please review"})
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        for stage in ("scale_down", "priority", "categorize", "smart_folders", "meeting_extractor", "unsubscribe_detector", "rank"):
+            self.assertNotIn(f'triage_stage_seconds_count{{stage="{stage}"}} 0\n', text)
+        self.assertIn('http_request_duration_seconds_count{endpoint="/triage"}', text)
+        self.assertEqual(len(STAGES), 9)
+
+if __name__ == '__main__':
+    unittest.main()
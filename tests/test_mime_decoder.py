@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+from email import policy
+from email.message import EmailMessage
+from email.parser import BytesParser
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import mime_decoder
+from mime_decoder import extract_body
+
+def parse(raw):
+    return BytesParser(policy=policy.default).parsebytes(raw)
+
+class TestMimeDecoder(unittest.TestCase):
+    def test_charset_is_honoured(self):
+        msg = parse("Content-Type: text/plain; charset=iso-8859-1\r\n\r\nCaf\xe9".encode("latin-1"))
+        self.assertEqual(extract_body(msg), "Café")
+
+        msg = parse(b"Content-Type: text/plain; charset=x-bogus\r\n\r\nplain")
+        self.assertEqual(extract_body(msg), "plain")
+
+    def test_attachments_are_not_decoded(self):
+        msg = EmailMessage()
+        msg.set_content("Please review the contract.")
+        msg.add_attachment(b"%PDF" * 1000, maintype="application", subtype="pdf", filename="contract.pdf")
+        msg.add_attachment("attached notes", filename="notes.txt")
+
+        decoded = []
+        original = mime_decoder.decode_part
+        mime_decoder.decode_part = lambda part, limit: decoded.append(part.get_filename()) or original(part, limit)
+        try:
+            self.assertEqual(extract_body(parse(msg.as_bytes())), "Please review the contract.\n")
+        finally:
+            mime_decoder.decode_part = original
+        self.assertEqual(decoded, [None])
+
+    def test_plain_preferred_over_html(self):
+        msg = EmailMessage()
+        msg.set_content("<p>Hi <b>there</b></p><script>x()</script>", subtype="html")
+        self.assertEqual(extract_body(parse(msg.as_bytes())), "Hi there\n")
+
+        msg.add_alternative("Hi there (plain)")
+        self.assertEqual(extract_body(parse(msg.as_bytes())), "Hi there (plain)\n")
+
+    def test_decoded_bytes_are_capped(self):
+        msg = EmailMessage()
+        msg.set_content("é" * 5000, cte="base64")
+        body = extract_body(parse(msg.as_bytes()), max_bytes=1001)
+        # The cap cuts mid-character; the partial character is dropped
+        self.assertEqual(body, "é" * 500)
+
+if __name__ == '__main__':
+    unittest.main()
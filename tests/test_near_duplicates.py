@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+
+# Add backend and scripts (synthetic mailbox) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from near_duplicates import NearDuplicateClusterer, fingerprint, sender_address, similarity
+from keyword_matcher import default_matcher as keywords
+from triage_engine import TriageEngine
+from batch_executor import BatchExecutor
+from rule_engine import CompiledRuleSet
+from synthetic_mailbox import SyntheticMailbox
+
+def digest(index, name, sender="Tech Trends <newsletter@spam.com>", subject="Weekly Tech Trends"):
+    return {
+        "id": f"digest_{index}",
+        "subject": subject,
+        "sender": sender,
+        "date": "Mon, 12 Feb 2024 09:00:00 +0000",
+        "body": f"Hi {name},\n\nHere are the top stories this week, picked for you from {index + 40} articles:\n"
+                "- Chip makers race to ship smaller models on laptops\n"
+                "- Why every startup is rewriting its billing stack\n"
+                f"Unsubscribe: https://news.example.com/u/{index:08x}",
+    }
+
+class TestFingerprints(unittest.TestCase):
+    def test_sender_address(self):
+        self.assertEqual(sender_address("Tech Trends <News@Spam.com>"), "news@spam.com")
+        self.assertEqual(sender_address("news@spam.com"), "news@spam.com")
+
+    def test_similarity(self):
+        a, b = fingerprint(digest(1, "Alex")), fingerprint(digest(2, "Priya"))
+        self.assertGreater(similarity(a, b), 0.7)
+        self.assertEqual(similarity(a, a), 1.0)
+        self.assertLess(similarity(a, fingerprint({"body": "Lunch at noon tomorrow with the finance team?"})), 0.1)
+
+class TestNearDuplicateClusterer(unittest.TestCase):
+    def cluster(self, threads, **kwargs):
+        return NearDuplicateClusterer(**kwargs).cluster(threads, [keywords.scan(t) for t in threads])
+
+    def test_copies_share_a_representative(self):
+        threads = [digest(i, name) for i, name in enumerate(["Alex", "Priya", "Sam", "Jordan"])]
+        self.assertEqual(self.cluster(threads), [0, 0, 0, 0])
+
+    def test_sender_is_part_of_the_key(self):
+        threads = [digest(0, "Alex"), digest(1, "Priya", sender="newsletter@other.com")]
+        self.assertEqual(self.cluster(threads), [0, 1])
+
+    def test_different_keyword_hits_never_cluster(self):
+        # An "urgent" copy must be triaged on its own: it scores differently
+        threads = [digest(0, "Alex"), digest(1, "Priya", subject="URGENT Weekly Tech Trends")]
+        self.assertEqual(self.cluster(threads), [0, 1])
+
+    def test_distinct_and_short_mail_is_its_own_representative(self):
+        threads = [
+            digest(0, "Alex"),
+            {"sender": "newsletter@spam.com", "subject": "Invoice", "body": "Your receipt for order 1234 is attached, "
+             "thanks for shopping with us. Payment was taken from the card ending 9876."},
+            {"sender": "newsletter@spam.com", "subject": "Hi", "body": "ok"},
+            {"sender": "newsletter@spam.com", "subject": "Hi", "body": "ok"},
+        ]
+        self.assertEqual(self.cluster(threads), [0, 1, 2, 3])
+
+class TestClusteredTriage(unittest.TestCase):
+    def setUp(self):
+        self.threads = SyntheticMailbox(seed=3, blast_ratio=0.8).threads(200)
+
+    def test_members_match_full_triage(self):
+        expected = TriageEngine().process_batch(self.threads)
+        engine = TriageEngine(near_duplicates=NearDuplicateClusterer())
+        results = engine.process_batch(iter(self.threads))
+        self.assertEqual(len(results), len(expected))
+        for want, got in zip(expected, results):
+            for field in ("id", "subject", "sender", "date", "timestamp", "priority", "category", "original_length"):
+                self.assertEqual(got[field], want[field])
+
+        stats = engine.near_duplicates.stats()
+        self.assertEqual(stats["threads"], 200)
+        self.assertEqual(stats["triaged"] + stats["skipped"], 200)
+        self.assertGreater(stats["skipped"], 100)
+
+    def test_rules_apply_to_every_member(self):
+        rules = CompiledRuleSet([{"keyword": "sam", "field": "body", "weight": 2, "folder": "Sam"}])
+        expected = TriageEngine().process_batch(self.threads, rules=rules)
+        results = TriageEngine(near_duplicates=NearDuplicateClusterer()).process_batch(self.threads, rules=rules)
+        self.assertEqual([(r["priority"], r.get("smart_folder")) for r in results],
+                         [(r["priority"], r.get("smart_folder")) for r in expected])
+        self.assertIn("Sam", [r.get("smart_folder") for r in results])
+
+    def test_process_executor(self):
+        executor = BatchExecutor(mode="process", workers=2, chunk_size=16)
+        try:
+            expected = TriageEngine().process_batch(self.threads)
+            results = TriageEngine(near_duplicates=NearDuplicateClusterer()).process_batch(
+                self.threads, executor=executor)
+        finally:
+            executor.shutdown()
+        self.assertEqual([(r["id"], r["category"]) for r in results], [(r["id"], r["category"]) for r in expected])
+
+if __name__ == '__main__':
+    unittest.main()
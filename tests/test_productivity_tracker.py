@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from productivity_tracker import ProductivityTracker
+
+class TestProductivityTracker(unittest.TestCase):
+    def test_in_memory(self):
+        tracker = ProductivityTracker()
+        tracker.track_batch(30)
+        self.assertEqual(tracker.get_stats(), {"processed_total": 30, "time_saved_hours": 1.0})
+
+    def test_counters_shared_through_db(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "productivity.db")
+        first, second = ProductivityTracker(path), ProductivityTracker(path)
+        first.track_batch(20)
+        second.track_batch(10)
+        self.assertEqual(first.get_stats(), {"processed_total": 30, "time_saved_hours": 1.0})
+        self.assertEqual(second.get_stats(), first.get_stats())
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork()")
+    def test_forked_workers_add_up(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        tracker = ProductivityTracker(os.path.join(directory, "productivity.db"))
+        tracker.track_batch(5)
+        children = []
+        for _ in range(3):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    tracker.track_batch(10)
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        for pid in children:
+            os.waitpid(pid, 0)
+        self.assertEqual(tracker.get_stats()["processed_total"], 35)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from result_store import ResultStore, content_hash
+from triage_engine import TriageEngine
+from gmail_parser import GmailParser
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultStore()
+        self.engine = TriageEngine()
+        self.threads = GmailParser(test_cases_dir=os.devnull).fetch_threads(limit=6)
+        self.computed = []
+
+    def compute(self, threads):
+        self.computed.extend(t['id'] for t in threads)
+        return self.engine.process_batch(threads)
+
+    def test_stored_results_are_reused(self):
+        first = self.store.get_or_compute(self.threads, "1:none", self.compute)
+        second = self.store.get_or_compute(self.threads, "1:none", self.compute)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.computed), 6)
+        self.assertEqual(self.store.stats()['hits'], 6)
+
+    def test_same_content_different_id(self):
+        self.store.get_or_compute(self.threads[:1], "1:none", self.compute)
+        copy = dict(self.threads[0], id="forwarded-copy")
+        result = self.store.get_or_compute([copy], "1:none", self.compute)[0]
+        self.assertEqual(result['id'], "forwarded-copy")
+        self.assertEqual(len(self.computed), 1)
+
+    def test_rule_version_change_only_misses_its_entries(self):
+        self.store.get_or_compute(self.threads, "1:none", self.compute)
+        self.store.get_or_compute(self.threads[:2], "1:alice-v1", self.compute)
+        self.assertEqual(self.store.invalidate("1:alice-v1"), 2)
+        self.store.get_or_compute(self.threads, "1:none", self.compute)
+        self.assertEqual(len(self.computed), 8)
+
+    def test_content_hash_ignores_delivery_fields(self):
+        thread = self.threads[0]
+        self.assertEqual(content_hash(thread), content_hash(dict(thread, id="x", date=None)))
+        self.assertNotEqual(content_hash(thread), content_hash(dict(thread, body="changed")))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork()")
+    def test_forked_worker_shares_file_store(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        store = ResultStore(os.path.join(directory, "results.db"))
+        store.get_or_compute(self.threads[:2], "1:none", self.compute)
+        pid = os.fork()
+        if pid == 0:
+            # Child: reconnects instead of reusing the parent's handle, then writes
+            try:
+                store.get_or_compute(self.threads, "1:none", self.compute)
+                os._exit(0 if len(self.computed) == 6 else 1)
+            except BaseException:
+                os._exit(2)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        store.get_or_compute(self.threads, "1:none", self.compute)
+        self.assertEqual(len(self.computed), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import app as app_module
+from rule_engine import CompiledRuleSet, RuleStore
+
+RULES = [
+    {"sender": "Alice@Example.com", "weight": 2},
+    {"sender_domain": "client.com", "weight": 1.5},
+    {"keyword": "Invoice", "field": "subject", "folder": "Finance"},
+    {"keyword": "lunch", "field": "body", "weight": -3, "folder": "Social"},
+]
+
+class TestCompiledRuleSet(unittest.TestCase):
+    def test_match_by_sender_domain_and_keyword(self):
+        ruleset = CompiledRuleSet(RULES)
+        thread = {"subject": "INVOICE 42", "sender": "Bob <bob@mail.client.com>", "body": "Due Friday"}
+        self.assertEqual(ruleset.match(thread), [1, 2])
+        self.assertEqual(ruleset.evaluate(thread), (1.5, "Finance"))
+        self.assertEqual(ruleset.match({"sender": "alice@example.com"}), [0])
+
+    def test_apply_clamps_priority(self):
+        ruleset = CompiledRuleSet(RULES)
+        result = ruleset.apply({"priority": 2}, {"sender": "x@y.com", "body": "Lunch today?"})
+        self.assertEqual(result, {"priority": 1, "smart_folder": "Social"})
+
+    def test_large_rule_sets_match_like_small_ones(self):
+        rules = RULES + [{"keyword": f"project-{i}", "field": "body", "weight": 0.1} for i in range(5000)]
+        ruleset = CompiledRuleSet(rules)
+        thread = {"subject": "Invoice", "body": "Status of project-4999 and project-12"}
+        expected = [2] + [i for i, rule in enumerate(rules) if rule.get("field") == "body" and rule["keyword"] in thread["body"]]
+        self.assertIn(4 + 4999, expected)
+        self.assertEqual(ruleset.match(thread), expected)
+
+    def test_invalid_rules_rejected(self):
+        for rule in ({"weight": 1}, {"sender": "a@b.c"}, {"keyword": "x", "field": "cc", "weight": 1},
+                     {"sender": "a@b.c", "keyword": "x", "weight": 1}, {"keyword": "x", "weight": "high"}):
+            with self.assertRaises(ValueError):
+                CompiledRuleSet([rule])
+
+class TestRuleStore(unittest.TestCase):
+    def setUp(self):
+        self.rules_dir = tempfile.mkdtemp()
+        self.store = RuleStore(self.rules_dir, check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.rules_dir, ignore_errors=True)
+
+    def test_hot_reload_on_file_change(self):
+        self.assertEqual(len(self.store.get('alice')), 0)
+        path = os.path.join(self.rules_dir, 'alice.json')
+        with open(path, 'w') as f:
+            json.dump({"rules": RULES[:1]}, f)
+        first = self.store.get('alice')
+        self.assertEqual(len(first), 1)
+        self.assertIs(self.store.get('alice'), first)
+
+        with open(path, 'w') as f:
+            json.dump({"rules": RULES}, f)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1000))
+        self.assertEqual(len(self.store.get('alice')), len(RULES))
+
+        # A broken edit keeps the last good rule set
+        with open(path, 'w') as f:
+            f.write("{not json")
+        self.assertEqual(len(self.store.get('alice')), len(RULES))
+
+    def test_user_id_validated(self):
+        with self.assertRaises(ValueError):
+            self.store.get('../etc/passwd')
+
+class TestUserSettingsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.rules_dir = tempfile.mkdtemp()
+        self.original_store = app_module.rule_store
+        app_module.rule_store = RuleStore(self.rules_dir)
+        self.app = app_module.app.test_client()
+
+    def tearDown(self):
+        app_module.rule_store = self.original_store
+        shutil.rmtree(self.rules_dir, ignore_errors=True)
+
+    def test_rules_apply_to_triage(self):
+        response = self.app.post('/user-settings', json={"user": "alice", "rules": RULES})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['rules'], len(RULES))
+
+        thread = {"subject": "Invoice overdue", "sender": "billing@vendor.com", "body": "Please pay."}
+        result = self.app.post('/triage', json=thread, headers={'X-User-Id': 'alice'}).get_json()
+        self.assertEqual(result['smart_folder'], 'Finance')
+        result = self.app.post('/triage', json=thread).get_json()
+        self.assertEqual(result['smart_folder'], 'Finance')  # default folder rule agrees
+
+        settings = self.app.get('/user-settings?user=alice').get_json()
+        self.assertEqual(settings['rules'], RULES)
+
+    def test_save_replaces_broken_rule_file(self):
+        with open(os.path.join(self.rules_dir, 'alice.json'), 'w') as f:
+            f.write("{bad")
+        response = self.app.post('/user-settings', json={"user": "alice", "rules": RULES})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.app.get('/user-settings?user=alice').get_json()['rules'], RULES)
+        self.assertEqual(self.app.post('/user-settings', json={"user": "../etc", "rules": RULES}).status_code, 400)
+
+    def test_invalid_rules(self):
+        response = self.app.post('/user-settings', json={"rules": [{"weight": 1}]})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import serve
+
+class TestServe(unittest.TestCase):
+    def test_preload_warms_app(self):
+        application = serve.preload()
+        self.assertFalse(application.debug)
+        import app as app_module
+        self.assertIn('default', app_module.rule_store._cache)
+        response = application.test_client().get('/health')
+        self.assertEqual(response.status_code, 200)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "fork() is POSIX only")
+    def test_preload_starts_no_job_threads(self):
+        import app as app_module
+        from bulk_jobs import JobManager
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        with open(os.path.join(journal_dir, "interrupted.jsonl"), "w") as f:
+            f.write(json.dumps({"event": "created", "action": "archive", "label": None, "user": "default",
+                                "selector": {}, "chunk_size": 10, "created_at": 1.0}) + "\n")
+            f.write(json.dumps({"event": "selected", "thread_ids": ["mock_thread_1"]}) + "\n")
+        jobs = JobManager(app_module.mailbox, app_module.select_threads, journal_dir=journal_dir, chunk_size=10)
+        for name, value in (('BULK_JOBS_DIR', journal_dir), ('bulk_jobs', jobs)):
+            self.addCleanup(setattr, app_module, name, getattr(app_module, name))
+            setattr(app_module, name, value)
+
+        serve.preload()
+        self.assertIsNone(jobs.get("interrupted").owner_pid)
+        self.assertIsNone(jobs._pool)
+
+        # A forked worker resumes the journaled job and runs new ones on its own pool
+        pid = os.fork()
+        if pid == 0:
+            ok = False
+            try:
+                app_module.resume_bulk_jobs()
+                job = jobs.submit("mark_read", thread_ids=["mock_thread_2"])
+                ok = (jobs.wait("interrupted", timeout=5)["status"] == "completed"
+                      and jobs.wait(job.id, timeout=5)["status"] == "completed")
+            finally:
+                os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        jobs.shutdown()
+
+    def test_listen_binds_shared_socket(self):
+        sock = serve.listen("127.0.0.1", 0)
+        try:
+            self.assertGreater(sock.getsockname()[1], 0)
+        finally:
+            sock.close()
+
+    def test_arguments(self):
+        calls = []
+        original = serve.serve_forever
+        serve.serve_forever = lambda *args: calls.append(args)
+        try:
+            serve.main(["--port", "8080", "--workers", "4", "--threads", "2"])
+        finally:
+            serve.serve_forever = original
+        self.assertEqual(calls, [("127.0.0.1", 8080, 2, 4)])
+
+if __name__ == '__main__':
+    unittest.main()
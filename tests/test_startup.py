@@ -0,0 +1,52 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Startup probes live with the benchmark script
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from bench_startup import HEAVY_MODULES, app_import_cost, probe
+
+# Backend modules' own import cost (framework excluded); the importtime report
+# before engines and optional dependencies became lazy was ~170ms
+BACKEND_IMPORT_BUDGET_MS = 100
+
+LOADED_ENGINES = """
+import json, app
+def loaded():
+    return sorted(name for name, value in vars(app).items() if isinstance(value, app.LazyInstance) and value.loaded)
+after_import = loaded()
+application = app.create_app()
+after_create = loaded()
+application.test_client().get('/health')
+print(json.dumps({"import": after_import, "create_app": after_create, "health": loaded()}))
+"""
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+
+    def test_import_loads_no_heavy_modules_or_engines(self):
+        rows, loaded = probe(self.work_dir, LOADED_ENGINES)
+        heavy = sorted({name for name, _, _, _ in rows if name.split(".")[0] in HEAVY_MODULES})
+        self.assertEqual(heavy, [])
+        self.assertEqual(loaded["import"], [])
+        self.assertEqual(loaded["create_app"], [])
+        # A request builds only what it touches
+        self.assertEqual(loaded["health"], ["gmail_parser", "result_store"])
+
+    def test_import_creates_no_files(self):
+        probe(self.work_dir, "import app")
+        self.assertEqual(os.listdir(self.work_dir), [])
+
+    def test_backend_import_budget(self):
+        # Best of three keeps a busy machine from failing the run
+        costs = [app_import_cost(probe(self.work_dir, "import app")[0])[1] for _ in range(3)]
+        self.assertLess(min(costs) / 1000, BACKEND_IMPORT_BUDGET_MS,
+                        "python scripts/bench_startup.py shows which imports got slower")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from thread_ranker import ThreadRanker, parse_epoch
+from app import app
+
+THREADS = [
+    {"id": "a", "priority": 3, "date": "Wed, 12 Feb 2025 10:00:00 -0000"},
+    {"id": "b", "priority": 3, "date": "Thu, 13 Feb 2025 09:00:00 -0000"},
+    {"id": "c", "priority": 5, "date": "Mon, 10 Feb 2025 08:00:00 +0200"},
+    {"id": "d", "priority": 3, "date": "Sat, 01 Mar 2025 09:00:00 -0000"},
+    {"id": "e", "priority": 1, "date": None},
+]
+
+class TestThreadRanker(unittest.TestCase):
+    def test_dates_compare_chronologically(self):
+        # Lexicographically "Wed" > "Thu" > "Sat"; chronologically it is the reverse
+        ranked = ThreadRanker().rank_threads(THREADS)
+        self.assertEqual([t['id'] for t in ranked], ['c', 'd', 'b', 'a', 'e'])
+
+    def test_parse_epoch(self):
+        self.assertEqual(parse_epoch("Thu, 01 Jan 1970 00:01:00 -0000"), 60)
+        self.assertEqual(parse_epoch("not a date"), 0)
+        self.assertEqual(parse_epoch(None), 0)
+
+    def test_top_k_matches_full_sort(self):
+        ranker = ThreadRanker()
+        self.assertEqual(ranker.top_k(3, THREADS), ranker.rank_threads(THREADS)[:3])
+
+    def test_incremental_index(self):
+        ranker = ThreadRanker(max_indexed=3)
+        ranker.add_many(THREADS)
+        self.assertEqual([t['id'] for t in ranker.top_k(10)], ['c', 'd', 'b'])
+
+        # Re-inserting an id replaces its old position
+        ranker.add({"id": "b", "priority": 5, "date": "Fri, 14 Feb 2025 09:00:00 -0000"})
+        self.assertEqual([t['id'] for t in ranker.top_k(2)], ['b', 'c'])
+        self.assertEqual(len(ranker), 3)
+
+    def test_top_threads_endpoint(self):
+        client = app.test_client()
+        client.post('/batch?limit=10')
+        data = client.get('/top-threads?k=3').get_json()
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data, ThreadRanker().rank_threads(data))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from gmail_parser import GmailParser
+from triage_engine import TriageEngine
+from batch_executor import BatchExecutor
+from scale_down import ScaleDownCompressor
+from keyword_matcher import KeywordMatcher, default_matcher
+from priority_scorer import PriorityScorer
+from smart_folders import SmartFolders
+from unsubscribe_detector import UnsubscribeDetector
+from batch_scorer import BatchPriorityScorer
+
+class TestBatchExecutors(unittest.TestCase):
+    def setUp(self):
+        self.engine = TriageEngine()
+        self.threads = GmailParser(test_cases_dir=os.devnull).fetch_threads(limit=23)
+
+    def test_modes_match_serial_output(self):
+        expected = self.engine.process_batch(self.threads)
+        for mode in ('serial', 'thread', 'process'):
+            executor = BatchExecutor(mode=mode, workers=2, chunk_size=4)
+            try:
+                self.assertEqual(self.engine.process_batch(iter(self.threads), executor=executor), expected)
+            finally:
+                executor.shutdown()
+
+    def test_process_mode_after_vectorized_batch(self):
+        # A column-wise scored batch in the parent must leave the engine picklable
+        threads = GmailParser(test_cases_dir=os.devnull).fetch_threads(limit=60)
+        expected = self.engine.process_batch(threads)
+        executor = BatchExecutor(mode='process', workers=2, chunk_size=25)
+        try:
+            self.assertEqual(self.engine.process_batch(threads, executor=executor), expected)
+        finally:
+            executor.shutdown()
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            BatchExecutor(mode='gpu')
+class TestScaleDown(unittest.TestCase):
+    REPLY = (
+        "Can you send the deck?\n"
+        "On the plus side the numbers look good.\n"
+        "On Wed, 12 Feb 2025 at 10:00, Alice <alice@example.com>\n"
+        "wrote:\n"
+        "> Here is the draft.\n"
+    )
+
+    def test_cuts_reply_header_and_keeps_text_before_it(self):
+        compressed = ScaleDownCompressor().compress(self.REPLY)
+        self.assertEqual(compressed, "Can you send the deck? On the plus side the numbers look good.")
+
+    def test_honours_remove_flags(self):
+        body = "Please approve.\nBest regards,\nBob"
+        self.assertEqual(ScaleDownCompressor().compress(body), "Please approve.")
+        keep = ScaleDownCompressor({"remove_signatures": False})
+        self.assertEqual(keep.compress(body), "Please approve. Best regards, Bob")
+        keep_quotes = ScaleDownCompressor({"remove_quoted_text": False})
+        self.assertIn("> Here is the draft.", keep_quotes.compress(self.REPLY))
+
+    def test_compression_levels(self):
+        body = ". ".join(f"Sentence {i}" for i in range(7))
+        self.assertEqual(ScaleDownCompressor().compress(body), "Sentence 0. Sentence 1. Sentence 6.")
+        self.assertEqual(ScaleDownCompressor({"compression_level": "low"}).compress(body), body)
+        with self.assertRaises(ValueError):
+            ScaleDownCompressor({"compression_level": "extreme"})
+
+    def test_target_reduction_budget(self):
+        body = "word " * 2000
+        compressed = ScaleDownCompressor({"target_reduction": 0.9}).compress(body)
+        self.assertLessEqual(len(compressed), 1000)
+class TestKeywordMatcher(unittest.TestCase):
+    def test_scan_matches_substring_checks(self):
+        thread = {"subject": "URGENT: Invoice", "sender": "The CEO <ceo@corp.com>", "body": "Please Review. Unsubscribe here."}
+        hits = default_matcher.scan(thread)
+        for field, words in (("subject", ["urgent", "invoice", "meeting"]),
+                             ("sender", ["ceo", "client"]),
+                             ("body", ["review", "approve", "unsubscribe"])):
+            for word in words:
+                self.assertEqual(bool(hits & default_matcher.mask(field, word)), word in thread[field].lower(), word)
+
+    def test_automaton_handles_nested_and_overlapping_keywords(self):
+        words = ["subscribe", "unsubscribe", "update", "dated", "ted"] + [f"rule{i}" for i in range(40)]
+        matcher = KeywordMatcher({"body": words})
+        text = "please unsubscribe from updated rule7 lists"
+        hits = matcher.scan({"body": text.upper()})
+        expected = matcher.mask("body", *[w for w in words if w in text])
+        self.assertEqual(hits, expected)
+
+    def test_scorers_share_hits(self):
+        thread = {"subject": "Weekly Newsletter", "sender": "client@client.com", "body": "Manage preferences or unsubscribe"}
+        hits = default_matcher.scan(thread)
+        engine = TriageEngine()
+        self.assertEqual(engine.calculate_priority(thread, hits), PriorityScorer().calculate(thread))
+        self.assertEqual(engine.categorize(thread, 2, hits), "Newsletter")
+        self.assertEqual(SmartFolders().categorize(dict(thread, priority=2), hits), "Newsletters")
+        self.assertTrue(UnsubscribeDetector().detect(thread["body"], hits)["can_unsubscribe"])
+class TestBatchPriorityScorer(unittest.TestCase):
+    def test_vectorized_matches_scalar_for_every_keyword_combination(self):
+        words = {"subject": ["urgent", "asap", "important"], "sender": ["ceo", "client"], "body": ["review"]}
+        flags = [(field, word) for field, field_words in words.items() for word in field_words]
+        threads = []
+        for combo in range(2 ** len(flags)):
+            thread = {"subject": "", "sender": "", "body": ""}
+            for i, (field, word) in enumerate(flags):
+                if combo >> i & 1:
+                    thread[field] += word + " "
+            threads.append(thread)
+
+        expected = [PriorityScorer().calculate(t) for t in threads]
+        self.assertEqual(BatchPriorityScorer().score(threads), expected)
+        self.assertEqual(TriageEngine().process_batch(threads), [TriageEngine().process_single(t) for t in threads])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import os
+import io
+import sys
+import shutil
+import zipfile
+import tempfile
+import threading
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from upload_jobs import UploadJobManager, iter_upload, parse_eml
+
+def make_eml(index, subject="Hello"):
+    return (
+        f"From: sender{index}@example.com\r\n"
+        f"Subject: {subject} {index}\r\n"
+        f"Date: Mon, 01 Jan 2024 10:00:00 +0000\r\n"
+        f"\r\n"
+        f"Body of message {index}\r\n"
+    ).encode()
+
+def make_mbox(count):
+    return b"".join(b"From sender@example.com Mon Jan  1 10:00:00 2024\n" + make_eml(i).replace(b"\r\n", b"\n") + b"\n" for i in range(count))
+
+class TestUploadParsing(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_parse_eml_strips_scripts(self):
+        raw = b"Subject: Hi\r\nContent-Type: text/html\r\n\r\n<p>Hello</p><script>alert(1)</script>"
+        thread = parse_eml(raw, "x.eml")
+        self.assertEqual(thread['subject'], "Hi")
+        self.assertNotIn("alert", thread['body'])
+
+    def test_mbox_and_zip(self):
+        mbox = self.write("export.mbox", make_mbox(3))
+        ids = [thread_id for thread_id, _ in iter_upload(mbox, "export.mbox")]
+        self.assertEqual(ids, ["export.mbox#0", "export.mbox#1", "export.mbox#2"])
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr("a.eml", make_eml(1))
+            zf.writestr("nested/box.mbox", make_mbox(2))
+            zf.writestr("notes.txt", b"ignored")
+        path = self.write("upload.zip", archive.getvalue())
+        ids = [thread_id for thread_id, _ in iter_upload(path, "upload.zip")]
+        self.assertEqual(ids, ["upload.zip/a.eml", "upload.zip/nested/box.mbox#0", "upload.zip/nested/box.mbox#1"])
+
+class TestUploadJobManager(unittest.TestCase):
+    def setUp(self):
+        self.spool = tempfile.mkdtemp()
+        self.jobs = UploadJobManager(self.spool, workers=1, batch_size=2)
+
+    def tearDown(self):
+        self.jobs.shutdown()
+        shutil.rmtree(self.spool)
+
+    def test_job_streams_results(self):
+        files = [("one.eml", io.BytesIO(make_eml(1))), ("box.mbox", io.BytesIO(make_mbox(4)))]
+        job = self.jobs.submit(files, lambda threads: [{"id": t["id"]} for t in threads])
+        ids = [result["id"] for result in job.iter_results(timeout=5)]
+        self.assertEqual(ids, ["one.eml"] + [f"box.mbox#{i}" for i in range(4)])
+        self.assertEqual(job.status, "completed")
+        # Spooled files are removed once the job is done; its journal stays
+        self.assertEqual(os.listdir(self.spool), [f"{job.id}.jsonl"])
+
+    def test_other_workers_follow_the_journal(self):
+        release = threading.Event()
+
+        def process(threads):
+            release.wait(5)
+            return [{"id": t["id"]} for t in threads]
+
+        job = self.jobs.submit([("box.mbox", io.BytesIO(make_mbox(3)))], process)
+        # Another worker process has its own manager over the same spool directory
+        other = UploadJobManager(self.spool)
+        self.assertFalse(other.get(job.id).finished)
+        stream = other.get(job.id).iter_results(timeout=5)
+        release.set()
+        self.assertEqual([r["id"] for r in stream], [f"box.mbox#{i}" for i in range(3)])
+        list(job.iter_results(timeout=5))
+        self.assertEqual(other.get(job.id).progress(), job.progress())
+        self.assertIsNone(other.get("0" * 32))
+        self.assertIsNone(other.get(".."))
+
+    def test_rejects_unknown_types(self):
+        with self.assertRaises(ValueError):
+            self.jobs.submit([("notes.txt", io.BytesIO(b""))], list)
+
+    def test_bad_file_is_reported(self):
+        job = self.jobs.submit([("broken.zip", io.BytesIO(b"not a zip")), ("ok.eml", io.BytesIO(make_eml(2)))], list)
+        results = list(job.iter_results(timeout=5))
+        self.assertEqual([r["id"] for r in results], ["ok.eml"])
+        self.assertEqual(job.progress()["errors"][0]["source"], "broken.zip")
+
+if __name__ == '__main__':
+    unittest.main()